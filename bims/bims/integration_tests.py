@@ -3,6 +3,7 @@ from rest_framework import status
 from django.test import override_settings
 
 from refiner.models import Currency
+from refiner.irtk.database.repository import CONVERSION_RATES
 from intent_manager.models import Intent
 
 
@@ -16,6 +17,7 @@ class IntegrationTests(APITestCase):
         usd.save()
         chf.save()
         eur.save()
+        CONVERSION_RATES.invalidate()     # currencies saved in a test are never committed
 
     @override_settings(USE_PLEBEUS=False)
     def test_integration_test(self):
@@ -4,6 +4,30 @@ USE_PLEBEUS = False
 
 PLEBEUS_URL = ''
 
+# timeouts in seconds, retries of idempotent requests with jittered backoff and size of the connection pool of the
+# PleBeuS client, see policy_manager.plebeusClient.PlebeusClient
+PLEBEUS_CONNECT_TIMEOUT = 3.05
+PLEBEUS_READ_TIMEOUT = 10.0
+PLEBEUS_RETRIES = 2
+PLEBEUS_BACKOFF = 0.1
+PLEBEUS_MAX_BACKOFF = 2.0
+PLEBEUS_POOL_SIZE = 10
+
+# maximum number of concurrent requests to PleBeuS when applying changes of policies, see PleBeuS.sync_policies
+PLEBEUS_WORKERS = 10
+
+# changes of policies are stored in an outbox and applied to PleBeuS by the sync_plebeus command in batches, see
+# policy_manager.outbox. Failed changes are retried after a delay in seconds which doubles up to the maximum delay.
+# Changes of policies are rejected while too many changes are pending.
+PLEBEUS_OUTBOX_BATCH_SIZE = 100
+PLEBEUS_OUTBOX_INTERVAL = 1.0
+PLEBEUS_OUTBOX_RETRY_DELAY = 1.0
+PLEBEUS_OUTBOX_MAX_RETRY_DELAY = 300.0
+PLEBEUS_OUTBOX_MAX_PENDING = 100000
+
+# maximum number of refined intents cached in-process, see refiner.refiner.RefineCache
+REFINE_CACHE_SIZE = 4096
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -1,6 +1,7 @@
 import axios from 'axios';
 import {constructHeaders} from './auth';
 import {createMessage, returnErrors} from './messageActions';
+import {createValidator} from '../grammar/validator';
 import {
     GET_INTENTS,
     RETRIEVE_INTENT,
@@ -12,6 +13,7 @@ import {
     CREATE_INTENT,
     UPDATE_INTENT,
     PARSE_INTENT,
+    GET_GRAMMAR,
 } from './types';
 
 // GET all intents of a user
@@ -105,10 +107,42 @@ export const updateIntent = (id, new_intent) => (dispatch, getState) => {
 
 }
 
+// GET the compiled grammar of the Parser, which is used to validate intents without calling the Parser API
+export const getGrammar = () => dispatch => {
+    axios.get('/api/grammar')
+        .then(res => {
+            dispatch({
+                type: GET_GRAMMAR,
+                payload: createValidator(res.data)
+            });
+        })
+        .catch(() => dispatch({type: GET_GRAMMAR, payload: null}));
+}
+
 export const validateIntent = (intent) => (dispatch, getState) => {
-    // makes a call to the Parser API, status 204 means the intent is valid.
+    // validates the intent with the grammar, if the grammar was retrieved. Intents that are complete according to the
+    // grammar are valid, they are validated semantically by the Intent API when they are submitted. Other intents are
+    // passed to the Parser API, which also returns suggestions for a mistyped word and completions, status 204 means
+    // the intent is valid.
     // returns a Promise, which resolves to a boolean whether the Intent is valid.
 
+    const validator = getState().intentReducer.validator;
+    if (validator) {
+        const result = validator(intent);
+        if (result.complete) {
+            dispatch({
+                type: PARSE_INTENT,
+                payload: {expected: [], message: ''}
+            });
+            return Promise.resolve(true);
+        }
+        // the expected words are shown right away, until the Parser API responded
+        dispatch({
+            type: PARSE_INTENT,
+            payload: {expected: result.expected, message: result.message}
+        });
+    }
+
     const body = JSON.stringify({intent_string: intent});
 
     return axios.post('/api/parser', body, constructHeaders(getState))
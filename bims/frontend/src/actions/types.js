@@ -18,6 +18,7 @@ export const INTENT_ERROR = 'INTENT_ERROR'
 export const POLICY_SUCCESS = 'POLICY_SUCCESS'
 export const POLICY_FAIL = 'POLICY_FAIL'
 export const PARSE_INTENT = 'PARSE_INTENT'
+export const GET_GRAMMAR = 'GET_GRAMMAR'
 
 export const LOADING = 'LOADING'
 export const GET_ERRORS = 'GET_ERRORS'
@@ -17,6 +17,7 @@ import PrivateRoute from './common/PrivateRoute';
 
 import store from '../store';
 import {loadUser} from '../actions/auth';
+import {getGrammar} from '../actions/intentActions';
 
 import {Provider as AlertProvider} from 'react-alert';
 import AlertTemplate from 'react-alert-template-basic';
@@ -31,6 +32,7 @@ class App extends Component {
 
     componentDidMount() {
         store.dispatch(loadUser());
+        store.dispatch(getGrammar());
     }
 
     render() {
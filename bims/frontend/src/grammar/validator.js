@@ -0,0 +1,50 @@
+// Validates intents on the client with the compiled grammar of the Parser, which is retrieved from the Grammar API.
+// Only checks whether the words of an intent are legal, the semantic validation is still done by the Parser API.
+
+export const GRAMMAR_VERSION = 1;
+
+const NO_STATE = -1;
+const INCOMPLETE_MESSAGE = 'Intent is incomplete';
+
+// same tokenization as the lexer of the Parser: words, numbers with decimal points and punctuation
+const SCANNER = /[^\s,.;:!?]+(?:\.[^\s,.;:!?]+)*|\.\d+|\.\.\.|[,.;:!?]/g;
+
+export const tokenize = intent => (intent || '').toLowerCase().match(SCANNER) || [];
+
+// returns a validator for the grammar, or null if the grammar has an unsupported version
+export const createValidator = grammar => {
+    if (!grammar || grammar.version !== GRAMMAR_VERSION) {
+        return null;
+    }
+    const tokenIds = new Map(grammar.vocabulary.map((token, id) => [token, id]));
+    const numTokens = grammar.vocabulary.length;
+
+    // the last column of the transition table holds the transition for words that are not part of the vocabulary,
+    // e.g. usernames or thresholds. Whether such a word is valid is checked by the Parser API.
+    const transition = (state, token) => {
+        const tokenId = tokenIds.has(token) ? tokenIds.get(token) : numTokens;
+        return grammar.transitions[state][tokenId];
+    };
+
+    // returns the result of validating an intent in the same format as the Parser API
+    return intent => {
+        let state = grammar.initial;
+        for (const token of tokenize(intent)) {
+            const successor = transition(state, token);
+            if (successor === NO_STATE) {
+                const expected = grammar.expected[state];
+                return {
+                    complete: false,
+                    expected,
+                    message: `${grammar.names[state]}: illegal transition: ` +
+                        `expected {${expected.map(e => `'${e}'`).join(', ')}}, got '${token}'`,
+                };
+            }
+            state = successor;
+        }
+        if (grammar.accepting[state]) {
+            return {complete: true, expected: [], message: ''};
+        }
+        return {complete: false, expected: grammar.expected[state], message: INCOMPLETE_MESSAGE};
+    };
+}
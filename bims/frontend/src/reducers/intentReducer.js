@@ -9,6 +9,7 @@ import {
     CREATE_INTENT,
     UPDATE_INTENT,
     PARSE_INTENT,
+    GET_GRAMMAR,
 } from '../actions/types.js';
 
 const initialState = {
@@ -19,6 +20,10 @@ const initialState = {
     redirectToOverview: false,
     expected: [],
     parserMessage: '',
+    parserSuggestions: [],
+    completion: null,
+    completions: [],
+    validator: null,
 }
 
 export default function (state = initialState, action) {
@@ -89,7 +94,15 @@ export default function (state = initialState, action) {
             return {
                 ...state,
                 expected: action.payload.expected,
-                parserMessage: action.payload.message
+                parserMessage: action.payload.message,
+                parserSuggestions: action.payload.suggestions || [],
+                completion: action.payload.completion || null,
+                completions: action.payload.completions || [],
+            }
+        case GET_GRAMMAR:
+            return {
+                ...state,
+                validator: action.payload
             }
         default:
             return state;
@@ -1,20 +1,25 @@
 from intent_manager.models import Intent
 from refiner.models import Currency
-from policy_manager.models import Policy
+from policy_manager.models import Policy, PolicyChange
 
 from .serializers import IntentSerializer
-from refiner.refiner import refine_intent, save_policies, update_policies
+from refiner.refiner import parse_intent, refine_intent, refine_intents, save_policies, save_policies_many, \
+    update_policies
 from refiner.irtk.parser.state import IllegalTransitionError
 from refiner.irtk.incompleteIntentException import IncompleteIntentException
 from refiner.irtk.validation import ValidationError
-from refiner.irtk.policy import Interval
 from policy_manager.plebeusException import PlebeusException
-from policy_manager.plebeus import PleBeuS
 
 from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from django.core.exceptions import PermissionDenied
+from django.db import connection, transaction
+from django.db.models import Q
+
+# maximum number of intents of a single bulk request
+MAX_BULK_INTENTS = 10000
 
 
 class IntentViewSet(viewsets.ModelViewSet):
@@ -25,8 +30,20 @@ class IntentViewSet(viewsets.ModelViewSet):
     serializer_class = IntentSerializer
 
     def get_queryset(self):
-        """returns a queryset containing all intents belonging to a user"""
-        return self.request.user.intents.all()
+        """returns a queryset containing all intents belonging to a user. The intents can be filtered by the options
+        of the parsed intents with the query parameters profile, interval (e.g. default), currency and user"""
+        queryset = self.request.user.intents.order_by('id')
+        for option in ('profile', 'interval', 'currency'):
+            value = self.request.query_params.get(option)
+            if value is not None:
+                queryset = queryset.filter(**{option: value.upper() if option == 'currency' else value.lower()})
+        user = self.request.query_params.get('user')
+        if user is not None:
+            # the users are separated by commas, user names are lowercase like all words of an intent
+            user = user.lower()
+            queryset = queryset.filter(Q(users=user) | Q(users__startswith=user + ',') |
+                                       Q(users__endswith=',' + user) | Q(users__contains=',' + user + ','))
+        return queryset
 
     def create(self, request, *args, **kwargs):
         """Passes the intent to the refiner. Saves the intent and the policies if valid.
@@ -50,19 +67,19 @@ class IntentViewSet(viewsets.ModelViewSet):
 
         intent = Intent(username=request.user,
                         intent_string=request.data.get('intent_string'))
+        intent.set_parsed_intent(parse_intent(intent.intent_string))
 
-        # save intent and policies
+        # save intent and policies, the policies are saved to PleBeuS by the sync_plebeus command
         try:
-            intent.save()
-            save_policies(policies, intent.id)
+            with transaction.atomic():
+                intent.save()
+                save_policies(policies, intent.id)
         except PlebeusException as error:
-            # delete new intent if there is an error with PleBeuS.
-            # already created policies are also deleted if the intent is deleted.
-            intent.delete()
+            # too many changes are waiting for PleBeuS
             return Response({
                 'message': error.message,
                 'expected': []
-            }, status=status.HTTP_400_BAD_REQUEST)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         return Response({
             'id': intent.id,
@@ -72,10 +89,89 @@ class IntentViewSet(viewsets.ModelViewSet):
             'username': intent.username.id
         }, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, *args, **kwargs):
+        """Refines many intents in a single request, e.g. from provisioning scripts. Expects a list of intents in
+        'intent_strings'. Valid intents and their policies are saved in a single transaction, the policies with bulk
+        inserts. Returns a result for every intent in order: either the new intent and the id of an equal intent the
+        user already had or sent before in the request (duplicate_of), or the error and expected words if the intent
+        could not be refined. If too many changes are waiting for PleBeuS, nothing is saved and status 503 is
+        returned.
+        """
+        intent_strings = request.data.get('intent_strings')
+        if not isinstance(intent_strings, list) or not all(isinstance(s, str) for s in intent_strings):
+            return Response({
+                'message': 'intent_strings must be a list of intents',
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(intent_strings) > MAX_BULK_INTENTS:
+            return Response({
+                'message': 'Cannot refine more than {} intents in a single request'.format(MAX_BULK_INTENTS),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # refine intents, results are in the order of the intents
+        results = []
+        refined = []
+        for intent_string, result in zip(intent_strings, refine_intents(intent_strings)):
+            if isinstance(result, Currency.DoesNotExist):
+                results.append({'status': status.HTTP_404_NOT_FOUND, 'message': 'Currency was not found',
+                                'expected': []})
+            elif isinstance(result, Exception):
+                results.append({'status': status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                'message': 'Intent could not be refined', 'expected': []})
+            elif not result.complete:
+                results.append({'status': status.HTTP_400_BAD_REQUEST, 'message': result.message,
+                                'expected': result.expected})
+            else:
+                intent = Intent(username=request.user, intent_string=intent_string)
+                intent.set_parsed_intent(result.intent)
+                refined.append((intent, result.policies))
+                results.append(intent)
+
+        # find existing intents of the user that are equal to the new intents
+        equal = dict(Intent.objects.filter(
+            username=request.user, content_hash__in={intent.content_hash for intent, _ in refined}
+        ).values_list('content_hash', 'id'))
+
+        # save intents and policies
+        try:
+            with transaction.atomic():
+                intents = [intent for intent, _ in refined]
+                if connection.features.can_return_rows_from_bulk_insert:
+                    Intent.objects.bulk_create(intents)
+                else:
+                    for intent in intents:
+                        intent.save()
+                save_policies_many((policies, intent.id) for intent, policies in refined)
+        except PlebeusException as error:
+            return Response({
+                'message': error.message,
+                'expected': []
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        # an intent is also a duplicate of an equal intent before it in the same request
+        duplicate_of = {}
+        for intent, _ in refined:
+            duplicate_of[intent.id] = equal.get(intent.content_hash)
+            equal.setdefault(intent.content_hash, intent.id)
+
+        return Response({
+            'created': len(refined),
+            'results': [{
+                'status': status.HTTP_201_CREATED,
+                'id': result.id,
+                'created_at': result.created_at,
+                'updated_at': result.updated_at,
+                'intent_string': result.intent_string,
+                'username': result.username.id,
+                'duplicate_of': duplicate_of[result.id]
+            } if isinstance(result, Intent) else result for result in results]
+        }, status=status.HTTP_200_OK)
+
     def update(self, request, *args, **kwargs):
-        """Updates an intent and its policies, if valid. Also updates policies in PleBeuS.
-        If not valid, returns a response (status 400) with the error and expected words. Returns an error response if
-        default intent is updated to a non-default intent. If successful, returns the updated intent.
+        """Updates an intent and its policies, if valid. The policies are updated in PleBeuS later by the sync_plebeus
+        command. If not valid, returns a response (status 400) with the error and expected words. Returns an error
+        response if default intent is updated to a non-default intent. If successful, returns the updated intent and
+        the number of its policies which did not change and hence were not updated in PleBeuS (skipped_policies).
         """
 
         intent_id = kwargs.get('pk')
@@ -96,51 +192,50 @@ class IntentViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         # prevent changes from default policy to non-default policy
-        old_policies = Policy.objects.filter(intent_id=intent_id)
-        if old_policies[0].interval == 'Interval.DEFAULT' and policies[0].interval != Interval.DEFAULT:
+        parsed_intent = parse_intent(request.data.get('intent_string'))
+        if intent.is_default and parsed_intent.interval is not None:
             return Response({
                 'message': 'Cannot change default Policy to non-default Policy',
             }, status=status.HTTP_400_BAD_REQUEST)
 
         # update intent
         intent.intent_string = request.data.get('intent_string')
+        intent.set_parsed_intent(parsed_intent)
 
-        # update policies of this intent
+        # update policies of this intent and save intent to database
         try:
-            update_policies(policies, intent.id)
+            with transaction.atomic():
+                skipped_policies = update_policies(policies, intent.id)
+                intent.save()
         except PlebeusException as error:
             return Response({
                 'message': error.message
-            }, status=status.HTTP_400_BAD_REQUEST)
-
-        # save intent to database
-        intent.save()
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         return Response({
             'id': intent.id,
             'created_at': intent.created_at,
             'updated_at': intent.updated_at,
             'intent_string': intent.intent_string,
-            'username': intent.username.id
+            'username': intent.username.id,
+            'skipped_policies': skipped_policies
         }, status=status.HTTP_200_OK)
 
     def destroy(self, request, *args, **kwargs):
-        """Deletes intent and its policies. Also deletes all policies in PleBeuS created from this intent."""
+        """Deletes intent and its policies. All policies in PleBeuS created from this intent are deleted by the
+        sync_plebeus command."""
 
-        plebeus = PleBeuS()
         intent = Intent.objects.get(id=kwargs.get('pk'))
         policies = Policy.objects.filter(intent_id=intent.id)
 
-        # delete all PleBeuS policies corresponding to this intent
+        # delete intent and policies, and all PleBeuS policies corresponding to this intent later
         try:
-            for policy in policies:
-                plebeus.delete_policy(policy.pbs_id)
+            with transaction.atomic():
+                PolicyChange.objects.add_deletes(policies)
+                intent.delete()
         except PlebeusException as error:
             return Response({
                 'message': error.message,
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        # delete intent
-        intent.delete()
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         return Response(None, status=status.HTTP_204_NO_CONTENT)
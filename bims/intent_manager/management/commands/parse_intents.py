@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from intent_manager.models import Intent, parsed_intent_fields
+from refiner.irtk.parser.parser import Parser
+
+
+class Command(BaseCommand):
+    help = 'Stores the content hash, the encoding and the options of the parsed intents of intents stored without ' \
+           'them, e.g. before they were added. Run after migrating.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='parse all intents again, e.g. after the grammar changed')
+
+    def handle(self, *args, **options):
+        intents = Intent.objects.only('id', 'intent_string')
+        if not options['all']:
+            intents = intents.filter(Q(content_hash=None) | Q(encoded_intent=None) | Q(users=None))
+
+        parsed, invalid = 0, 0
+        for intent in intents.iterator():
+            result = Parser().try_parse(intent.intent_string)
+            if not result.complete:
+                invalid += 1
+                continue
+            intent.set_parsed_intent(result.intent)
+            intent.save(update_fields=list(parsed_intent_fields(result.intent)))
+            parsed += 1
+        self.stdout.write('parsed {} intents, {} could not be parsed'.format(parsed, invalid))
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.9 on 2026-10-18 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('intent_manager', '0002_auto_20201014_1039'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='intent',
+            name='content_hash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='intent',
+            index=models.Index(fields=['username', 'content_hash'], name='intent_user_content_hash_idx'),
+        ),
+        # the content hashes of existing intents are stored by the parse_intents command
+    ]
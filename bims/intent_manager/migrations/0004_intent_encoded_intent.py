@@ -0,0 +1,19 @@
+# Generated by Django 3.0.9 on 2026-10-18 15:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('intent_manager', '0003_intent_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='intent',
+            name='encoded_intent',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        # the encodings of existing intents are stored by the parse_intents command
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 3.0.9 on 2026-10-18 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('intent_manager', '0004_intent_encoded_intent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='intent',
+            name='blockchain_pool',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='intent',
+            name='currency',
+            field=models.CharField(blank=True, db_index=True, max_length=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='intent',
+            name='filters',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='intent',
+            name='interval',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='intent',
+            name='modifiers',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='intent',
+            name='profile',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='intent',
+            name='threshold',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='intent',
+            name='users',
+            field=models.TextField(blank=True, null=True),
+        ),
+        # the options of existing intents are stored by the parse_intents command
+    ]
@@ -1,5 +1,27 @@
 from django.db import models
 from user_manager.models import User
+from refiner.irtk.encoding import decode_intent, encode_intent
+from refiner.irtk.flags import FlagSet
+from refiner.irtk.intent import Filter, Modifier
+from refiner.irtk.parser.parser import Parser
+from refiner.irtk.policy import Interval
+
+
+def parsed_intent_fields(parsed_intent) -> dict:
+    """returns the values of the fields of an Intent that are derived from the parsed intent
+    (refiner.irtk.intent.Intent)"""
+    return {
+        'content_hash': parsed_intent.content_hash,
+        'encoded_intent': encode_intent(parsed_intent),
+        'users': ','.join(sorted(parsed_intent.users)),
+        'profile': parsed_intent.profile and parsed_intent.profile.value,
+        'blockchain_pool': parsed_intent.blockchain_pool.mask,
+        'filters': FlagSet(Filter, parsed_intent.filters).mask,
+        'modifiers': FlagSet(Modifier, parsed_intent.modifiers).mask,
+        'interval': parsed_intent.interval.value if parsed_intent.interval else Interval.DEFAULT.value,
+        'currency': parsed_intent.currency and parsed_intent.currency.name,
+        'threshold': parsed_intent.threshold,
+    }
 
 
 class Intent(models.Model):
@@ -7,3 +29,56 @@ class Intent(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     intent_string = models.TextField()
+
+    # stable 64-bit hash of the canonical form of the parsed intent, equal intents have the same hash.
+    # See refiner.irtk.intent.Intent.content_hash
+    content_hash = models.BigIntegerField(null=True, blank=True)
+
+    # parsed intent in a packed binary encoding, which is decoded without parsing intent_string.
+    # See refiner.irtk.encoding
+    encoded_intent = models.BinaryField(null=True, blank=True)
+
+    # options of the parsed intent, to read and filter intents without parsing or decoding them. The users are sorted
+    # and separated by commas, which cannot be part of a user name. The blockchain pool, filters and modifiers are
+    # stored as bitmasks (refiner.irtk.flags), an empty blockchain pool stands for all blockchains. The interval is
+    # 'default' for default intents. All options are null for intents stored without the parsed intent
+    users = models.TextField(null=True, blank=True)
+    profile = models.CharField(max_length=20, null=True, blank=True, db_index=True)
+    blockchain_pool = models.SmallIntegerField(null=True, blank=True)
+    filters = models.SmallIntegerField(null=True, blank=True)
+    modifiers = models.SmallIntegerField(null=True, blank=True)
+    interval = models.CharField(max_length=20, null=True, blank=True, db_index=True)
+    currency = models.CharField(max_length=3, null=True, blank=True, db_index=True)
+    threshold = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['username', 'content_hash'], name='intent_user_content_hash_idx'),
+        ]
+
+    def set_parsed_intent(self, parsed_intent) -> None:
+        """stores the content hash, the encoding and the options of the parsed intent (refiner.irtk.intent.Intent)"""
+        for name, value in parsed_intent_fields(parsed_intent).items():
+            setattr(self, name, value)
+
+    @property
+    def is_default(self) -> bool:
+        """whether the intent is a default intent. For intents stored without the parsed intent, the interval of their
+        policies is read instead"""
+        if self.interval is None:
+            policy = self.policy_set.first()
+            return policy is not None and policy.interval == 'Interval.DEFAULT'
+        return self.interval == Interval.DEFAULT.value
+
+    @property
+    def parsed_intent(self):
+        """returns the parsed intent (refiner.irtk.intent.Intent) decoded from its encoding, or None if it is not
+        stored. An encoding of an older layout, see refiner.irtk.encoding.ENCODING_VERSION, is not decoded, the
+        intent_string is parsed instead until the parse_intents command stored the current encoding"""
+        if self.encoded_intent is None:
+            return None
+        try:
+            return decode_intent(self.encoded_intent)
+        except ValueError:
+            result = Parser().try_parse(self.intent_string)
+            return result.intent if result.complete else None
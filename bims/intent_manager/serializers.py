@@ -5,6 +5,29 @@ from intent_manager.models import Intent
 class IntentSerializer(serializers.ModelSerializer):
     """Serializers allow complex data such as querysets and model instances to be converted to native Python datatypes
      that can then be easily rendered into JSON, XML or other content types."""
+    parsed_intent = serializers.SerializerMethodField()
+
     class Meta:
         model = Intent
-        fields = '__all__'
+        exclude = ['encoded_intent']
+
+    @staticmethod
+    def get_parsed_intent(intent):
+        """returns the options of the parsed intent, which is decoded from its encoding instead of parsing the
+        intent_string. Returns None if the encoding is not stored"""
+        parsed = intent.parsed_intent
+        if parsed is None:
+            return None
+        return {
+            'users': sorted(parsed.users),
+            'timeframe': parsed.timeframe and parsed.timeframe.value,
+            'blockchain': parsed.blockchain and parsed.blockchain.value,
+            'profile': parsed.profile and parsed.profile.value,
+            'filters': [member.value for member in parsed.filters],
+            'whitelist': [member.value for member in parsed.whitelist],
+            'blacklist': [member.value for member in parsed.blacklist],
+            'modifiers': [member.value for member in parsed.modifiers],
+            'interval': parsed.interval and parsed.interval.value,
+            'currency': parsed.currency and parsed.currency.value,
+            'threshold': parsed.threshold,
+        }
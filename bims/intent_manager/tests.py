@@ -1,10 +1,18 @@
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
+from django.core.management import call_command
 from django.test import override_settings
+from io import StringIO
 from intent_manager.models import Intent
 from user_manager.models import User
 from refiner.models import Currency
-from policy_manager.models import Policy
+from refiner.irtk.database.repository import CONVERSION_RATES
+from refiner.refiner import refine_intents
+from policy_manager.models import Policy, PolicyChange
+from unittest import mock
+from refiner.irtk.encoding import ENCODING_VERSION
+from refiner.irtk.flags import FlagSet
+from refiner.irtk.intent import Blockchain, Filter, Modifier
 import time
 import pickle
 
@@ -31,6 +39,7 @@ class IntentManagerTests(APITestCase):
         usd.save()
         chf.save()
         eur.save()
+        CONVERSION_RATES.invalidate()     # currencies saved in a test are never committed
 
     def test_get_intents_unauthorized(self):
         """tests GET request without a token, expects a 401 status code"""
@@ -73,6 +82,56 @@ class IntentManagerTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED, 'Incorrect status code')
         self.assertEqual(Intent.objects.count(), 1, 'Incorrect number of intents')
         self.assertEqual(Intent.objects.get().username.id, self.user_id, 'Incorrect user_id in intent')
+        self.assertIsNotNone(Intent.objects.get().content_hash, 'Content hash was not saved')
+
+    def test_get_parsed_intent(self):
+        """test GET request of an intent, the parsed intent is decoded without parsing the intent"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        intent = 'For client2 and client1 select the cheapest Blockchain except EOS until the daily costs reach CHF 20'
+        response = self.client.post(self.url, {'intent_string': intent}, format='json')
+
+        with mock.patch('refiner.irtk.parser.parser.Parser.try_parse', side_effect=AssertionError('parsed')):
+            response = self.client.get(self.url + str(response.data.get('id')) + '/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
+        parsed = response.data.get('parsed_intent')
+        self.assertEqual(parsed['users'], ['client1', 'client2'])
+        self.assertEqual((parsed['profile'], parsed['blacklist']), ('cheapest', ['eos']))
+        self.assertEqual((parsed['interval'], parsed['currency'], parsed['threshold']), ('daily', 'chf', 20.0))
+        self.assertNotIn('encoded_intent', response.data, 'Binary encoding is serialized')
+
+    def test_get_parsed_intent_of_older_encoding(self):
+        """test GET request of an intent encoded with an older layout, the intent is parsed instead"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        intent = 'For client1 select the fastest Blockchain as default'
+        intent_id = self.client.post(self.url, {'intent_string': intent}, format='json').data.get('id')
+        encoded_intent = bytes(Intent.objects.get(id=intent_id).encoded_intent)
+        Intent.objects.filter(id=intent_id).update(encoded_intent=bytes([ENCODING_VERSION - 1]) + encoded_intent[1:])
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
+        self.assertEqual(response.data[0]['parsed_intent']['users'], ['client1'])
+
+    def test_parse_intents(self):
+        """intents stored without their parsed intent are parsed by the parse_intents command"""
+        user = User.objects.get()
+        intent = Intent.objects.create(username=user, intent_string='For client2 and client1 select the cheapest '
+                                                                    'Blockchain until the daily costs reach CHF 20')
+        Intent.objects.create(username=user, intent_string='For client1 select')
+        other = Intent.objects.create(username=user,
+                                      intent_string='For client3 select the fastest Blockchain as default')
+        out = StringIO()
+
+        call_command('parse_intents', stdout=out)
+
+        self.assertIn('parsed 2 intents, 1 could not be parsed', out.getvalue())
+        intent.refresh_from_db()
+        other.refresh_from_db()
+        self.assertIsNotNone(intent.content_hash, 'Content hash was not saved')
+        self.assertEqual(intent.parsed_intent.users, {'client1', 'client2'})
+        self.assertEqual((intent.users, intent.profile, intent.interval), ('client1,client2', 'cheapest', 'daily'))
+        self.assertEqual((other.users, other.profile, other.interval), ('client3', 'fastest', 'default'))
 
     def test_post_invalid_intent(self):
         """test POST request of an invalid intent"""
@@ -86,6 +145,70 @@ class IntentManagerTests(APITestCase):
         self.assertEqual(Intent.objects.count(), 0, 'Intent was created, although not valid')
         self.assertTrue(len(response.data.get('expected')) != 0, 'Expected array is empty')
 
+    def test_post_intents_bulk(self):
+        """test POST request of many intents, only valid intents are saved"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        Currency.objects.filter(currency='EUR').delete()
+        intents = ['For client1 select the fastest Blockchain until the daily costs reach CHF 20',
+                   'For client1 select the fastest Blockchain asd',
+                   'For client2 select the cheapest Blockchain until the daily costs reach EUR 30',
+                   'For client3 and client4 select the cheapest Blockchain as default']
+        data = {'intent_strings': intents}
+
+        response = self.client.post(self.url + 'bulk/', data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
+        results = response.data.get('results')
+        self.assertEqual([result['status'] for result in results], [201, 400, 404, 201], 'Incorrect results')
+        self.assertEqual(response.data.get('created'), 2, 'Incorrect number of created intents')
+        self.assertEqual(Intent.objects.count(), 2, 'Incorrect number of intents')
+        self.assertEqual(results[3]['intent_string'], intents[3], 'Results are not in order')
+        self.assertTrue(len(results[1]['expected']) != 0, 'Expected array is empty')
+        self.assertEqual(Policy.objects.filter(intent_id=results[3]['id']).count(), 2, 'Incorrect number of policies')
+
+    def test_post_intents_bulk_duplicates(self):
+        """test POST request of many intents, equal intents of the user are reported"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        self.client.post(self.url, {'intent_string': 'For client1 and client2 select the fastest Blockchain as '
+                                                     'default'}, format='json')
+        existing = Intent.objects.get()
+        intents = ['for CLIENT2 and client1 select the fastest blockchain as default',
+                   'For client3 select the fastest Blockchain as default',
+                   'For client3 select the fastest Blockchain as default']
+
+        response = self.client.post(self.url + 'bulk/', {'intent_strings': intents}, format='json')
+
+        results = response.data.get('results')
+        self.assertEqual(results[0]['duplicate_of'], existing.id, 'Equal intent was not found')
+        self.assertIsNone(results[1]['duplicate_of'], 'Intent is not a duplicate')
+        self.assertEqual(results[2]['duplicate_of'], results[1]['id'], 'Equal intent of the request was not found')
+        self.assertEqual(Intent.objects.filter(username=existing.username, content_hash=existing.content_hash).count(),
+                         2, 'Equal intents have different content hashes')
+
+    def test_post_intents_bulk_error(self):
+        """test POST request of many intents, an unexpected error of an intent is returned as its result"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        intents = ['For client1 select the fastest Blockchain as default',
+                   'For client2 select the fastest Blockchain as default']
+
+        with mock.patch('intent_manager.api.refine_intents',
+                        return_value=[RuntimeError(), *refine_intents(intents[1:])]):
+            response = self.client.post(self.url + 'bulk/', {'intent_strings': intents}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
+        self.assertEqual([result['status'] for result in response.data.get('results')], [500, 201])
+        self.assertEqual(Intent.objects.get().intent_string, intents[1])
+
+    def test_post_intents_bulk_not_a_list(self):
+        """test POST request of many intents without a list of intents"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        data = {'intent_strings': 'For client1 select the fastest Blockchain as default'}
+
+        response = self.client.post(self.url + 'bulk/', data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, 'Incorrect status code')
+        self.assertEqual(Intent.objects.count(), 0, 'Intent was created, although not valid')
+
     def test_update_intent(self):
         """test PUT request to update an existing intent"""
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
@@ -133,6 +256,65 @@ class IntentManagerTests(APITestCase):
         self.assertEqual(Intent.objects.get().intent_string, new_intent, 'intent_string was not updated')
         self.assertNotEqual(Intent.objects.get().created_at, Intent.objects.get().updated_at,
                             'created_at and updated_at timestamp are equal')
+        self.assertEqual(response.data.get('skipped_policies'), 0, 'Incorrect number of skipped policies')
+
+    def test_update_unchanged_intent(self):
+        """test PUT request with the same public blockchain intent, its policy is skipped"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        data = {'intent_string': 'For client1 select the cheapest public Blockchain until the daily costs reach 20'}
+        intent_id = self.client.post(self.url, data, format='json').data.get('id')
+
+        response = self.client.put(self.url + str(intent_id) + '/', data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
+        self.assertEqual(response.data.get('skipped_policies'), 1, 'Incorrect number of skipped policies')
+
+    def test_update_default_intent(self):
+        """test PUT request to update a default intent to a non-default intent, the stored interval is read"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        response = self.client.post(self.url, {'intent_string': 'For client1 select EOS as default'}, format='json')
+        intent = Intent.objects.get()
+        self.assertEqual(intent.interval, 'default', 'Interval was not stored')
+
+        data = {'intent_string': 'For client1 select EOS until the daily costs reach 20'}
+        with self.assertNumQueries(5):      # authentication (3), intent and user of the intent, but no policies
+            response = self.client.put(self.url + str(intent.id) + '/', data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, 'Incorrect status code')
+
+    def test_parsed_options(self):
+        """test that the options of the parsed intent are stored"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        intent = 'For client2 and client1 select the cheapest stable Blockchain except EOS with encryption until ' \
+                 'the weekly costs reach CHF 20'
+        self.client.post(self.url, {'intent_string': intent}, format='json')
+
+        intent = Intent.objects.get()
+        self.assertEqual(intent.users, 'client1,client2')
+        self.assertEqual((intent.profile, intent.interval, intent.currency, intent.threshold),
+                         ('cheapest', 'weekly', 'CHF', 20.0))
+        self.assertEqual(set(FlagSet.from_mask(Blockchain, intent.blockchain_pool)), set(Blockchain) - {Blockchain.EOS})
+        self.assertEqual(set(FlagSet.from_mask(Filter, intent.filters)), {Filter.STABLE})
+        self.assertEqual(set(FlagSet.from_mask(Modifier, intent.modifiers)), {Modifier.ENCRYPTION})
+
+    def test_filter_intents(self):
+        """test GET request of intents filtered by the options of the parsed intents"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        intents = ['For client1 and client2 select the fastest Blockchain as default',
+                   'For client12 select the cheapest Blockchain until the daily costs reach CHF 20',
+                   'For client2 select the cheapest Blockchain until the weekly costs reach 30']
+        for intent in intents:
+            self.client.post(self.url, {'intent_string': intent}, format='json')
+
+        def intent_strings(query):
+            return {intent['intent_string'] for intent in self.client.get(self.url + query).data}
+
+        self.assertEqual(intent_strings('?interval=default'), {intents[0]})
+        self.assertEqual(intent_strings('?profile=cheapest'), {intents[1], intents[2]})
+        self.assertEqual(intent_strings('?currency=chf'), {intents[1]})
+        self.assertEqual(intent_strings('?user=client2'), {intents[0], intents[2]})
+        self.assertEqual(intent_strings('?user=client1'), {intents[0]})
+        self.assertEqual(intent_strings('?profile=cheapest&user=Client2'), {intents[2]})
 
     def test_delete_intent(self):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
@@ -164,3 +346,36 @@ class IntentManagerTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT, 'Incorrect status code')
         self.assertFalse(Intent.objects.filter(id=existing_intent.id), 'Intent was not deleted')
         self.assertFalse(Policy.objects.filter(intent_id=existing_intent.id), 'Policy of intent was not deleted')
+
+    @override_settings(USE_PLEBEUS=True)
+    @mock.patch('policy_manager.plebeus.client.post')
+    def test_outbox(self, mock_post):
+        """policies are saved to and deleted from PleBeuS by the sync_plebeus command, not by the API"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        response = self.client.post(self.url, {'intent_string': 'for client1 and client2 select the fastest '
+                                                                'blockchain until the daily costs reach 20'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, 'Incorrect status code')
+        intent_id = response.data.get('id')
+        policies = Policy.objects.filter(intent_id=intent_id)
+        self.assertEqual(sorted(PolicyChange.objects.values_list('action', 'policy_id')),
+                         [('save', policy.id) for policy in policies])
+        mock_post.assert_not_called()
+
+        policies.update(pbs_id='123')
+        response = self.client.delete(self.url + str(intent_id) + '/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT, 'Incorrect status code')
+        self.assertEqual(sorted(PolicyChange.objects.values_list('action', 'user', 'pbs_id')),
+                         [('delete', 'client1', '123'), ('delete', 'client2', '123'),
+                          ('save', 'client1', ''), ('save', 'client2', '')])
+
+    @override_settings(USE_PLEBEUS=True, PLEBEUS_OUTBOX_MAX_PENDING=0)
+    def test_post_intent_too_many_pending_changes(self):
+        """if too many changes are waiting for PleBeuS, no intent is created"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        response = self.client.post(self.url, {'intent_string': 'for client1 select the fastest blockchain until the '
+                                                                'daily costs reach 20'})
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE, 'Incorrect status code')
+        self.assertFalse(Intent.objects.exists(), 'Intent was created')
@@ -4,7 +4,7 @@ from rest_framework import viewsets, permissions
 from rest_framework.response import Response
 from .serializers import PolicySerializer
 from django.core.exceptions import PermissionDenied
-import pickle
+from .blockchain_pool import load_blockchain_pool
 
 
 class PolicyViewSet(viewsets.ReadOnlyModelViewSet):
@@ -30,12 +30,11 @@ class PolicyViewSet(viewsets.ReadOnlyModelViewSet):
         raise PermissionDenied
 
     def list(self, request, *args, **kwargs):
-        """Handles the GET request for policies. Unpickles the blockchain_pool of each policy"""
+        """Handles the GET request for policies. Decodes the blockchain_pool of each policy"""
         queryset = self.get_queryset().values()
         for policy in queryset:
-            policy['blockchain_pool'] = pickle.loads(policy['blockchain_pool'])
             blockchain_pool = []
-            for blockchain in policy['blockchain_pool']:
+            for blockchain in load_blockchain_pool(policy['blockchain_pool']):
                 blockchain_pool.append(blockchain.name)
             policy['blockchain_pool'] = blockchain_pool
         return Response(queryset, content_type='application/json')
@@ -0,0 +1,22 @@
+import pickle
+from typing import AbstractSet, Iterable
+
+from refiner.irtk.flags import FlagSet
+from refiner.irtk.intent import Blockchain
+
+# a blockchain pool is stored as a bitmask of a single byte, one bit per blockchain
+ENCODED_LENGTH = len(FlagSet(Blockchain).to_bytes())
+
+
+def dump_blockchain_pool(blockchain_pool: Iterable[Blockchain]) -> bytes:
+    """encodes a blockchain pool as a bitmask to be stored in the blockchain_pool field of a Policy"""
+    return FlagSet(Blockchain, blockchain_pool).to_bytes()
+
+
+def load_blockchain_pool(data: bytes) -> AbstractSet[Blockchain]:
+    """decodes the blockchain_pool field of a Policy. Blockchain pools stored before they were encoded as bitmasks
+    are pickled sets, which are longer than a bitmask"""
+    data = bytes(data)
+    if len(data) > ENCODED_LENGTH:
+        return FlagSet(Blockchain, pickle.loads(data))
+    return FlagSet.from_bytes(Blockchain, data)
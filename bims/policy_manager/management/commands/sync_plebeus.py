@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from policy_manager.outbox import deliver_changes
+
+
+class Command(BaseCommand):
+    help = 'Applies the pending changes of policies to PleBeuS. Instances running at the same time apply batches one ' \
+           'after another.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.PLEBEUS_OUTBOX_BATCH_SIZE,
+                            help='maximum number of changes applied at once')
+        parser.add_argument('--interval', type=float, default=settings.PLEBEUS_OUTBOX_INTERVAL,
+                            help='seconds to wait if there are no pending changes')
+        parser.add_argument('--once', action='store_true', help='apply a single batch of changes and exit')
+
+    def handle(self, *args, **options):
+        # seconds to wait before the next batch, grows while every change of a batch fails to let PleBeuS recover
+        delay = 0
+        try:
+            while True:
+                close_old_connections()
+                applied, failed = deliver_changes(options['batch_size'])
+                if applied or failed:
+                    self.stdout.write('applied {} changes, {} failed'.format(applied, failed))
+                if options['once']:
+                    return
+                if failed and not applied:
+                    delay = min(max(2 * delay, options['interval']), settings.PLEBEUS_OUTBOX_MAX_RETRY_DELAY)
+                elif applied + failed < options['batch_size']:
+                    delay = options['interval']
+                else:
+                    delay = 0
+                time.sleep(delay)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def encode_blockchain_pools(apps, schema_editor):
+    """re-encodes the pickled blockchain pools of all policies as bitmasks"""
+    from policy_manager.blockchain_pool import dump_blockchain_pool, load_blockchain_pool
+    Policy = apps.get_model('policy_manager', 'Policy')
+    for policy in Policy.objects.all().only('id', 'blockchain_pool'):
+        policy.blockchain_pool = dump_blockchain_pool(load_blockchain_pool(policy.blockchain_pool))
+        policy.save(update_fields=['blockchain_pool'])
+
+
+def decode_blockchain_pools(apps, schema_editor):
+    """pickles the blockchain pools of all policies again"""
+    import pickle
+    from policy_manager.blockchain_pool import load_blockchain_pool
+    Policy = apps.get_model('policy_manager', 'Policy')
+    for policy in Policy.objects.all().only('id', 'blockchain_pool'):
+        policy.blockchain_pool = pickle.dumps(set(load_blockchain_pool(policy.blockchain_pool)))
+        policy.save(update_fields=['blockchain_pool'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_manager', '0002_policy_pbs_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(encode_blockchain_pools, decode_blockchain_pools),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.0.9 on 2026-10-18 15:38
+
+from django.db import migrations, models
+
+
+def store_known_users(apps, schema_editor):
+    """stores the users of all policies saved to PleBeuS, since PleBeuS has a default policy of these users"""
+    Policy = apps.get_model('policy_manager', 'Policy')
+    PlebeusUser = apps.get_model('policy_manager', 'PlebeusUser')
+    users = Policy.objects.exclude(pbs_id='').values_list('user', flat=True).distinct()
+    PlebeusUser.objects.bulk_create([PlebeusUser(user=user) for user in users])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_manager', '0003_policy_blockchain_pool_bitmask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlebeusUser',
+            fields=[
+                ('user', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(store_known_users, migrations.RunPython.noop),
+    ]
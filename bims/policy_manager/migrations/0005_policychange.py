@@ -0,0 +1,29 @@
+# Generated by Django 3.0.9 on 2026-10-18 15:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_manager', '0004_plebeususer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PolicyChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('save', 'save'), ('delete', 'delete')], max_length=6)),
+                ('user', models.CharField(db_index=True, max_length=100)),
+                ('pbs_id', models.CharField(blank=True, max_length=100)),
+                ('attempts', models.IntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('policy', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='policy_manager.Policy')),
+            ],
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 3.0.9 on 2026-10-18 15:44
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+# values of the enums of the IRTK and codes of the blockchains in PleBeuS when this migration was written, in the order
+# of the bits of a blockchain pool bitmask
+COST_PROFILES = {'ECONOMIC': 'economic', 'PERFORMANCE': 'performance'}
+INTERVALS = {'DEFAULT': 'default', 'DAILY': 'daily', 'WEEKLY': 'weekly', 'MONTHLY': 'monthly', 'YEARLY': 'yearly'}
+BLOCKCHAIN_TYPES = {'INDIFFERENT': 'indifferent', 'PRIVATE': 'private', 'PUBLIC': 'public'}
+TIMES = {'DEFAULT': '00:00', 'DAY_START': '06:00', 'AFTERNOON_START': '12:00', 'NIGHT_START': '18:00'}
+BLOCKCHAINS = ['BTC', 'EOS', 'ETH', 'HYP', 'MIOTA', 'MLC', 'XLM']
+
+
+def enum_value(values: dict, stored: str) -> str:
+    """returns the value of an enum member stored as its value or as str(member), e.g. 'Interval.DAILY'"""
+    if stored in values.values():
+        return stored
+    return values[stored.rsplit('.', 1)[-1]]
+
+
+def content_hash(policy) -> int:
+    """returns the hash of the data of a policy sent to PleBeuS, as PleBeuS.content_hash did when this migration was
+    written"""
+    mask = int.from_bytes(bytes(policy.blockchain_pool), 'little')
+    if mask >> len(BLOCKCHAINS):
+        raise ValueError('invalid blockchain pool')
+    data = {
+        'preferredBC': sorted(code for bit, code in enumerate(BLOCKCHAINS) if mask & 1 << bit),
+        'currency': policy.currency_id,
+        'bcTuringComplete': str(policy.turing_complete).lower(),
+        'split': str(policy.split_txs).lower(),
+        'timeFrameStart': enum_value(TIMES, policy.timeframe_start),
+        'timeFrameEnd': enum_value(TIMES, policy.timeframe_end),
+        'costProfile': enum_value(COST_PROFILES, policy.cost_profile),
+        '_id': '',
+        'username': policy.user,
+        'cost': policy.threshold,
+        'bcType': enum_value(BLOCKCHAIN_TYPES, policy.blockchain_type),
+        'interval': enum_value(INTERVALS, policy.interval),
+        'bcTps': policy.min_tx_rate,
+        'bcBlockTime': policy.max_block_time,
+        'bcDataSize': policy.min_data_size,
+    }
+    digest = hashlib.blake2b(json.dumps(data, sort_keys=True).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def store_content_hashes(apps, schema_editor):
+    """stores the hashes of the data of all policies sent to PleBeuS. Policies whose fields cannot be mapped to that
+    data keep no hash and are saved to PleBeuS again on their next update"""
+    Policy = apps.get_model('policy_manager', 'Policy')
+    for policy in Policy.objects.all():
+        try:
+            policy.content_hash = content_hash(policy)
+        except (KeyError, ValueError):
+            continue
+        policy.save(update_fields=['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_manager', '0005_policychange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='policy',
+            name='content_hash',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.RunPython(store_content_hashes, migrations.RunPython.noop),
+    ]
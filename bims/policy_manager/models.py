@@ -1,7 +1,20 @@
 from django.db import models
+from django.utils import timezone
 from intent_manager.models import Intent
 from refiner.models import Currency
-from .policy_manager import PolicyManager
+from refiner.irtk.policy import Policy as irtkPolicy, CostProfile, Interval, BlockchainType, Currency as irtkCurrency, \
+    Time
+from .blockchain_pool import load_blockchain_pool
+from .policy_manager import PolicyChangeManager, PolicyManager
+
+
+def _member(kind, value: str):
+    """returns the member of an enum stored as its value, e.g. 'public' as stored by the translator for the blockchain
+    type, or as str(member), e.g. 'Interval.DAILY'"""
+    try:
+        return kind(value)
+    except ValueError:
+        return kind[value.rsplit('.', 1)[-1]]
 
 
 class Policy(models.Model):
@@ -18,8 +31,8 @@ class Policy(models.Model):
     threshold = models.FloatField(default=0)
     split_txs = models.BooleanField(default=False)
 
-    # blockchain_pool is pickled and stored as a binary string.
-    # To unpickle: pickle.loads(blockchain_pool)
+    # blockchain_pool is encoded as a bitmask and stored as a binary string.
+    # To decode: policy_manager.blockchain_pool.load_blockchain_pool(blockchain_pool)
     blockchain_pool = models.BinaryField(max_length=300)
     blockchain_type = models.CharField(max_length=100)
     min_tx_rate = models.IntegerField(default=4)
@@ -32,4 +45,59 @@ class Policy(models.Model):
     encryption = models.BooleanField(default=False)
     redundancy = models.BooleanField(default=False)
 
+    # hash of the data sent to PleBeuS, see PleBeuS.content_hash. Null for policies stored before it was added
+    content_hash = models.BigIntegerField(null=True)
+
     objects = PolicyManager()
+
+    def as_raw_policy(self) -> irtkPolicy:
+        """returns the policy as an output of the IRTK, as it was created from"""
+        return irtkPolicy(
+            user=self.user,
+            cost_profile=_member(CostProfile, self.cost_profile),
+            timeframe_start=_member(Time, self.timeframe_start),
+            timeframe_end=_member(Time, self.timeframe_end),
+            interval=_member(Interval, self.interval),
+            currency=irtkCurrency[self.currency_id],
+            threshold=self.threshold,
+            split_txs=self.split_txs,
+            blockchain_pool=load_blockchain_pool(self.blockchain_pool),
+            blockchain_type=_member(BlockchainType, self.blockchain_type),
+            min_tx_rate=self.min_tx_rate,
+            max_block_time=self.max_block_time,
+            min_data_size=self.min_data_size,
+            max_tx_cost=self.max_tx_cost,
+            min_popularity=self.min_popularity,
+            min_stability=self.min_stability,
+            turing_complete=self.turing_complete,
+            encryption=self.encryption,
+            redundancy=self.redundancy,
+        )
+
+
+class PlebeusUser(models.Model):
+    """user known to have a default policy in PleBeuS, which allows to save policies of the user without checking this
+    in PleBeuS first. See policy_manager.plebeus.KnownUsers"""
+    user = models.CharField(max_length=100, primary_key=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class PolicyChange(models.Model):
+    """change of a policy that still has to be applied to PleBeuS (transactional outbox). Changes are stored in the same
+    transaction as the policies and applied in order by the sync_plebeus command, see policy_manager.outbox"""
+    SAVE = 'save'
+    DELETE = 'delete'
+    ACTIONS = [(SAVE, 'save'), (DELETE, 'delete')]
+
+    action = models.CharField(max_length=6, choices=ACTIONS)
+    # policy to save, null if the policy was deleted before it was saved to PleBeuS
+    policy = models.ForeignKey(Policy, null=True, on_delete=models.SET_NULL, related_name='+')
+    user = models.CharField(max_length=100, db_index=True)
+    # pbs_id of the policy to delete
+    pbs_id = models.CharField(max_length=100, blank=True)
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = PolicyChangeManager()
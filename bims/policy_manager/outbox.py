@@ -0,0 +1,92 @@
+import datetime
+import random
+from typing import Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from policy_manager.models import Policy, PolicyChange
+from policy_manager.plebeus import PleBeuS
+
+
+# key of the PostgreSQL advisory lock held while changes are applied, see lock_outbox
+OUTBOX_LOCK = 0x706c6562
+
+
+def lock_outbox() -> bool:
+    """takes the lock of the outbox until the end of the current transaction and returns whether it was free. Only
+    PostgreSQL supports the lock, with other databases only a single sync_plebeus command may run"""
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_xact_lock(%s)', [OUTBOX_LOCK])
+        return cursor.fetchone()[0]
+
+
+def retry_delay(attempts: int) -> datetime.timedelta:
+    """returns the jittered, exponentially growing delay before a change is retried after it failed attempts times"""
+    delay = min(settings.PLEBEUS_OUTBOX_MAX_RETRY_DELAY, settings.PLEBEUS_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+    return datetime.timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+def pending_changes(batch_size: int) -> list:
+    """returns at most batch_size due changes in the order they were added. The changes of a user are applied in order,
+    hence changes of users with a change that waits for a retry are not due"""
+    now = timezone.now()
+    waiting = PolicyChange.objects.filter(next_attempt_at__gt=now).values('user')
+    return list(PolicyChange.objects.filter(next_attempt_at__lte=now).exclude(user__in=waiting)
+                .select_related('policy').order_by('id')[:batch_size])
+
+
+def deliver_changes(batch_size: int = None) -> Tuple[int, int]:
+    """Applies a batch of pending changes to PleBeuS and removes the applied changes. Failed changes are retried later
+    with backoff. Only one process applies changes at a time, otherwise the changes of a user may be applied out of
+    order, hence no changes are applied while another process holds the lock of the outbox.
+    Returns the numbers of applied and failed changes."""
+    with transaction.atomic():
+        if not lock_outbox():
+            return 0, 0
+        return _deliver_changes(pending_changes(batch_size or settings.PLEBEUS_OUTBOX_BATCH_SIZE))
+
+
+def _deliver_changes(changes: list) -> Tuple[int, int]:
+    # a policy is saved as it is now, hence only the last change to save a policy has to be applied
+    last_saves = {change.policy_id: change for change in changes if change.action == PolicyChange.SAVE}
+    superseded = [change for change in changes if change.action == PolicyChange.SAVE and
+                  (change.policy is None or last_saves[change.policy_id] is not change)]
+    changes = [change for change in changes if change not in superseded]
+
+    # a change whose policy cannot be sent fails without stopping the others, the later changes of its user wait for it
+    results, requests, failed_users = {}, [], set()
+    for change in changes:
+        if change.user in failed_users:
+            continue
+        try:
+            requests.append((change, (change.user, change.policy.as_raw_policy(), change.policy.pbs_id)
+                             if change.action == PolicyChange.SAVE else (change.user, None, change.pbs_id)))
+        except Exception as error:
+            results[change] = error
+            failed_users.add(change.user)
+    results.update(zip([change for change, _ in requests],
+                       PleBeuS().sync_policies([request for _, request in requests])))
+
+    applied, failed = [change.id for change in superseded], 0
+    for change in changes:
+        result = results.get(change)
+        if result is None:
+            continue
+        if isinstance(result, Exception):
+            failed += 1
+            change.attempts += 1
+            change.next_attempt_at = timezone.now() + retry_delay(change.attempts)
+            change.last_error = getattr(result, 'message', str(result)) or ''
+            change.save(update_fields=['attempts', 'next_attempt_at', 'last_error'])
+            continue
+        applied.append(change.id)
+        if change.action == PolicyChange.SAVE and \
+                not Policy.objects.filter(id=change.policy_id).update(pbs_id=result):
+            # the policy was deleted while it was saved to PleBeuS
+            PolicyChange.objects.create(action=PolicyChange.DELETE, user=change.user, pbs_id=result)
+    PolicyChange.objects.filter(id__in=applied).delete()
+    return len(applied) - len(superseded), failed
@@ -1,8 +1,69 @@
 from django.conf import settings
-import requests
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import hashlib
 import json
+from .plebeusClient import PlebeusClient
 from .plebeusException import PlebeusException
-from requests.exceptions import ConnectionError
+from requests.exceptions import ConnectionError, Timeout
+
+# shared by all PleBeuS instances, so that connections to PleBeuS are reused across requests
+client = PlebeusClient.from_settings()
+
+
+class KnownUsers:
+    """Users known to have a default policy in PleBeuS. Policies of these users are saved without checking first
+    whether PleBeuS has a default policy of the user. The users are kept in an in-process set and stored in the
+    PlebeusUser table, so that they are shared between processes. add and discard only change the set and can be used
+    by concurrent workers, load and flush read and write the table."""
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__users = set()
+        self.__changes = {}
+
+    def __contains__(self, user: str) -> bool:
+        return user in self.__users
+
+    def load(self, users) -> None:
+        """reads the users that are not known in-process yet from the database"""
+        from .models import PlebeusUser
+        missing = set(users) - self.__users
+        if missing:
+            known = PlebeusUser.objects.filter(user__in=missing).values_list('user', flat=True)
+            with self.__lock:
+                self.__users.update(known)
+
+    def add(self, user: str) -> None:
+        with self.__lock:
+            self.__users.add(user)
+            self.__changes[user] = True
+
+    def discard(self, user: str) -> None:
+        with self.__lock:
+            self.__users.discard(user)
+            self.__changes[user] = False
+
+    def flush(self) -> None:
+        """writes the users added or discarded since the last flush to the database"""
+        from .models import PlebeusUser
+        with self.__lock:
+            changes, self.__changes = self.__changes, {}
+        if not changes:
+            return
+        PlebeusUser.objects.filter(user__in=[user for user, known in changes.items() if not known]).delete()
+        PlebeusUser.objects.bulk_create([PlebeusUser(user=user) for user, known in changes.items() if known],
+                                        ignore_conflicts=True)
+
+    def clear(self) -> None:
+        """forgets all users in-process, e.g. if PleBeuS was reset"""
+        with self.__lock:
+            self.__users.clear()
+            self.__changes.clear()
+
+
+known_users = KnownUsers()
 
 
 class PleBeuS:
@@ -49,6 +110,14 @@ class PleBeuS:
             'bcDataSize': policy.min_data_size,
         })
 
+    def content_hash(self, policy) -> int:
+        """Returns a signed 64-bit hash of the data of a policy sent to PleBeuS, without its pbs_id. Policies with the
+        same hash are equal in PleBeuS."""
+        data = json.loads(self.__construct_policy_data(policy, ''))
+        data['preferredBC'].sort()
+        digest = hashlib.blake2b(json.dumps(data, sort_keys=True).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big', signed=True)
+
     @staticmethod
     def __construct_default_policy_data(user: str):
         return json.dumps({
@@ -74,34 +143,96 @@ class PleBeuS:
         """Helper function, returns boolean if policy is a default policy or not"""
         return policy.interval.value == 'default'
 
-    def save_policy(self, policy, pbs_id: str) -> str:
-        """Makes a POST request to PleBeuS. Either creates a new Policy or updates an existing one if a pbs_id is
-        provided. Returns the pbs_id"""
-        if not settings.USE_PLEBEUS:
-            return ''
+    def __save_policy(self, policy, pbs_id: str) -> str:
+        """Saves a policy to PleBeuS. Unless the user is known to have a default policy in PleBeuS, checks this first
+        and creates the default policy if necessary."""
         try:
-            get_user_response = requests.get(self.pbs_url + '/policies/' + policy.user)
-            if get_user_response.status_code == 404 and not self.__is_default_policy(policy):
-                # need to create a default policy first
-                default_policy_response = requests.post(self.pbs_url + '/api/policies',
-                                                        self.__construct_default_policy_data(policy.user),
-                                                        headers=self.headers)
-                if default_policy_response.status_code != 201:
-                    # error when creating default policy
-                    raise PlebeusException(json.loads(default_policy_response.text).get('message'))
+            known = policy.user in known_users
+            if not known and not self.__is_default_policy(policy):
+                get_user_response = client.get(self.pbs_url + '/policies/' + policy.user)
+                if get_user_response.status_code == 404:
+                    # need to create a default policy first
+                    default_policy_response = client.post(self.pbs_url + '/api/policies',
+                                                          self.__construct_default_policy_data(policy.user),
+                                                          headers=self.headers)
+                    if default_policy_response.status_code != 201:
+                        # error when creating default policy
+                        raise PlebeusException(json.loads(default_policy_response.text).get('message'))
+                    known_users.add(policy.user)
+                elif get_user_response.status_code == 200:
+                    known_users.add(policy.user)
             data = self.__construct_policy_data(policy, pbs_id)
-            response = requests.post(self.pbs_url + '/api/policies', data, headers=self.headers)
+            response = client.post(self.pbs_url + '/api/policies', data, headers=self.headers)
+            if response.status_code == 404 and known:
+                # the user is not known to PleBeuS anymore, check again
+                known_users.discard(policy.user)
+                return self.__save_policy(policy, pbs_id)
             if response.status_code != 201:
                 raise PlebeusException(json.loads(response.text).get('message'))
+            if self.__is_default_policy(policy):
+                known_users.add(policy.user)
             return json.loads(response.text).get('policy').get('_id')
         except ConnectionError:
             raise PlebeusException('Connection to PleBeuS failed')
+        except Timeout:
+            raise PlebeusException('PleBeuS did not respond in time')
+
+    def save_policy(self, policy, pbs_id: str) -> str:
+        """Makes a POST request to PleBeuS. Either creates a new Policy or updates an existing one if a pbs_id is
+        provided. Returns the pbs_id"""
+        if not settings.USE_PLEBEUS:
+            return ''
+        known_users.load([policy.user])
+        try:
+            return self.__save_policy(policy, pbs_id)
+        finally:
+            known_users.flush()
 
     def delete_policy(self, pbs_id: str) -> None:
         """Makes a DELETE request to PleBeuS."""
         if not settings.USE_PLEBEUS:
             return
         try:
-            requests.delete(self.pbs_url + '/api/policy/' + pbs_id)
+            response = client.delete(self.pbs_url + '/api/policy/' + pbs_id)
+            if response.status_code in (500, 502, 503, 504):
+                # the policy may not have been deleted, a policy that does not exist is not an error
+                raise PlebeusException('Deleting the policy in PleBeuS failed')
         except ConnectionError:
             raise PlebeusException('Connection to PleBeuS failed')
+        except Timeout:
+            raise PlebeusException('PleBeuS did not respond in time')
+
+    def sync_policies(self, changes: list) -> list:
+        """Saves and deletes policies in PleBeuS concurrently with at most PLEBEUS_WORKERS requests at a time. Takes a
+        list of triples of a user, a Policy to save and its pbs_id ('' for a new policy), or of a user, None and the
+        pbs_id of a policy to delete. The changes of a user are applied one after another in order, since saving the
+        first policy of a new user also creates its default policy. If a change of a user fails, the later changes of
+        the user are not applied. Returns a result for every change in order: the pbs_id of a saved policy, '' for a
+        deleted policy, the PlebeusException if the change failed or None if it was not applied."""
+        if not settings.USE_PLEBEUS or not changes:
+            return ['' for _ in changes]
+
+        users = defaultdict(list)
+        for index, (user, _, _) in enumerate(changes):
+            users[user].append(index)
+        results = [None] * len(changes)
+        known_users.load(users)
+
+        def sync_user_policies(indices):
+            for index in indices:
+                _, policy, pbs_id = changes[index]
+                try:
+                    if policy is None:
+                        self.delete_policy(pbs_id)
+                        results[index] = ''
+                    else:
+                        results[index] = self.__save_policy(policy, pbs_id)
+                except PlebeusException as error:
+                    results[index] = error
+                    return
+
+        with ThreadPoolExecutor(max_workers=min(settings.PLEBEUS_WORKERS, len(users))) as executor:
+            for future in [executor.submit(sync_user_policies, indices) for indices in users.values()]:
+                future.result()
+        known_users.flush()
+        return results
@@ -0,0 +1,71 @@
+from django.conf import settings
+import random
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+
+class PlebeusClient:
+    """HTTP client for PleBeuS. Keeps the connections to PleBeuS alive in a pool of a shared session instead of opening
+    a new connection for every request, applies connect and read timeouts to every request and retries idempotent
+    requests with jittered exponential backoff if the connection fails or PleBeuS is temporarily unavailable."""
+
+    idempotent_methods = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+    retry_status_codes = frozenset({502, 503, 504})
+
+    def __init__(self, connect_timeout: float = 3.05, read_timeout: float = 10.0, retries: int = 2,
+                 backoff: float = 0.1, max_backoff: float = 2.0, pool_size: int = 10):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @classmethod
+    def from_settings(cls) -> 'PlebeusClient':
+        """Returns a client configured with the PLEBEUS_* settings."""
+        return cls(connect_timeout=settings.PLEBEUS_CONNECT_TIMEOUT,
+                   read_timeout=settings.PLEBEUS_READ_TIMEOUT,
+                   retries=settings.PLEBEUS_RETRIES,
+                   backoff=settings.PLEBEUS_BACKOFF,
+                   max_backoff=settings.PLEBEUS_MAX_BACKOFF,
+                   pool_size=settings.PLEBEUS_POOL_SIZE)
+
+    def __delay(self, attempt: int) -> float:
+        """Returns a random delay before the next attempt ("full jitter"), so that retries of concurrent requests are
+        spread out instead of hitting PleBeuS at the same time."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Makes a request with the session. Idempotent requests are retried up to `retries` times. Raises a
+        ConnectionError or Timeout if the last attempt fails."""
+        kwargs.setdefault('timeout', self.timeout)
+        retries = self.retries if method.upper() in self.idempotent_methods else 0
+        for attempt in range(retries + 1):
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (ConnectionError, Timeout):
+                if attempt == retries:
+                    raise
+            else:
+                if response.status_code not in self.retry_status_codes or attempt == retries:
+                    return response
+            time.sleep(self.__delay(attempt))
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, data=None, **kwargs) -> requests.Response:
+        return self.request('POST', url, data=data, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self) -> None:
+        """Closes all pooled connections."""
+        self.session.close()
@@ -1,24 +1,17 @@
-from django.db import models
+from django.conf import settings
+from django.db import connection, models, transaction
+from policy_manager.blockchain_pool import dump_blockchain_pool
 from policy_manager.plebeus import PleBeuS
-import pickle
+from policy_manager.plebeusException import PlebeusException
 
 
 class PolicyManager(models.Manager):
     """Manager class for Policy model"""
 
-    def create_policy(self, raw_policy, intent_id):
-        """
-        Creates a Policy and stores it in the database. Takes the output of the IRTK and
-        an intent_id as a foreign key to the parent intent as input.
-        Also saves the policy to PleBeuS. The id of the policy in PleBeuS is also stored.
-        Returns the created policy.
-        """
-
-        # save policy to PleBeuS
-        pbs = PleBeuS()
-        pbs_id = pbs.save_policy(raw_policy, '')
-
-        policy = self.create(
+    def build_policy(self, raw_policy, intent_id, pbs_id=''):
+        """Returns an unsaved Policy with the fields of the output of the IRTK, an intent_id as a foreign key to the
+        parent intent and the id of the policy in PleBeuS."""
+        return self.model(
             intent_id_id=intent_id,
             pbs_id=pbs_id,
             user=raw_policy.user,
@@ -29,7 +22,7 @@ class PolicyManager(models.Manager):
             currency_id=raw_policy.currency.name,
             threshold=raw_policy.threshold,
             split_txs=raw_policy.split_txs,
-            blockchain_pool=pickle.dumps(raw_policy.blockchain_pool),  # pickle the set containing the blockchain_pool
+            blockchain_pool=dump_blockchain_pool(raw_policy.blockchain_pool),  # encode the blockchain_pool as bitmask
             blockchain_type=str(raw_policy.blockchain_type),
             min_tx_rate=raw_policy.min_tx_rate,
             max_block_time=raw_policy.max_block_time,
@@ -40,5 +33,60 @@ class PolicyManager(models.Manager):
             turing_complete=raw_policy.turing_complete,
             encryption=raw_policy.encryption,
             redundancy=raw_policy.redundancy,
+            content_hash=PleBeuS().content_hash(raw_policy),
         )
-        return policy
+
+    def create_policy(self, raw_policy, intent_id):
+        """
+        Creates a Policy and stores it in the database. Takes the output of the IRTK and
+        an intent_id as a foreign key to the parent intent as input.
+        The policy is saved to PleBeuS later by the sync_plebeus command, which also stores the id of the policy in
+        PleBeuS. Returns the created policy.
+        """
+        return self.create_policies([(raw_policy, intent_id)])[0]
+
+    def create_policies(self, raw_policies, batch_size=None):
+        """
+        Creates many Policies and stores them in the database with bulk inserts of at most batch_size rows, by default
+        the largest batch the database supports, if the database returns the ids of inserted rows. Takes an iterable
+        of pairs of an output of the IRTK and the intent_id of its parent intent as input.
+        The changes to save the policies to PleBeuS are stored in the same transaction. Returns the created policies.
+        """
+        from policy_manager.models import PolicyChange
+        policies = [self.build_policy(raw_policy, intent_id) for raw_policy, intent_id in raw_policies]
+        with transaction.atomic(using=self.db):
+            if connection.features.can_return_rows_from_bulk_insert:
+                self.bulk_create(policies, batch_size=batch_size)
+            else:
+                for policy in policies:
+                    policy.save(force_insert=True, using=self.db)
+            PolicyChange.objects.add_saves(policies)
+        return policies
+
+
+class PolicyChangeManager(models.Manager):
+    """Manager class for PolicyChange model, the outbox of changes of policies to be applied to PleBeuS"""
+
+    def check_pending(self):
+        """raises a PlebeusException if there are too many pending changes, e.g. because PleBeuS is not available, so
+        that no more changes are accepted until the sync_plebeus command caught up"""
+        limit = settings.PLEBEUS_OUTBOX_MAX_PENDING
+        # counts at most limit changes instead of all of them
+        if self.all()[:limit].count() >= limit:
+            raise PlebeusException('Too many changes are waiting for PleBeuS, try again later')
+
+    def add_saves(self, policies):
+        """adds changes to save the given policies to PleBeuS"""
+        if settings.USE_PLEBEUS and policies:
+            self.check_pending()
+            self.bulk_create([self.model(action=self.model.SAVE, policy=policy, user=policy.user)
+                              for policy in policies])
+
+    def add_deletes(self, policies):
+        """adds changes to delete the given policies from PleBeuS. Policies that were not saved to PleBeuS yet are
+        skipped, their pending changes are dropped once the policies are deleted"""
+        changes = [self.model(action=self.model.DELETE, user=policy.user, pbs_id=policy.pbs_id)
+                   for policy in policies if policy.pbs_id]
+        if settings.USE_PLEBEUS and changes:
+            self.check_pending()
+            self.bulk_create(changes)
@@ -0,0 +1,211 @@
+from io import StringIO
+from unittest.mock import Mock, patch
+import dataclasses
+import datetime
+import json
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from intent_manager.models import Intent
+from policy_manager.models import Policy, PolicyChange
+from policy_manager.outbox import deliver_changes
+from policy_manager.plebeus import known_users
+from policy_manager.plebeusException import PlebeusException
+from refiner.models import Currency
+from refiner.irtk.policy import Policy as irtkPolicy, CostProfile, Interval, BlockchainType, Currency as irtkCurrency, \
+    Time
+from refiner.irtk.intent import Blockchain, Filter
+from user_manager.models import User
+
+
+@override_settings(USE_PLEBEUS=True)
+@patch('policy_manager.plebeus.client.delete')
+@patch('policy_manager.plebeus.client.get')
+@patch('policy_manager.plebeus.client.post')
+class OutboxTests(TestCase):
+
+    policy = irtkPolicy(
+        user='client1',
+        cost_profile=CostProfile.PERFORMANCE,
+        timeframe_start=Time.DEFAULT,
+        timeframe_end=Time.DEFAULT,
+        interval=Interval.DAILY,
+        currency=irtkCurrency.USD,
+        threshold=24.0,
+        split_txs=False,
+        blockchain_pool={Blockchain.BITCOIN, Blockchain.EOS},
+        blockchain_type=BlockchainType.INDIFFERENT,
+        min_tx_rate=4,
+        max_block_time=600,
+        min_data_size=20,
+        max_tx_cost=0.0,
+        min_popularity=0.0,
+        min_stability=0.0,
+        turing_complete=False,
+        encryption=False,
+        redundancy=False
+    )
+
+    def setUp(self) -> None:
+        known_users.clear()
+        Currency.objects.create(currency='USD', exchange_rate=1)
+        user = User.objects.create_user(username='testUser0', password='password')
+        self.intent = Intent.objects.create(username=user, intent_string='for client1 select eos as default')
+
+    @staticmethod
+    def response(status_code: int, pbs_id: str = '') -> Mock:
+        return Mock(status_code=status_code, text=json.dumps({'message': 'error', 'policy': {'_id': pbs_id}}))
+
+    def create_policies(self, *users: str) -> list:
+        return Policy.objects.create_policies((dataclasses.replace(self.policy, user=user), self.intent.id)
+                                              for user in users)
+
+    def test_as_raw_policy(self, mock_post, mock_get, mock_delete):
+        policy = Policy.objects.build_policy(self.policy, self.intent.id)
+
+        self.assertEqual(policy.as_raw_policy(), self.policy)
+
+    def test_as_raw_policy_of_blockchain_type_filter(self, mock_post, mock_get, mock_delete):
+        """the translator stores the blockchain type of public and private filters as the value of the filter"""
+        for blockchain_type in (Filter.PUBLIC, Filter.PRIVATE):
+            raw_policy = dataclasses.replace(self.policy, blockchain_type=blockchain_type.value)
+            policy = Policy.objects.build_policy(raw_policy, self.intent.id)
+
+            self.assertEqual(policy.as_raw_policy().blockchain_type, BlockchainType(blockchain_type.value))
+
+    def test_create_policies(self, mock_post, mock_get, mock_delete):
+        """policies are not saved to PleBeuS when they are created, but changes to save them are stored"""
+        policies = self.create_policies('client1', 'client2')
+
+        changes = PolicyChange.objects.order_by('id')
+        self.assertEqual([(change.action, change.policy_id, change.user) for change in changes],
+                         [(PolicyChange.SAVE, policy.id, policy.user) for policy in policies])
+        mock_post.assert_not_called()
+
+    @override_settings(USE_PLEBEUS=False)
+    def test_create_policies_without_plebeus(self, mock_post, mock_get, mock_delete):
+        self.create_policies('client1')
+
+        self.assertFalse(PolicyChange.objects.exists())
+
+    def test_deliver_changes(self, mock_post, mock_get, mock_delete):
+        policies = self.create_policies('client1', 'client2')
+        PolicyChange.objects.add_deletes([Policy(user='client1', pbs_id='123')])
+        mock_get.return_value = self.response(200)
+        mock_post.side_effect = lambda url, data, headers: self.response(201, 'id-' + json.loads(data)['username'])
+        mock_delete.return_value = self.response(204)
+
+        self.assertEqual(deliver_changes(), (3, 0))
+
+        self.assertEqual([Policy.objects.get(id=policy.id).pbs_id for policy in policies], ['id-client1', 'id-client2'])
+        self.assertFalse(PolicyChange.objects.exists())
+        self.assertEqual(deliver_changes(), (0, 0))
+
+    def test_deliver_changes_of_blockchain_type_filters(self, mock_post, mock_get, mock_delete):
+        filters = {'client1': Filter.PUBLIC, 'client2': Filter.PRIVATE}
+        Policy.objects.create_policies((dataclasses.replace(self.policy, user=user, blockchain_type=filter.value),
+                                        self.intent.id) for user, filter in filters.items())
+        mock_get.return_value = self.response(200)
+        mock_post.return_value = self.response(201, '829919')
+
+        self.assertEqual(deliver_changes(), (2, 0))
+
+        self.assertEqual([json.loads(call[0][1])['bcType'] for call in mock_post.call_args_list], ['public', 'private'])
+        self.assertFalse(PolicyChange.objects.exists())
+
+    def test_deliver_changes_failed(self, mock_post, mock_get, mock_delete):
+        """a failed change is retried later, the later changes of the user wait for it"""
+        policy, = self.create_policies('client1')
+        PolicyChange.objects.add_deletes([Policy(user='client1', pbs_id='123')])
+        mock_get.return_value = self.response(200)
+        mock_post.return_value = self.response(500)
+        mock_delete.return_value = self.response(204)
+
+        self.assertEqual(deliver_changes(), (0, 1))
+
+        change = PolicyChange.objects.get(action=PolicyChange.SAVE)
+        self.assertEqual(change.attempts, 1)
+        self.assertEqual(change.last_error, 'error')
+        self.assertGreater(change.next_attempt_at, timezone.now())
+        mock_delete.assert_not_called()
+        self.assertEqual(deliver_changes(), (0, 0))
+
+        PolicyChange.objects.update(next_attempt_at=timezone.now() - datetime.timedelta(seconds=1))
+        mock_post.return_value = self.response(201, '829919')
+
+        self.assertEqual(deliver_changes(), (2, 0))
+        self.assertEqual(Policy.objects.get(id=policy.id).pbs_id, '829919')
+        mock_delete.assert_called_once()
+
+    def test_deliver_changes_of_invalid_policy(self, mock_post, mock_get, mock_delete):
+        """a change of a policy that cannot be sent fails, the changes of other users are applied"""
+        invalid, policy = self.create_policies('client1', 'client2')
+        Policy.objects.filter(id=invalid.id).update(cost_profile='CostProfile.UNKNOWN')
+        PolicyChange.objects.add_deletes([Policy(user='client1', pbs_id='123')])
+        mock_get.return_value = self.response(200)
+        mock_post.return_value = self.response(201, '829919')
+
+        self.assertEqual(deliver_changes(), (1, 1))
+
+        self.assertEqual(Policy.objects.get(id=policy.id).pbs_id, '829919')
+        change = PolicyChange.objects.get(action=PolicyChange.SAVE)
+        self.assertEqual((change.policy_id, change.attempts), (invalid.id, 1))
+        self.assertTrue(PolicyChange.objects.filter(action=PolicyChange.DELETE).exists())
+        mock_delete.assert_not_called()
+
+    def test_deliver_changes_locked(self, mock_post, mock_get, mock_delete):
+        """no changes are applied while another process applies changes"""
+        self.create_policies('client1')
+
+        with patch('policy_manager.outbox.lock_outbox', return_value=False):
+            self.assertEqual(deliver_changes(), (0, 0))
+
+        mock_post.assert_not_called()
+        self.assertTrue(PolicyChange.objects.exists())
+
+    def test_deliver_superseded_changes(self, mock_post, mock_get, mock_delete):
+        """a policy that changed several times is saved once, a deleted policy is not saved"""
+        policy, deleted = self.create_policies('client1', 'client2')
+        PolicyChange.objects.add_saves([policy])
+        deleted.delete()
+        mock_get.return_value = self.response(200)
+        mock_post.return_value = self.response(201, '829919')
+
+        self.assertEqual(deliver_changes(), (1, 0))
+
+        mock_post.assert_called_once()
+        self.assertFalse(PolicyChange.objects.exists())
+
+    def test_deliver_changes_of_deleted_policy(self, mock_post, mock_get, mock_delete):
+        """a policy deleted while it is saved to PleBeuS is deleted from PleBeuS again"""
+        policy, = self.create_policies('client1')
+
+        def sync_policies(changes):
+            policy.delete()
+            return ['829919']
+        with patch('policy_manager.plebeus.PleBeuS.sync_policies', side_effect=sync_policies):
+            self.assertEqual(deliver_changes(), (1, 0))
+
+        change = PolicyChange.objects.get()
+        self.assertEqual((change.action, change.user, change.pbs_id), (PolicyChange.DELETE, 'client1', '829919'))
+
+    @override_settings(PLEBEUS_OUTBOX_MAX_PENDING=2)
+    def test_too_many_pending_changes(self, mock_post, mock_get, mock_delete):
+        self.create_policies('client1', 'client2')
+
+        self.assertRaisesMessage(PlebeusException, 'Too many changes are waiting for PleBeuS',
+                                 self.create_policies, 'client3')
+        self.assertEqual(Policy.objects.count(), 2)
+
+    def test_sync_plebeus(self, mock_post, mock_get, mock_delete):
+        self.create_policies('client1')
+        mock_get.return_value = self.response(200)
+        mock_post.return_value = self.response(201, '829919')
+        out = StringIO()
+
+        call_command('sync_plebeus', '--once', stdout=out)
+
+        self.assertIn('applied 1 changes, 0 failed', out.getvalue())
+        self.assertFalse(PolicyChange.objects.exists())
@@ -1,9 +1,15 @@
-from unittest.mock import PropertyMock, patch
+from unittest.mock import Mock, PropertyMock, patch
 from django.test import TestCase, override_settings
 from django.conf import settings
+from requests.exceptions import ConnectionError, ReadTimeout
+import dataclasses
 import json
+import threading
+import time
 
-from policy_manager.plebeus import PleBeuS
+from policy_manager.models import PlebeusUser
+from policy_manager.plebeus import PleBeuS, client, known_users
+from policy_manager.plebeusClient import PlebeusClient
 from policy_manager.plebeusException import PlebeusException
 from refiner.irtk.policy import Policy as irtkPolicy, CostProfile, Interval, BlockchainType, Currency as irtkCurrency, \
     Time
@@ -39,9 +45,12 @@ class PlebeusTests(TestCase):
         'policy': {'_id': '829919'}
     })
 
+    def setUp(self) -> None:
+        known_users.clear()
+
     @override_settings(USE_PLEBEUS=True)
-    @patch('policy_manager.plebeus.requests.get')
-    @patch('policy_manager.plebeus.requests.post')
+    @patch('policy_manager.plebeus.client.get')
+    @patch('policy_manager.plebeus.client.post')
     def test_create_policy_with_existing_user(self, mock_post, mock_get):
         type(mock_get.return_value).status_code = PropertyMock(return_value=200)
         type(mock_post.return_value).status_code = PropertyMock(return_value=201)
@@ -69,8 +78,8 @@ class PlebeusTests(TestCase):
                                           headers={'Content-Type': 'application/json'})
 
     @override_settings(USE_PLEBEUS=True)
-    @patch('policy_manager.plebeus.requests.get')
-    @patch('policy_manager.plebeus.requests.post')
+    @patch('policy_manager.plebeus.client.get')
+    @patch('policy_manager.plebeus.client.post')
     def test_save_policy_with_new_user(self, mock_post, mock_get):
         type(mock_get.return_value).status_code = PropertyMock(return_value=404)
         type(mock_post.return_value).status_code = PropertyMock(return_value=201)
@@ -116,8 +125,8 @@ class PlebeusTests(TestCase):
                                   headers={'Content-Type': 'application/json'})
 
     @override_settings(USE_PLEBEUS=True)
-    @patch('policy_manager.plebeus.requests.get')
-    @patch('policy_manager.plebeus.requests.post')
+    @patch('policy_manager.plebeus.client.get')
+    @patch('policy_manager.plebeus.client.post')
     def test_update_existing_policy(self, mock_post, mock_get):
         type(mock_get.return_value).status_code = PropertyMock(return_value=200)
         type(mock_post.return_value).status_code = PropertyMock(return_value=201)
@@ -147,8 +156,8 @@ class PlebeusTests(TestCase):
                                           headers={'Content-Type': 'application/json'})
 
     @override_settings(USE_PLEBEUS=True)
-    @patch('policy_manager.plebeus.requests.get')
-    @patch('policy_manager.plebeus.requests.post')
+    @patch('policy_manager.plebeus.client.get')
+    @patch('policy_manager.plebeus.client.post')
     def test_save_policy_failed(self, mock_post, mock_get):
         type(mock_get.return_value).status_code = PropertyMock(return_value=200)
         type(mock_post.return_value).status_code = PropertyMock(return_value=500)
@@ -160,8 +169,8 @@ class PlebeusTests(TestCase):
         mock_post.assert_called_once()
 
     @override_settings(USE_PLEBEUS=False)
-    @patch('policy_manager.plebeus.requests.get')
-    @patch('policy_manager.plebeus.requests.post')
+    @patch('policy_manager.plebeus.client.get')
+    @patch('policy_manager.plebeus.client.post')
     def test_save_policy_without_plebeus(self, mock_post, mock_get):
         res = self.pbs.save_policy(self.policy, '')
 
@@ -170,17 +179,204 @@ class PlebeusTests(TestCase):
         mock_post.assert_not_called()
 
     @override_settings(USE_PLEBEUS=False)
-    @patch('policy_manager.plebeus.requests.delete')
+    @patch('policy_manager.plebeus.client.delete')
     def test_delete_policy_without_plebeus(self, mock_delete):
         self.pbs.delete_policy('8238129')
 
         mock_delete.assert_not_called()
 
     @override_settings(USE_PLEBEUS=True)
-    @patch('policy_manager.plebeus.requests.delete')
+    @patch('policy_manager.plebeus.client.delete')
     def test_delete_policy(self, mock_delete):
         pbs_id = '123456789'
 
         self.pbs.delete_policy(pbs_id)
 
         mock_delete.assert_called_once_with(settings.PLEBEUS_URL + '/api/policy/' + pbs_id)
+
+    @override_settings(USE_PLEBEUS=True)
+    @patch('policy_manager.plebeus.client.delete')
+    def test_delete_policy_failed(self, mock_delete):
+        mock_delete.return_value = self.response(503)
+        self.assertRaises(PlebeusException, self.pbs.delete_policy, '123456789')
+
+        mock_delete.return_value = self.response(404)
+        self.pbs.delete_policy('123456789')
+
+    @override_settings(USE_PLEBEUS=True)
+    @patch('policy_manager.plebeus.client.delete')
+    def test_delete_policy_timeout(self, mock_delete):
+        mock_delete.side_effect = ReadTimeout()
+
+        self.assertRaisesMessage(PlebeusException, 'PleBeuS did not respond in time',
+                                 self.pbs.delete_policy, '123456789')
+
+    def policies(self, users: list) -> list:
+        return [(user, dataclasses.replace(self.policy, user=user), '') for user in users]
+
+    @staticmethod
+    def response(status_code: int, pbs_id: str = '') -> Mock:
+        return Mock(status_code=status_code, text=json.dumps({'message': 'error', 'policy': {'_id': pbs_id}}))
+
+    @override_settings(USE_PLEBEUS=True, PLEBEUS_WORKERS=4)
+    @patch('policy_manager.plebeus.client.get')
+    @patch('policy_manager.plebeus.client.post')
+    def test_sync_policies_concurrently(self, mock_post, mock_get):
+        """the policies are saved concurrently, except for the policies of the same user, and the pbs_ids are returned
+        in order"""
+        active, max_active, calls = set(), [0], []
+        lock = threading.Lock()
+
+        def post(url, data, headers):
+            user = json.loads(data)['username']
+            with lock:
+                self.assertNotIn(user, active)
+                active.add(user)
+                max_active[0] = max(max_active[0], len(active))
+                calls.append(user)
+            time.sleep(0.01)
+            with lock:
+                active.remove(user)
+            return self.response(201, 'id-' + user + '-' + str(calls.count(user)))
+        mock_get.return_value = self.response(200)
+        mock_post.side_effect = post
+
+        pbs_ids = self.pbs.sync_policies(self.policies(['a', 'b', 'a', 'c', 'd', 'e', 'f']))
+
+        self.assertEqual(pbs_ids, ['id-a-1', 'id-b-1', 'id-a-2', 'id-c-1', 'id-d-1', 'id-e-1', 'id-f-1'])
+        self.assertEqual(max_active[0], 4)
+        self.assertEqual(mock_get.call_count, 6)
+
+    @override_settings(USE_PLEBEUS=True)
+    @patch('policy_manager.plebeus.client.delete')
+    @patch('policy_manager.plebeus.client.get')
+    @patch('policy_manager.plebeus.client.post')
+    def test_sync_policies_failed(self, mock_post, mock_get, mock_delete):
+        """if a change of a user fails, the later changes of the user are not applied"""
+        mock_get.return_value = self.response(200)
+        mock_post.side_effect = lambda url, data, headers: \
+            self.response(500) if json.loads(data)['username'] == 'b' else self.response(201, 'id')
+        mock_delete.return_value = self.response(204)
+
+        results = self.pbs.sync_policies(self.policies(['a', 'b']) + [('b', None, '123'), ('a', None, '456')])
+
+        self.assertEqual(results[0], 'id')
+        self.assertIsInstance(results[1], PlebeusException)
+        self.assertEqual(results[2:], [None, ''])
+        mock_delete.assert_called_once_with(settings.PLEBEUS_URL + '/api/policy/456')
+
+    @override_settings(USE_PLEBEUS=False)
+    @patch('policy_manager.plebeus.client.post')
+    def test_sync_policies_without_plebeus(self, mock_post):
+        self.assertEqual(self.pbs.sync_policies(self.policies(['a', 'b'])), ['', ''])
+        mock_post.assert_not_called()
+
+    @override_settings(USE_PLEBEUS=True)
+    @patch('policy_manager.plebeus.client.get')
+    @patch('policy_manager.plebeus.client.post')
+    def test_save_policy_with_known_user(self, mock_post, mock_get):
+        """PleBeuS is only asked for the default policy of a user once"""
+        mock_get.return_value = self.response(200)
+        mock_post.return_value = self.response(201, '829919')
+
+        self.pbs.save_policy(self.policy, '')
+        self.pbs.save_policy(self.policy, '')
+        known_users.clear()
+        self.pbs.sync_policies(self.policies(['client1']))
+
+        mock_get.assert_called_once()
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertTrue(PlebeusUser.objects.filter(user='client1').exists())
+
+    @override_settings(USE_PLEBEUS=True)
+    @patch('policy_manager.plebeus.client.get')
+    @patch('policy_manager.plebeus.client.post')
+    def test_save_default_policy(self, mock_post, mock_get):
+        """saving a default policy makes the user known without asking PleBeuS for a default policy"""
+        mock_post.return_value = self.response(201, '829919')
+
+        self.pbs.save_policy(dataclasses.replace(self.policy, interval=Interval.DEFAULT), '')
+        self.pbs.save_policy(self.policy, '')
+
+        mock_get.assert_not_called()
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertTrue(PlebeusUser.objects.filter(user='client1').exists())
+
+    @override_settings(USE_PLEBEUS=True)
+    @patch('policy_manager.plebeus.client.get')
+    @patch('policy_manager.plebeus.client.post')
+    def test_save_policy_with_unknown_user(self, mock_post, mock_get):
+        """if PleBeuS does not know a known user anymore, its default policy is created again"""
+        PlebeusUser.objects.create(user='client1')
+        mock_get.return_value = self.response(404)
+        mock_post.side_effect = [self.response(404), self.response(201, ''), self.response(201, '829919')]
+
+        res = self.pbs.save_policy(self.policy, '')
+
+        self.assertEqual(res, '829919')
+        mock_get.assert_called_once()
+        self.assertEqual(json.loads(mock_post.call_args_list[1][0][1])['interval'], 'default')
+        self.assertIn('client1', known_users)
+        self.assertTrue(PlebeusUser.objects.filter(user='client1').exists())
+
+
+@patch('policy_manager.plebeusClient.time.sleep')
+class PlebeusClientTests(TestCase):
+
+    def setUp(self) -> None:
+        self.client = PlebeusClient(connect_timeout=1.0, read_timeout=2.0, retries=2, backoff=0.1, max_backoff=0.15)
+        self.request = patch.object(self.client.session, 'request').start()
+        self.addCleanup(patch.stopall)
+
+    @staticmethod
+    def response(status_code: int) -> Mock:
+        return Mock(status_code=status_code)
+
+    def test_shared_client(self, mock_sleep):
+        """all PleBeuS instances share the pooled session of the module client"""
+        self.assertIsInstance(client, PlebeusClient)
+        self.assertEqual(client.timeout, (settings.PLEBEUS_CONNECT_TIMEOUT, settings.PLEBEUS_READ_TIMEOUT))
+        adapter = client.session.get_adapter('http://localhost')
+        self.assertEqual(adapter._pool_maxsize, settings.PLEBEUS_POOL_SIZE)
+
+    def test_timeout(self, mock_sleep):
+        self.request.return_value = self.response(200)
+
+        self.client.get('http://pbs/policies/client1')
+        self.client.post('http://pbs/api/policies', '{}', timeout=5.0)
+
+        self.request.assert_any_call('GET', 'http://pbs/policies/client1', timeout=(1.0, 2.0))
+        self.request.assert_any_call('POST', 'http://pbs/api/policies', data='{}', timeout=5.0)
+        mock_sleep.assert_not_called()
+
+    def test_retry_idempotent_request(self, mock_sleep):
+        self.request.side_effect = [ConnectionError(), self.response(503), self.response(200)]
+
+        response = self.client.get('http://pbs/policies/client1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.request.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+        for (delay,), _ in mock_sleep.call_args_list:
+            self.assertTrue(0 <= delay <= 0.15)
+
+    def test_retry_exhausted(self, mock_sleep):
+        self.request.side_effect = ConnectionError()
+        self.assertRaises(ConnectionError, self.client.delete, 'http://pbs/api/policy/1')
+        self.assertEqual(self.request.call_count, 3)
+
+        self.request.reset_mock(side_effect=True)
+        self.request.return_value = self.response(502)
+        self.assertEqual(self.client.delete('http://pbs/api/policy/1').status_code, 502)
+        self.assertEqual(self.request.call_count, 3)
+
+    def test_no_retry_of_post(self, mock_sleep):
+        self.request.side_effect = ReadTimeout()
+        self.assertRaises(ReadTimeout, self.client.post, 'http://pbs/api/policies', '{}')
+
+        self.request.reset_mock(side_effect=True)
+        self.request.return_value = self.response(503)
+        self.assertEqual(self.client.post('http://pbs/api/policies', '{}').status_code, 503)
+
+        self.assertEqual(self.request.call_count, 1)
+        mock_sleep.assert_not_called()
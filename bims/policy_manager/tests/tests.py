@@ -3,6 +3,7 @@ from rest_framework import status
 from django.test import override_settings
 
 from policy_manager.models import Policy
+from policy_manager.blockchain_pool import load_blockchain_pool
 from intent_manager.models import Intent
 from user_manager.models import User
 from refiner.models import Currency
@@ -136,7 +137,8 @@ class PolicyManagerTests(APITestCase):
                                                                              'intent_id was incorrect')
         self.assertEqual(policy.user, policy_user, 'User in policy is incorrect')
         self.assertEqual(policy.threshold, 24, 'Threshold was incorrect')
-        self.assertEqual(pickle.loads(policy.blockchain_pool), blockchain_pool, 'Blockchain Pool is incorrect')
+        self.assertEqual(load_blockchain_pool(policy.blockchain_pool), blockchain_pool, 'Blockchain Pool is incorrect')
+        self.assertEqual(len(policy.blockchain_pool), 1, 'Blockchain Pool is not encoded as bitmask')
 
     def test_is_policy_deleted(self):
         self.save_policy()
@@ -1,10 +1,10 @@
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from rest_framework import generics, permissions, status
 from .serializers import ParserSerializer
 from rest_framework.response import Response
-from .refiner import refine_intent
-from refiner.irtk.parser.state import IllegalTransitionError
-from refiner.irtk.incompleteIntentException import IncompleteIntentException
-from refiner.irtk.validation import ValidationError
+from .refiner import GRAMMAR_ETAG, GRAMMAR_JSON, complete_intent, complete_token, suggest_tokens, validate_intent
 from .models import Currency
 
 
@@ -17,22 +17,61 @@ class IntentParserAPI(generics.GenericAPIView):
 
     @staticmethod
     def post(request, *args, **kwargs):
-        """Handles POST requests. If intent is not valid, returns status 200 with expected words.
-        If Intent is valid, returns status 204.
+        """Handles POST requests. If intent is not valid, returns status 200 with expected words, suggestions for
+        a mistyped word and the shortest completion of an incomplete intent. If Intent is valid, returns status 204.
+        If a partial word following the intent is provided, also returns the ranked completions of the partial word
+        with status 200.
         """
+        partial = request.data.get('partial')
         try:
-            refine_intent(request.data.get('intent_string'))
-        except (IllegalTransitionError, IncompleteIntentException, ValidationError) as error:
-            # Intent is not valid
-            return Response({
-                'message': error.message,
-                'expected': error.expected
-            }, status=status.HTTP_200_OK)
+            result = validate_intent(request.data.get('intent_string'), request.user.id)
         except Currency.DoesNotExist:
             return Response({
                 'message': 'Currency was not found',
                 'expected': []
             }, status=status.HTTP_404_NOT_FOUND)
 
+        if partial is not None:
+            # Intent is followed by a partial word
+            return Response({
+                'message': result.message,
+                'expected': result.expected,
+                'suggestions': suggest_tokens(result),
+                'completion': complete_intent(result),
+                'completions': complete_token(result, partial)
+            }, status=status.HTTP_200_OK)
+
+        if not result.complete:
+            # Intent is not valid
+            return Response({
+                'message': result.message,
+                'expected': result.expected,
+                'suggestions': suggest_tokens(result),
+                'completion': complete_intent(result)
+            }, status=status.HTTP_200_OK)
+
         # Intent is valid
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class GrammarAPI(generics.GenericAPIView):
+    """Implements the Grammar API to retrieve the compiled grammar of the Parser, which is used to validate Intents
+    on the client."""
+    permission_classes = [
+        permissions.AllowAny
+    ]
+
+    @staticmethod
+    def get(request, *args, **kwargs):
+        """Handles GET requests. Returns the compiled grammar as JSON with its content hash as ETag. If the client
+        already has the current grammar, returns status 304."""
+        # weak comparison, i.e. a weak ETag of the grammar matches as well
+        etags = [etag[2:] if etag.startswith('W/') else etag
+                 for etag in parse_etags(request.headers.get('If-None-Match', ''))]
+        if GRAMMAR_ETAG in etags or etags == ['*']:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(GRAMMAR_JSON, content_type='application/json')
+        response['ETag'] = GRAMMAR_ETAG
+        patch_cache_control(response, public=True, max_age=3600)
+        return response
@@ -0,0 +1,53 @@
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict
+
+
+@dataclass
+class Measurement:
+    """Result of a benchmark: mean, median and 99th percentile latency and peak memory allocated per operation."""
+    name: str
+    ops: int
+    latency: float
+    allocated: int
+    p50: float = 0.0
+    p99: float = 0.0
+
+    @property
+    def ops_per_sec(self) -> float:
+        return 1 / self.latency if self.latency else 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {**asdict(self), 'ops_per_sec': self.ops_per_sec}
+
+    def __str__(self) -> str:
+        return (f"{self.name:<32} {self.ops_per_sec:>12.1f} ops/s {self.latency * 1e6:>12.2f} us/op "
+                f"p50 {self.p50 * 1e6:>12.2f} us p99 {self.p99 * 1e6:>12.2f} us {self.allocated:>10} B/op")
+
+
+def measure(name: str, operation: Callable[[], object], ops: int = 10000) -> Measurement:
+    """Runs the operation ops times and measures the latency of every operation. Afterwards, runs it once more
+    with tracemalloc enabled to measure the peak memory allocated by a single operation."""
+    operation()     # warm up
+    latencies = []
+    for _ in range(ops):
+        start = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return Measurement(
+        name=name,
+        ops=ops,
+        latency=sum(latencies) / ops,
+        allocated=peak - baseline,
+        p50=latencies[(ops - 1) // 2],
+        p99=latencies[min(ops - 1, int(ops * 0.99))],
+    )
@@ -0,0 +1,104 @@
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from refiner.irtk.intent import Currency
+from refiner.irtk.parser.completion import shortest_completions
+from refiner.irtk.parser.grammar import GRAMMAR, Grammar, NO_STATE, UNKNOWN_TOKEN
+from refiner.irtk.parser.parser import Parser
+
+USER = '<user>'
+THRESHOLD = '<threshold>'
+
+# the currencies other than USD are converted with the rates of the database, they are excluded by default so that
+# the benchmarks do not depend on the database
+NON_USD_CURRENCIES = frozenset(currency.value for currency in Currency if currency is not Currency.USD)
+
+Step = Tuple[int, str]
+
+
+class CorpusGenerator:
+    """generates random intents by walking the compiled grammar. Valid intents are complete intents, incomplete
+    intents are prefixes of valid intents and invalid intents contain an illegal word. The number of users of an
+    intent can be controlled, the other words are chosen randomly."""
+
+    def __init__(self, grammar: Grammar = GRAMMAR, seed: int = 0, exclude: Iterable[str] = NON_USD_CURRENCIES,
+                 max_length: int = 24) -> None:
+        self._grammar = grammar
+        self._random = random.Random(seed)
+        self._exclude = frozenset(exclude)
+        self._max_length = max_length
+        self._distances = [
+            len(completion) if completion is not None else None for completion in shortest_completions(grammar)
+        ]
+
+    def _options(self, state: int) -> List[Tuple[str, int]]:
+        grammar = self._grammar
+        options = [
+            (token, grammar.transitions[state][grammar.token_id(token)])
+            for token in sorted(grammar.expected[state]) if token not in self._exclude
+        ]
+        if grammar.placeholders[state] and grammar.transitions[state][UNKNOWN_TOKEN] != NO_STATE:
+            options.append((grammar.placeholders[state], grammar.transitions[state][UNKNOWN_TOKEN]))
+        return [(label, successor) for label, successor in options if self._distances[successor] is not None]
+
+    def _walk(self, users: int) -> List[Step]:
+        """walks from the initial to an accepting state, returns the states and words of the walk. Since the grammar
+        does not check the semantics of an intent, e.g. conflicting filters, walks are repeated until the intent is
+        also semantically valid"""
+        while True:
+            steps = self._random_walk(users)
+            if Parser(self._grammar).try_parse(self._join(word for _, word in steps)).complete:
+                return steps
+
+    def _random_walk(self, users: int) -> List[Step]:
+        grammar = self._grammar
+        state, steps, remaining_users = grammar.initial, [], users
+        while not grammar.accepting[state]:
+            options = self._options(state)
+            # words leading to a username are chosen as long as there are users left, and never afterwards
+            to_user = [option for option in options if grammar.placeholders[option[1]] == USER or option[0] == USER]
+            others = [option for option in options if option not in to_user]
+            options = to_user if remaining_users > 0 and to_user else others or options
+            if len(steps) >= self._max_length:
+                closest = min(self._distances[successor] for _, successor in options)
+                options = [option for option in options if self._distances[option[1]] == closest]
+            label, successor = self._random.choice(options)
+            if label == USER:
+                remaining_users -= 1
+                label = f'user{users - remaining_users}'
+            elif label == THRESHOLD:
+                label = f'{self._random.uniform(1, 1000):.2f}'
+            steps.append((state, label))
+            state = successor
+        return steps
+
+    @staticmethod
+    def _join(words: Iterable[str]) -> str:
+        return ' '.join(words).replace(' ,', ',')
+
+    def valid(self, users: int = 1) -> str:
+        """returns a complete intent for the number of users"""
+        return self._join(word for _, word in self._walk(users))
+
+    def incomplete(self, users: int = 1) -> str:
+        """returns a prefix of a complete intent for the number of users, which contains all the users. Every prefix
+        of a valid intent is incomplete"""
+        steps = self._walk(users)
+        start = max(i for i, (_, word) in enumerate(steps) if word.startswith('user')) + 1
+        return self._join(word for _, word in steps[:self._random.randrange(start, len(steps))])
+
+    def invalid(self, users: int = 1) -> str:
+        """returns a complete intent for the number of users, of which a word after the users is illegal"""
+        steps = self._walk(users)
+        illegal = [
+            i for i, (state, _) in enumerate(steps)
+            if self._grammar.transitions[state][UNKNOWN_TOKEN] == NO_STATE and i > 0
+            and self._grammar.placeholders[steps[i - 1][0]] != USER
+        ]
+        position = self._random.choice(illegal)
+        return self._join(word if i != position else 'illegal' for i, (_, word) in enumerate(steps))
+
+    def corpus(self, size: int, users: int = 1, kinds: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """returns size intents for the number of users of each kind (valid, incomplete and invalid)"""
+        kinds = kinds or ('valid', 'incomplete', 'invalid')
+        return {kind: [getattr(self, kind)(users) for _ in range(size)] for kind in kinds}
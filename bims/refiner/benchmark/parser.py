@@ -0,0 +1,41 @@
+from typing import List, Sequence
+
+from refiner.irtk.intent import Intent
+from refiner.irtk.parser.lexer import LEXER
+from refiner.irtk.parser.parser import Parser
+from refiner.irtk.parser.state import ForState
+
+from . import Measurement, measure
+
+INTENTS = [
+    'for client1 select the fastest blockchain as default',
+    'for client1, client2 and client3 in the morning select the cheapest fast and stable blockchain '
+    'from bitcoin, ethereum and eos with encryption and redundancy until the monthly costs reach chf 20',
+    'for client1 select ethereum until the daily costs reach 12.5',
+]
+
+
+def parse_state_graph(tokens: Sequence[str]) -> Intent:
+    """Parses the tokens by instantiating the state objects, as the Parser did before the grammar
+    was compiled."""
+    state = ForState()
+    intent = Intent()
+    for token in tokens:
+        state = state.run(token, intent)
+    return intent
+
+
+def parse_grammar(tokens: Sequence[str]) -> Intent:
+    """Parses the tokens with the compiled grammar."""
+    return Parser().parse_tokens(tokens)
+
+
+def run(ops: int) -> List[Measurement]:
+    """Compares the state graph with the compiled grammar and measures the lexer. Both parsers
+    parse the same, pre-tokenized intents, so that the tokenizer does not distort the results."""
+    tokens = [intent.replace(',', ' ,').split() for intent in INTENTS]
+    return [
+        measure('parse (state graph)', lambda: [parse_state_graph(t) for t in tokens], ops),
+        measure('parse (grammar)', lambda: [parse_grammar(t) for t in tokens], ops),
+        measure('tokenize (lexer)', lambda: [LEXER.tokenize(intent) for intent in INTENTS], ops),
+    ]
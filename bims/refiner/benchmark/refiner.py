@@ -0,0 +1,50 @@
+import itertools
+from typing import Callable, List, Sequence
+
+from refiner.irtk.parser.lexer import LEXER
+from refiner.irtk.parser.parser import Parser
+from refiner.irtk.refiner import TRANSLATOR, refine_checked, validate_checked
+from refiner.refiner import RefineCache
+
+from . import Measurement, measure
+from .corpus import CorpusGenerator
+
+
+def _cycle(function: Callable[[object], object], items: Sequence) -> Callable[[], object]:
+    """returns an operation that applies the function to the next item, cycling through the items"""
+    items = itertools.cycle(items)
+    return lambda: function(next(items))
+
+
+def _parse(intent: str) -> object:
+    return Parser().try_parse(intent)
+
+
+def run(ops: int, users: Sequence[int] = (1, 100, 10000), size: int = 100, seed: int = 0) -> List[Measurement]:
+    """measures tokenizing, parsing, translating, validating and refining generated intents with the given numbers of
+    users. Valid, incomplete and invalid intents are parsed, validated and refined, also with a warm RefineCache, only
+    valid intents are translated. The number of operations is divided by the number of users, so that every benchmark
+    processes about the same number of words"""
+    measurements = []
+    generator = CorpusGenerator(seed=seed)
+    for num_users in users:
+        corpus = generator.corpus(size, users=num_users)
+        intents = corpus['valid']
+        parsed = [Parser().parse(intent) for intent in intents]
+        num_ops = max(1, ops // num_users)
+        measurements += [
+            measure(f'tokenize ({num_users} users)', _cycle(LEXER.tokenize, intents), num_ops),
+            measure(f'translate ({num_users} users)', _cycle(TRANSLATOR.translate, parsed), num_ops),
+        ]
+        for kind, intents in corpus.items():
+            measurements += [
+                measure(f'parse {kind} ({num_users} users)', _cycle(_parse, intents), num_ops),
+                measure(f'validate {kind} ({num_users} users)', _cycle(validate_checked, intents), num_ops),
+                measure(f'refine {kind} ({num_users} users)', _cycle(refine_checked, intents), num_ops),
+            ]
+            cache = RefineCache(maxsize=len(intents))
+            for intent in intents:
+                cache.refine(intent)
+            measurements.append(measure(f'refine cached {kind} ({num_users} users)', _cycle(cache.refine, intents),
+                                        num_ops))
+    return measurements
@@ -25,3 +25,8 @@ MIN_STABILITY = 0.5
 TIME_DAY_START = "06:00"
 TIME_AFTERNOON_START = "12:00"
 TIME_NIGHT_START = "18:00"
+
+# The conversion rates of the currencies are cached in-process. The cache is invalidated whenever
+# a change of a currency is committed. As a safety net, e.g., for changes made by another process,
+# cached rates are reloaded after CONVERSION_RATE_TTL seconds.
+CONVERSION_RATE_TTL = 300
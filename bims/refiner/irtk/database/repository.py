@@ -1,10 +1,99 @@
-from typing import Any, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from .database import Database
+from ..config import CONVERSION_RATE_TTL
 from ..intent import Currency as CurrencyEnum
 from refiner.models import Currency
 
 
+class ConversionRateCache:
+    """ConversionRateCache caches the conversion rates of all currencies in-process.
+
+    The rates of all currencies are loaded with a single query, when the cache is accessed for the
+    first time, after it was invalidated, or after the time to live expired. The numbers of hits
+    and misses are counted, a miss is an access that loaded the rates from the database. The
+    version of the rates changes whenever reloaded rates differ from the rates loaded before.
+
+    The rates are loaded, invalidated and counted under a lock, hence rates loaded before the cache
+    was invalidated are never stored after it.
+    """
+
+    def __init__(
+        self, ttl: float = CONVERSION_RATE_TTL, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rates: Optional[Dict[str, float]] = None
+        self._expires = 0.0
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, currency: str) -> float:
+        """Returns the conversion rate of a currency.
+
+        A currency that is not cached is looked up once more in the database, since it might have
+        been created by another process. If it does not exist, Currency.DoesNotExist is raised.
+        """
+        rates = self._rates
+        if rates is None or currency not in rates or self._clock() >= self._expires:
+            rates = self._load()
+        else:
+            with self._lock:
+                self.hits += 1
+        try:
+            return rates[currency]
+        except KeyError:
+            raise Currency.DoesNotExist(f"{self}: currency '{currency}' does not exist")
+
+    def version(self) -> int:
+        """Returns the version of the conversion rates, e.g., to invalidate results derived from
+        them. Reloads the rates first if they were invalidated or expired."""
+        if self._rates is None or self._clock() >= self._expires:
+            self._load()
+        return self._version
+
+    def invalidate(self) -> None:
+        """Invalidates the cached rates, they are reloaded when the cache is accessed next."""
+        with self._lock:
+            self._rates = None
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the numbers of hits and misses."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _load(self) -> Dict[str, float]:
+        with self._lock:
+            self.misses += 1
+            rates = dict(Currency.objects.values_list("currency", "exchange_rate"))
+            self._version = hash(frozenset(rates.items()))
+            self._rates = rates
+            self._expires = self._clock() + self._ttl
+            return rates
+
+    def __str__(self) -> str:
+        return self.__class__.__name__
+
+
+CONVERSION_RATES = ConversionRateCache()
+
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def invalidate_conversion_rates(**kwargs) -> None:
+    """Invalidates the cached conversion rates whenever a currency is saved or deleted, once the
+    change is committed, so that the rates are not reloaded before the change is visible."""
+    transaction.on_commit(CONVERSION_RATES.invalidate, using=kwargs.get("using"))
+
+
 class Repository:
     """Repository acts as a data access layer."""
 
@@ -18,8 +107,9 @@ class Repository:
 
     @staticmethod
     def find_conversion_rate(currency: CurrencyEnum) -> float:
-        """Finds the conversion rate from the database for a currency."""
+        """Finds the conversion rate for a currency.
 
-        # Accesses the django project database, not the irtk database
-        exchange_rate = Currency.objects.get(currency=currency.name).exchange_rate
-        return exchange_rate
+        Accesses the conversion rates of the django project database, not the irtk database, which
+        are cached in-process.
+        """
+        return CONVERSION_RATES.get(currency.name)
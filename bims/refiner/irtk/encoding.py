@@ -0,0 +1,131 @@
+import struct
+from typing import List, Tuple, Type
+
+from .flags import FlagSet, MutableFlagSet, all_of
+from .intent import Blockchain, Currency, Filter, Intent, Interval, Modifier, Profile, Timeframe
+
+# Version of the layout of an encoded intent, stored in its first byte. Must be incremented
+# whenever the layout changes, e.g., if a member is added to one of the enums, since the widths of
+# the packed fields depend on the numbers of members.
+ENCODING_VERSION = 2
+
+# Optional enum fields of an intent, packed as 0 for None or the index of the member plus one.
+_OPTIONS: Tuple[Tuple[str, Type], ...] = (
+    ("timeframe", Timeframe),
+    ("blockchain", Blockchain),
+    ("profile", Profile),
+    ("interval", Interval),
+    ("currency", Currency),
+)
+
+# Flag set fields of an intent, packed as their bitmask.
+_FLAGS: Tuple[Tuple[str, Type], ...] = (
+    ("filters", Filter),
+    ("whitelist", Blockchain),
+    ("blacklist", Blockchain),
+    ("modifiers", Modifier),
+)
+
+# Version, packed fields and threshold, followed by the number of users and the users. The number
+# of users and the lengths of the user names are unsigned LEB128 varints, so they are unbounded.
+_HEADER = struct.Struct("<BQd")
+
+
+def _layout() -> List[Tuple[str, Type, int, bool]]:
+    """Returns the name, enum, width and whether it is a flag set of every packed field."""
+    layout = [(name, kind, len(kind).bit_length(), False) for name, kind in _OPTIONS]
+    layout += [(name, kind, all_of(kind).bit_length(), True) for name, kind in _FLAGS]
+    assert sum(width for *_, width, _ in layout) <= 64
+    return layout
+
+
+_LAYOUT = _layout()
+_MEMBERS = {kind: tuple(kind) for _, kind in _OPTIONS}
+
+
+def _encode_varint(value: int) -> bytes:
+    """Encodes a non-negative integer as an unsigned LEB128 varint."""
+    data = bytearray()
+    while value > 0x7F:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+
+def _decode_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Decodes an unsigned LEB128 varint at offset, returns its value and the offset after it."""
+    value, shift = 0, 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("invalid encoded intent: truncated varint")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def encode_intent(intent: Intent) -> bytes:
+    """Encodes a parsed intent into a compact binary form with a fixed layout.
+
+    The enum fields and the flag sets are packed into a single 64-bit integer, the threshold is
+    stored as a double and the users as a list of length-prefixed UTF-8 strings, in sorted order.
+    Hence, equal intents have the same encoding, except for the currency USD, which is kept.
+    """
+    packed, shift = 0, 0
+    for name, kind, width, flags in _LAYOUT:
+        value = getattr(intent, name)
+        if flags:
+            field = FlagSet(kind, value).mask
+        else:
+            field = _MEMBERS[kind].index(value) + 1 if value is not None else 0
+        packed |= field << shift
+        shift += width
+
+    users = [user.encode() for user in sorted(intent.users)]
+    data = [_HEADER.pack(ENCODING_VERSION, packed, float(intent.threshold))]
+    data.append(_encode_varint(len(users)))
+    for user in users:
+        data += [_encode_varint(len(user)), user]
+    return b"".join(data)
+
+
+def decode_intent(data: bytes) -> Intent:
+    """Decodes an intent encoded by encode_intent without parsing it.
+
+    Raises a ValueError if the data is not an intent encoded with the current layout.
+    """
+    try:
+        version, packed, threshold = _HEADER.unpack_from(data)
+    except struct.error as error:
+        raise ValueError(f"invalid encoded intent: {error}") from error
+    if version != ENCODING_VERSION:
+        raise ValueError(f"invalid encoded intent: unsupported version {version}")
+
+    fields = {}
+    for name, kind, width, flags in _LAYOUT:
+        field = packed & ((1 << width) - 1)
+        packed >>= width
+        if flags:
+            fields[name] = MutableFlagSet.from_mask(kind, field)
+        elif field > len(_MEMBERS[kind]):
+            raise ValueError(f"invalid encoded intent: invalid {name}")
+        else:
+            fields[name] = _MEMBERS[kind][field - 1] if field else None
+
+    users = set()
+    num_users, offset = _decode_varint(data, _HEADER.size)
+    for _ in range(num_users):
+        length, offset = _decode_varint(data, offset)
+        if offset + length > len(data):
+            raise ValueError("invalid encoded intent: truncated user")
+        try:
+            users.add(bytes(data[offset:offset + length]).decode())
+        except UnicodeDecodeError as error:
+            raise ValueError(f"invalid encoded intent: {error}") from error
+        offset += length
+    if offset != len(data):
+        raise ValueError("invalid encoded intent: unexpected length")
+    return Intent(users=users, threshold=threshold, **fields)
@@ -0,0 +1,209 @@
+import enum
+import functools
+from typing import AbstractSet, Iterable, Iterator, MutableSet, NamedTuple, Tuple, Type, TypeVar
+
+Member = TypeVar("Member", bound=enum.Enum)
+
+# Enums with more members would need too large decoding tables. The enums used as sets, i.e.,
+# Blockchain, Filter and Modifier, have far fewer members.
+MAX_MEMBERS = 16
+
+
+class _Table(NamedTuple):
+    """Bit of every member of an enum and the members of every possible mask."""
+    bits: dict
+    members: Tuple[Tuple[enum.Enum, ...], ...]
+    all: int
+
+
+@functools.lru_cache(maxsize=None)
+def _table(kind: Type[enum.Enum]) -> _Table:
+    members = tuple(kind)
+    if len(members) > MAX_MEMBERS:
+        raise ValueError(f"{kind.__name__} has more than {MAX_MEMBERS} members")
+    bits = {member: 1 << i for i, member in enumerate(members)}
+    decoded = tuple(
+        tuple(member for member in members if mask & bits[member])
+        for mask in range(1 << len(members))
+    )
+    return _Table(bits, decoded, (1 << len(members)) - 1)
+
+
+def mask_of(kind: Type[Member], members: Iterable[Member]) -> int:
+    """Returns the bitmask of the members of an enum. Every member corresponds to a single bit,
+    according to the order of definition of the members."""
+    if isinstance(members, FlagSet) and members.kind is kind:
+        return members.mask
+    bits = _table(kind).bits
+    mask = 0
+    for member in members:
+        mask |= bits[member]
+    return mask
+
+
+def members_of(kind: Type[Member], mask: int) -> Tuple[Member, ...]:
+    """Returns the members of an enum in a bitmask, in their order of definition."""
+    return _table(kind).members[mask]
+
+
+def all_of(kind: Type[enum.Enum]) -> int:
+    """Returns the bitmask of all members of an enum."""
+    return _table(kind).all
+
+
+class FlagSet(AbstractSet[Member]):
+    """FlagSet is an immutable set of members of an enum, represented by a bitmask.
+
+    It supports the API of a set and compares equal to sets with the same members. Set operations
+    with another FlagSet of the same enum are single bitwise operations.
+    """
+
+    __slots__ = ("kind", "mask")
+
+    def __init__(self, kind: Type[Member], members: Iterable[Member] = ()) -> None:
+        self.kind = kind
+        self.mask = mask_of(kind, members)
+
+    @classmethod
+    def from_mask(cls, kind: Type[Member], mask: int) -> "FlagSet[Member]":
+        """Returns the set of members of an enum in a bitmask."""
+        if not 0 <= mask <= all_of(kind):
+            raise ValueError(f"{cls.__name__}: invalid mask {mask} for {kind.__name__}")
+        flag_set = cls.__new__(cls)
+        flag_set.kind = kind
+        flag_set.mask = mask
+        return flag_set
+
+    def _from_iterable(self, members: Iterable[Member]) -> "FlagSet[Member]":
+        return type(self)(self.kind, members)
+
+    def _mask_of(self, other: Iterable) -> int:
+        if isinstance(other, FlagSet) and other.kind is self.kind:
+            return other.mask
+        return NotImplemented
+
+    def __contains__(self, member: object) -> bool:
+        bit = _table(self.kind).bits.get(member, 0)
+        return bool(self.mask & bit)
+
+    def __iter__(self) -> Iterator[Member]:
+        return iter(members_of(self.kind, self.mask))
+
+    def __len__(self) -> int:
+        return len(members_of(self.kind, self.mask))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FlagSet) and other.kind is self.kind:
+            return self.mask == other.mask
+        return super().__eq__(other)
+
+    def __hash__(self) -> int:
+        return self._hash()
+
+    def __or__(self, other):
+        mask = self._mask_of(other)
+        if mask is NotImplemented:
+            return super().__or__(other)
+        return type(self).from_mask(self.kind, self.mask | mask)
+
+    def __and__(self, other):
+        mask = self._mask_of(other)
+        if mask is NotImplemented:
+            return super().__and__(other)
+        return type(self).from_mask(self.kind, self.mask & mask)
+
+    def __sub__(self, other):
+        mask = self._mask_of(other)
+        if mask is NotImplemented:
+            return super().__sub__(other)
+        return type(self).from_mask(self.kind, self.mask & ~mask)
+
+    # Named methods of the built-in set, which accept any iterables.
+
+    def _known_mask(self, other: Iterable) -> int:
+        """Returns the mask of the members of the enum in other, ignoring any other elements."""
+        bits = _table(self.kind).bits
+        mask = 0
+        for member in other:
+            mask |= bits.get(member, 0)
+        return mask
+
+    def union(self, *others: Iterable[Member]) -> "FlagSet[Member]":
+        mask = self.mask
+        for other in others:
+            mask |= mask_of(self.kind, other)
+        return type(self).from_mask(self.kind, mask)
+
+    def intersection(self, *others: Iterable) -> "FlagSet[Member]":
+        mask = self.mask
+        for other in others:
+            mask &= self._known_mask(other)
+        return type(self).from_mask(self.kind, mask)
+
+    def difference(self, *others: Iterable) -> "FlagSet[Member]":
+        mask = self.mask
+        for other in others:
+            mask &= ~self._known_mask(other)
+        return type(self).from_mask(self.kind, mask)
+
+    def symmetric_difference(self, other: Iterable[Member]) -> "FlagSet[Member]":
+        return type(self).from_mask(self.kind, self.mask ^ mask_of(self.kind, other))
+
+    def issubset(self, other: Iterable) -> bool:
+        return self.mask & ~self._known_mask(other) == 0
+
+    def issuperset(self, other: Iterable) -> bool:
+        return all(member in self for member in other)
+
+    def complement(self) -> "FlagSet[Member]":
+        """Returns the set of all other members of the enum."""
+        return type(self).from_mask(self.kind, all_of(self.kind) & ~self.mask)
+
+    def copy(self) -> "FlagSet[Member]":
+        return type(self).from_mask(self.kind, self.mask)
+
+    def to_bytes(self) -> bytes:
+        """Returns the bitmask as little-endian bytes, a single byte for up to 8 members."""
+        return self.mask.to_bytes((len(_table(self.kind).bits) + 7) // 8, "little")
+
+    @classmethod
+    def from_bytes(cls, kind: Type[Member], data: bytes) -> "FlagSet[Member]":
+        """Returns the set of members of an enum in a bitmask encoded by to_bytes."""
+        return cls.from_mask(kind, int.from_bytes(data, "little"))
+
+    def __reduce__(self):
+        return type(self).from_mask, (self.kind, self.mask)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.kind.__name__}, {set(self)})"
+
+
+class MutableFlagSet(FlagSet[Member], MutableSet[Member]):
+    """MutableFlagSet is a mutable set of members of an enum, represented by a bitmask."""
+
+    __slots__ = ()
+    __hash__ = None
+
+    def add(self, member: Member) -> None:
+        self.mask |= _table(self.kind).bits[member]
+
+    def discard(self, member: Member) -> None:
+        self.mask &= ~_table(self.kind).bits.get(member, 0)
+
+    def clear(self) -> None:
+        self.mask = 0
+
+    def __ior__(self, other):
+        mask = self._mask_of(other)
+        if mask is NotImplemented:
+            return super().__ior__(other)
+        self.mask |= mask
+        return self
+
+    def update(self, *others: Iterable[Member]) -> None:
+        for other in others:
+            self.mask |= mask_of(self.kind, other)
+
+    def freeze(self) -> FlagSet[Member]:
+        """Returns an immutable set with the same members."""
+        return FlagSet.from_mask(self.kind, self.mask)
@@ -1,16 +1,21 @@
 import dataclasses
 from dataclasses import field
 import enum
-from typing import Iterable, Optional, Set
+import functools
+import hashlib
+from typing import FrozenSet, Iterable, Optional, Set
+
+from .flags import FlagSet, MutableFlagSet
 
 
 class AutoName(enum.Enum):
     """Base enum that automatically sets the value based on the member name."""
 
     @classmethod
-    def values(cls) -> Set[str]:
-        """Returns the set of all member values."""
-        return {member.value for _, member in cls.__members__.items()}
+    @functools.lru_cache(maxsize=None)
+    def values(cls) -> FrozenSet[str]:
+        """Returns the set of all member values. The set is computed once per enum."""
+        return frozenset(member.value for member in cls)
 
     def _generate_next_value_(self, start, count, last_values) -> str:
         del start, count, last_values
@@ -83,25 +88,68 @@ class Currency(AutoName):
 
 @dataclasses.dataclass
 class Intent:
-    """Intent represents an abstract, high-level policy."""
+    """Intent represents an abstract, high-level policy.
+
+    The filters, whitelist, blacklist and modifiers are represented by bitmasks. They are passed as
+    any iterables of enum members and converted to flag sets, which support the API of a set.
+    """
     users: Set[str] = field(default_factory=set)
     timeframe: Optional[Timeframe] = None
     blockchain: Optional[Blockchain] = None
     profile: Optional[Profile] = None
-    filters: Set[Filter] = field(default_factory=set)
-    whitelist: Set[Blockchain] = field(default_factory=set)
-    blacklist: Set[Blockchain] = field(default_factory=set)
-    modifiers: Set[Modifier] = field(default_factory=set)
+    filters: Set[Filter] = field(default_factory=lambda: MutableFlagSet(Filter))
+    whitelist: Set[Blockchain] = field(default_factory=lambda: MutableFlagSet(Blockchain))
+    blacklist: Set[Blockchain] = field(default_factory=lambda: MutableFlagSet(Blockchain))
+    modifiers: Set[Modifier] = field(default_factory=lambda: MutableFlagSet(Modifier))
     interval: Optional[Interval] = None
     currency: Optional[Currency] = None
     threshold: float = 0.0
 
+    def __post_init__(self) -> None:
+        for name, kind in (
+            ("filters", Filter),
+            ("whitelist", Blockchain),
+            ("blacklist", Blockchain),
+            ("modifiers", Modifier),
+        ):
+            members = getattr(self, name)
+            if type(members) is not MutableFlagSet:
+                setattr(self, name, MutableFlagSet(kind, members))
+
+    def copy(self) -> "Intent":
+        """Returns a copy of the intent that does not share any of its sets."""
+        return dataclasses.replace(
+            self,
+            users=set(self.users),
+            filters=self.filters.copy(),
+            whitelist=self.whitelist.copy(),
+            blacklist=self.blacklist.copy(),
+            modifiers=self.modifiers.copy(),
+        )
+
+    @property
+    def blockchain_pool(self) -> FlagSet:
+        """Returns the blockchains the intent selects from: the selected blockchain, the
+        whitelist, or all blockchains except the blacklist. An empty pool stands for all
+        blockchains if the intent does not restrict them."""
+        if self.blacklist:
+            return FlagSet(Blockchain, self.blacklist).complement()
+        if self.whitelist:
+            return FlagSet(Blockchain, self.whitelist)
+        if self.blockchain:
+            return FlagSet(Blockchain, (self.blockchain,))
+        return FlagSet(Blockchain)
+
     @property
     def raw(self) -> str:
-        """Returns the corresponding raw intent as a string."""
+        """Returns the corresponding raw intent as a string.
+
+        The users are sorted and the members of the filters, whitelist, blacklist and modifiers
+        are in the order of definition of their enum, hence the raw intent is deterministic.
+        """
         raw_intent = ""
         if self.users:
-            raw_intent += f"for {join(iter(self.users))} "
+            raw_intent += f"for {join(sorted(self.users))} "
         if self.timeframe:
             raw_intent += f"in the {self.timeframe.value} "
         if self.blockchain:
@@ -126,6 +174,31 @@ class Intent:
             raw_intent += f"as default"
         return raw_intent
 
+    @property
+    def canonical(self) -> str:
+        """Returns the canonical form of the intent, which is the same for all equal intents.
+
+        It is the raw intent of the intent without the default currency, USD, and with the
+        threshold as float, e.g., intents reaching "20" and "USD 20.0" have the same canonical
+        form. Unlike the raw intent, it includes the costs of an intent with an interval even if
+        they are 0. Like the raw intent, it can be parsed again.
+        """
+        currency = None if self.currency is Currency.USD else self.currency
+        intent = dataclasses.replace(self, currency=currency, threshold=float(self.threshold))
+        canonical = intent.raw
+        if self.interval and not self.threshold:
+            costs = f"{currency.value.upper()} 0.0" if currency else "0.0"
+            canonical += f"until the {self.interval.value} costs reach {costs} "
+        return canonical
+
+    @property
+    def content_hash(self) -> int:
+        """Returns a stable 64-bit hash of the canonical form of the intent as a signed integer,
+        e.g., to find equal intents in a database. Unlike the built-in hash, it does not change
+        between processes."""
+        digest = hashlib.blake2b(self.canonical.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
 
 def join_enum(members: Iterable[enum.Enum]) -> str:
     """Joins the values of the enum members and returns a string."""
@@ -0,0 +1,120 @@
+import collections
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .grammar import GRAMMAR, Grammar, NO_STATE, UNKNOWN_TOKEN
+
+
+class Trie:
+    """Prefix tree of the legal tokens of a state.
+
+    Every node holds the ranked completions of its prefix, that is the tokens starting with the
+    prefix ordered by length and then alphabetically. Hence, a lookup only walks the characters of
+    the prefix, independent of the number of tokens.
+    """
+
+    __slots__ = ("children", "completions")
+
+    def __init__(self, tokens: Iterable[str] = ()) -> None:
+        self.children: Dict[str, Trie] = {}
+        self.completions: Tuple[str, ...] = ()
+        ranked = sorted(set(tokens), key=lambda token: (len(token), token))
+        for token in ranked:
+            self._insert(token)
+
+    def _insert(self, token: str) -> None:
+        node = self
+        node.completions += (token,)
+        for char in token:
+            node = node.children.setdefault(char, Trie())
+            node.completions += (token,)
+
+    def complete(self, prefix: str) -> Tuple[str, ...]:
+        """Returns the ranked tokens starting with the prefix."""
+        node = self
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return ()
+        return node.completions
+
+
+def shortest_completions(grammar: Grammar) -> Tuple[Optional[Tuple[str, ...]], ...]:
+    """Computes the shortest sequence of tokens that leads from every state to an accepting state.
+
+    Traverses the reversed transitions breadth-first, starting from the accepting states, to find
+    the distance of every state. Then, the completion of a state is the token leading to its
+    closest successor followed by the completion of that successor, ties are broken by the token.
+    The fallback transition of a state is represented by its placeholder. The completion of an
+    accepting state is empty, states that cannot reach an accepting state have none.
+    """
+    predecessors: List[Set[int]] = [set() for _ in grammar.names]
+    labels: List[List[Tuple[str, int]]] = []
+    for state, row in enumerate(grammar.transitions):
+        state_labels = [(token, row[grammar.token_id(token)]) for token in grammar.expected[state]]
+        if grammar.placeholders[state] and row[UNKNOWN_TOKEN] != NO_STATE:
+            state_labels.append((grammar.placeholders[state], row[UNKNOWN_TOKEN]))
+        labels.append(state_labels)
+        for _, successor in state_labels:
+            predecessors[successor].add(state)
+
+    distances: Dict[int, int] = {
+        state: 0 for state, accepting in enumerate(grammar.accepting) if accepting
+    }
+    queue = collections.deque(distances)
+    while queue:
+        state = queue.popleft()
+        for predecessor in predecessors[state]:
+            if predecessor not in distances:
+                distances[predecessor] = distances[state] + 1
+                queue.append(predecessor)
+
+    completions: List[Optional[Tuple[str, ...]]] = [None] * len(grammar.names)
+    for state in sorted(distances, key=distances.get):
+        if grammar.accepting[state]:
+            completions[state] = ()
+            continue
+        _, label, successor = min(
+            (distances[successor], label, successor)
+            for label, successor in labels[state] if successor in distances
+        )
+        completions[state] = (label,) + completions[successor]
+    return tuple(completions)
+
+
+class Completer:
+    """Completer completes a partial token with the legal tokens of a state of the grammar, and
+    an incomplete intent with the shortest sequence of tokens that makes it complete.
+
+    A trie is built for every state of the grammar once, states with the same legal tokens share a
+    trie. The shortest completions of all states are precomputed as well. States are identified
+    by their name, as in the result of parsing an intent.
+    """
+
+    def __init__(self, grammar: Grammar = GRAMMAR) -> None:
+        tries: Dict[FrozenSet[str], Trie] = {}
+        self._tries: Dict[str, Trie] = {}
+        for name, expected in zip(grammar.names, grammar.expected):
+            if expected not in tries:
+                tries[expected] = Trie(expected)
+            self._tries[name] = tries[expected]
+        self._shortest: Dict[str, Optional[Tuple[str, ...]]] = dict(
+            zip(grammar.names, shortest_completions(grammar))
+        )
+
+    def complete(self, state: str, partial: str, limit: Optional[int] = None) -> List[str]:
+        """Returns the ranked completions of a partial token in a state, at most limit if given.
+        Partial tokens are matched case-insensitively, like the lexer does."""
+        trie = self._tries.get(state)
+        if trie is None:
+            return []
+        return list(trie.complete(partial.lower())[:limit])
+
+    def shortest(self, state: str) -> Optional[List[str]]:
+        """Returns the shortest sequence of tokens that leads from a state to an accepting state,
+        with placeholders for user names and thresholds. Returns None if there is no such sequence,
+        e.g., for the error state."""
+        completion = self._shortest.get(state)
+        return list(completion) if completion is not None else None
+
+
+COMPLETER = Completer()
@@ -0,0 +1,109 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .grammar import GRAMMAR, Grammar
+
+
+def edit_distance(source: str, target: str) -> int:
+    """Returns the Levenshtein distance of two strings, i.e., the minimum number of inserted,
+    deleted or substituted characters to turn one into the other."""
+    if len(source) < len(target):
+        source, target = target, source
+    previous = list(range(len(target) + 1))
+    for i, source_char in enumerate(source, 1):
+        current = [i]
+        for j, target_char in enumerate(target, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (source_char != target_char),
+            ))
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree of the legal tokens of a state.
+
+    Every child of a node is labeled with its edit distance to the node. Due to the triangle
+    inequality, a lookup only needs to descend into the children whose label differs from the
+    distance of the node to the looked up token by at most the maximum distance.
+    """
+
+    __slots__ = ("token", "children")
+
+    def __init__(self, token: str) -> None:
+        self.token = token
+        self.children: Dict[int, BKTree] = {}
+
+    @classmethod
+    def of(cls, tokens: Iterable[str]) -> Optional["BKTree"]:
+        """Builds a tree of the tokens, or returns None if there are no tokens."""
+        tree = None
+        for token in sorted(set(tokens)):
+            if tree is None:
+                tree = cls(token)
+            else:
+                tree._insert(token)
+        return tree
+
+    def _insert(self, token: str) -> None:
+        node = self
+        while True:
+            distance = edit_distance(token, node.token)
+            if distance not in node.children:
+                node.children[distance] = BKTree(token)
+                return
+            node = node.children[distance]
+
+    def search(self, token: str, max_distance: int) -> List[Tuple[int, str]]:
+        """Returns the tokens within the maximum distance of the token with their distances."""
+        matches = []
+        nodes = [self]
+        while nodes:
+            node = nodes.pop()
+            distance = edit_distance(token, node.token)
+            if distance <= max_distance:
+                matches.append((distance, node.token))
+            for label, child in node.children.items():
+                if distance - max_distance <= label <= distance + max_distance:
+                    nodes.append(child)
+        return matches
+
+
+class Corrector:
+    """Corrector suggests legal tokens of a state of the grammar for a mistyped token.
+
+    A BK-tree is built for every state of the grammar once, states with the same legal tokens share
+    a tree. States are identified by their name, as in the result of parsing an intent.
+    """
+
+    def __init__(self, grammar: Grammar = GRAMMAR) -> None:
+        trees: Dict[FrozenSet[str], Optional[BKTree]] = {}
+        self._trees: Dict[str, Optional[BKTree]] = {}
+        for name, expected in zip(grammar.names, grammar.expected):
+            if expected not in trees:
+                trees[expected] = BKTree.of(expected)
+            self._trees[name] = trees[expected]
+
+    @staticmethod
+    def max_distance(token: str) -> int:
+        """Maximum edit distance of a suggestion, which is smaller for short tokens, since almost
+        any short token is only a few edits away from another."""
+        return 1 if len(token) <= 4 else 2
+
+    def suggest(
+        self, state: str, token: str, max_distance: Optional[int] = None, limit: Optional[int] = 3
+    ) -> List[str]:
+        """Returns the legal tokens of a state within the maximum edit distance of a token, at most
+        limit if given. The closest tokens come first, ties are ordered alphabetically."""
+        tree = self._trees.get(state)
+        if tree is None:
+            return []
+        token = token.lower()
+        if max_distance is None:
+            max_distance = self.max_distance(token)
+        matches = tree.search(token, max_distance)
+        return [match for _, match in sorted(matches)][:limit]
+
+
+CORRECTOR = Corrector()
@@ -0,0 +1,119 @@
+import dataclasses
+import sys
+import types
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from .state import Action, ErrorState, ForState, State
+
+# Token id of every token that is not part of the vocabulary of the grammar, e.g., user names or
+# thresholds. Since it is negative, it indexes the last column of the transition table which holds
+# the fallback transition of a state.
+UNKNOWN_TOKEN = -1
+
+# Marks a missing transition in the transition table.
+NO_STATE = -1
+
+# Version of the format of an exported grammar. Must be incremented whenever the format changes
+# in a way that is incompatible with existing clients.
+EXPORT_VERSION = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class Grammar:
+    """Grammar is the compiled, immutable form of the Parser state machine.
+
+    States and vocabulary tokens are identified by integers. The transition table maps a state id
+    and a token id to the id of the successor state, the action table holds the semantic action
+    that is performed on the intent when the transition is taken. The last column of both tables
+    corresponds to the fallback transition for tokens that are not part of the vocabulary, the
+    placeholder of a state stands for the tokens accepted by its fallback. A single grammar is
+    shared by all parsers.
+    """
+
+    names: Tuple[str, ...]
+    accepting: Tuple[bool, ...]
+    vocabulary: Tuple[str, ...]
+    token_ids: Mapping[str, int]
+    transitions: Tuple[Tuple[int, ...], ...]
+    actions: Tuple[Tuple[Optional[Action], ...], ...]
+    expected: Tuple[FrozenSet[str], ...]
+    placeholders: Tuple[Optional[str], ...]
+    initial: int
+    error: int
+
+    def token_id(self, token: str) -> int:
+        """Returns the id of a token, or UNKNOWN_TOKEN if it is not part of the vocabulary."""
+        return self.token_ids.get(token, UNKNOWN_TOKEN)
+
+    def export(self) -> Dict[str, Any]:
+        """Exports the grammar as a JSON serializable dictionary, e.g., to validate intents on a
+        client.
+
+        The actions cannot be exported, hence a client can only check whether the tokens of an
+        intent are legal. The semantic validation of an intent is still done by the Parser.
+        """
+        return {
+            "version": EXPORT_VERSION,
+            "names": list(self.names),
+            "accepting": list(self.accepting),
+            "vocabulary": list(self.vocabulary),
+            "transitions": [list(row) for row in self.transitions],
+            "expected": [sorted(expected) for expected in self.expected],
+            "placeholders": list(self.placeholders),
+            "initial": self.initial,
+            "error": self.error,
+        }
+
+
+def compile_grammar(initial_state: State, error_state: State) -> Grammar:
+    """Compiles the state graph reachable from the initial state into a Grammar.
+
+    States are identified by their class, that is all instances of the same state class are merged
+    into a single state of the grammar. The expected tokens of a state correspond to the tokens it
+    defines transitions for.
+    """
+    states: List[State] = []
+    state_ids: Dict[type, int] = {}
+
+    def visit(state: State) -> int:
+        if type(state) not in state_ids:
+            state_ids[type(state)] = len(states)
+            states.append(state)
+        return state_ids[type(state)]
+
+    initial, error = visit(initial_state), visit(error_state)
+    edges: List[Dict[str, Tuple[int, Optional[Action]]]] = []
+    fallbacks: List[Optional[Tuple[int, Optional[Action]]]] = []
+    # States are appended while they are visited, hence the graph is traversed breadth-first.
+    for state in states:
+        edges.append({
+            token: (visit(successor_state), action)
+            for token, successor_state, action in state.edges()
+        })
+        fallback = state.fallback()
+        fallbacks.append(fallback and (visit(fallback[0]), fallback[1]))
+
+    tokens = {token for state_edges in edges for token in state_edges}
+    vocabulary = tuple(sys.intern(token) for token in sorted(tokens))
+    transitions, actions = [], []
+    for state_edges, fallback in zip(edges, fallbacks):
+        fallback = fallback or (NO_STATE, None)
+        row = [state_edges.get(token, fallback) for token in vocabulary] + [fallback]
+        transitions.append(tuple(successor for successor, _ in row))
+        actions.append(tuple(action for _, action in row))
+
+    return Grammar(
+        names=tuple(str(state) for state in states),
+        accepting=tuple(state.accepting for state in states),
+        vocabulary=vocabulary,
+        token_ids=types.MappingProxyType({token: i for i, token in enumerate(vocabulary)}),
+        transitions=tuple(transitions),
+        actions=tuple(actions),
+        expected=tuple(frozenset(state_edges) for state_edges in edges),
+        placeholders=tuple(state.placeholder for state in states),
+        initial=initial,
+        error=error,
+    )
+
+
+GRAMMAR = compile_grammar(ForState(), ErrorState())
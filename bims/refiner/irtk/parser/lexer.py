@@ -0,0 +1,55 @@
+import re
+from typing import List, NamedTuple
+
+from .grammar import GRAMMAR, Grammar, UNKNOWN_TOKEN
+
+
+class Token(NamedTuple):
+    """Token of an intent: the id of the token in the vocabulary of the grammar and its text.
+
+    Tokens that are not part of the vocabulary, e.g., user names or thresholds, have the id
+    UNKNOWN_TOKEN.
+    """
+    id: int
+    text: str
+
+
+class Lexer:
+    """Lexer splits a raw intent into tokens in a single pass.
+
+    Words are separated by whitespace and punctuation. Commas and other punctuation marks are
+    tokens of their own, whereas periods within a word are kept, e.g., in thresholds like '12.5',
+    and a period that starts a number, e.g., '.5', is part of it. For the words of the grammar,
+    numbers and user names made of letters, digits, periods, hyphens and underscores, this matches
+    the tokenization of nltk.word_tokenize without depending on NLTK. Unlike NLTK, other characters,
+    e.g., in 'alice@example.com', "alice's" or '(alice)', do not split a word, hence such user names
+    are single tokens.
+    """
+
+    _SCANNER = re.compile(r"[^\s,.;:!?]+(?:\.[^\s,.;:!?]+)*|\.\d+|\.\.\.|[,.;:!?]")
+
+    def __init__(self, grammar: Grammar = GRAMMAR) -> None:
+        self._vocabulary = grammar.vocabulary
+        self._token_ids = grammar.token_ids
+
+    def words(self, raw_intent: str) -> List[str]:
+        """Splits a raw intent into lowercase words, that is the texts of its tokens without looking
+        them up in the vocabulary. Intents that only differ in whitespace or case have the same
+        words."""
+        return self._SCANNER.findall(raw_intent.lower())
+
+    def tokenize(self, raw_intent: str) -> List[Token]:
+        """Splits a raw intent into lowercase tokens.
+
+        The text of tokens that are part of the vocabulary is the interned vocabulary string.
+        """
+        tokens = []
+        for text in self._SCANNER.findall(raw_intent.lower()):
+            token_id = self._token_ids.get(text, UNKNOWN_TOKEN)
+            if token_id != UNKNOWN_TOKEN:
+                text = self._vocabulary[token_id]
+            tokens.append(Token(token_id, text))
+        return tokens
+
+
+LEXER = Lexer()
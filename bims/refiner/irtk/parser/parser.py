@@ -1,23 +1,47 @@
 import logging
-from typing import Optional
-
-import nltk
+from typing import Iterable, NamedTuple, Optional, Sequence, Set
 
 from ..intent import Intent
-from .state import ErrorState, ForState, IllegalTransitionError
+from .grammar import GRAMMAR, Grammar, NO_STATE
+from .lexer import LEXER, Token
+from .result import ParseResult, Status
 from ..validation import ValidationError
 
 LOGGER = logging.getLogger(__name__)
 
 
+class Snapshot(NamedTuple):
+    """Snapshot of a Parser: the id of its current state, the number of tokens it parsed and a copy
+    of the parsed intent."""
+    state: int
+    position: int
+    intent: Intent
+
+
 class Parser:
-    """Intent Parser implemented as a State Machine."""
+    """Intent Parser implemented as a State Machine.
+
+    The Parser only keeps track of the id of its current state, the number of tokens it parsed and
+    the parsed intent. The state machine itself is the compiled Grammar, which is shared by all
+    parsers.
+    """
 
-    def __init__(self) -> None:
-        self._state = ForState()
-        self._error_state = ErrorState()
+    def __init__(self, grammar: Grammar = GRAMMAR) -> None:
+        self._grammar = grammar
+        self._state = grammar.initial
+        self._position = 0
         self._intent = Intent()
 
+    @property
+    def state(self) -> str:
+        """Name of the current state of the Parser."""
+        return self._grammar.names[self._state]
+
+    @property
+    def expected(self) -> Set[str]:
+        """Tokens for which the current state of the Parser defines a transition."""
+        return set(self._grammar.expected[self._state])
+
     @property
     def intent(self) -> Optional[Intent]:
         """Parsed intent of Parser.
@@ -25,11 +49,11 @@ class Parser:
         If the Parser is in an accepting state, it returns the parsed intent. Otherwise, the
         parsed intent is incomplete or invalid and None is returned.
         """
-        if not self._state.accepting:
+        if not self._grammar.accepting[self._state]:
             LOGGER.warning(
                 "%s: could not extract incomplete or invalid intent: %s is not an accepting state",
                 self,
-                self._state
+                self.state
             )
             return None
         return self._intent
@@ -38,6 +62,37 @@ class Parser:
     def intent(self, intent: Intent) -> None:
         self._intent = intent
 
+    def try_parse(self, raw_intent: str) -> ParseResult:
+        """Incrementally parses a raw intent without raising an exception.
+
+        Tokenizes the raw intent and passes the tokens to the current state of the Parser. Returns
+        the result of the first illegal or invalid token, if any. Otherwise, returns the result
+        for the state the Parser ends up in.
+        """
+        return self.try_parse_tokens(LEXER.tokenize(raw_intent))
+
+    def try_parse_tokens(self, tokens: Sequence[Token]) -> ParseResult:
+        """Incrementally parses the tokens of an intent without raising an exception."""
+        for token in tokens:
+            result = self.try_feed(token.text, token.id)
+            if result is not None:
+                return result
+        return self.result()
+
+    def result(self) -> ParseResult:
+        """Returns the result for the current state of the Parser, i.e., the parsed intent if it is
+        complete, or the expected tokens otherwise."""
+        if self._grammar.accepting[self._state]:
+            return ParseResult(
+                Status.COMPLETE, intent=self._intent, position=self._position, state=self.state
+            )
+        return ParseResult(
+            Status.INCOMPLETE,
+            position=self._position,
+            state=self.state,
+            expected=self._grammar.expected[self._state],
+        )
+
     def parse(self, raw_intent: str) -> Optional[Intent]:
         """Incrementally parses a raw intent.
 
@@ -45,15 +100,73 @@ class Parser:
         Parser. In case an illegal transition or a validation error occurs, the Parser transitions
         to the error state. Finally, attempts to return the parsed intent.
         """
-        tokens = nltk.word_tokenize(raw_intent.lower())
+        for token in LEXER.tokenize(raw_intent):
+            self.feed(token.text, token.id)
+        return self.intent
+
+    def parse_tokens(self, tokens: Iterable[str]) -> Optional[Intent]:
+        """Incrementally parses an already tokenized intent.
+
+        Passes the tokens to the current state of the Parser. In case an illegal transition or a
+        validation error occurs, the Parser transitions to the error state. Finally, attempts to
+        return the parsed intent.
+        """
         for token in tokens:
-            try:
-                self._state = self._state.run(token, self._intent)
-            except (IllegalTransitionError, ValidationError) as error:
-                LOGGER.warning(error)
-                self._state = self._error_state
-                raise
+            self.feed(token)
         return self.intent
 
+    def feed(self, token: str, token_id: Optional[int] = None) -> None:
+        """Passes a single token to the current state of the Parser.
+
+        The id of the token is looked up in the grammar, unless it is passed, e.g., by the lexer.
+        In case an illegal transition or a validation error occurs, the Parser transitions to the
+        error state and the error is raised.
+        """
+        result = self.try_feed(token, token_id)
+        if result is not None:
+            error = result.exception()
+            LOGGER.warning(error)
+            raise error
+
+    def try_feed(self, token: str, token_id: Optional[int] = None) -> Optional[ParseResult]:
+        """Passes a single token to the current state of the Parser without raising an exception.
+
+        Looks up the transition for the token in the grammar and performs the action attached to
+        it. Returns None if the token is accepted. Otherwise, the Parser transitions to the error
+        state and the result describing the illegal or invalid token is returned.
+        """
+        grammar = self._grammar
+        if token_id is None:
+            token_id = grammar.token_id(token)
+        successor_state = grammar.transitions[self._state][token_id]
+        if successor_state == NO_STATE:
+            return self._fail(Status.ILLEGAL, token, expected=grammar.expected[self._state])
+        action = grammar.actions[self._state][token_id]
+        if action is not None:
+            try:
+                action(token, self._intent)
+            except ValidationError as error:
+                return self._fail(Status.INVALID, token, detail=error.message)
+        self._state = successor_state
+        self._position += 1
+        return None
+
+    def snapshot(self) -> Snapshot:
+        """Returns a snapshot of the Parser, which is not affected by further parsing."""
+        return Snapshot(self._state, self._position, self._intent.copy())
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Restores the Parser from a snapshot. The snapshot itself is left untouched."""
+        self._state = snapshot.state
+        self._position = snapshot.position
+        self._intent = snapshot.intent.copy()
+
+    def _fail(self, status: Status, token: str, **details) -> ParseResult:
+        result = ParseResult(
+            status, position=self._position, token=token, state=self.state, **details
+        )
+        self._state = self._grammar.error
+        return result
+
     def __str__(self) -> str:
         return self.__class__.__name__
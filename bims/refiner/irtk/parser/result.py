@@ -0,0 +1,69 @@
+import dataclasses
+import enum
+from typing import FrozenSet, Optional
+
+from ..incompleteIntentException import IncompleteIntentException
+from ..intent import Intent
+from ..validation import ValidationError
+from .state import IllegalTransitionError
+
+
+class Status(enum.Enum):
+    """Enumeration of the outcomes of parsing an intent."""
+
+    COMPLETE = "complete"
+    INCOMPLETE = "incomplete"
+    ILLEGAL = "illegal"
+    INVALID = "invalid"
+
+
+@dataclasses.dataclass(frozen=True)
+class ParseResult:
+    """ParseResult describes the outcome of parsing an intent without raising an exception.
+
+    If the intent is complete, it holds the parsed intent. If the intent is incomplete, it holds
+    the expected tokens of the state the Parser stopped in. If an illegal or invalid token is
+    encountered, it holds the position and text of the offending token, the state it was
+    encountered in and, for illegal tokens, the expected tokens of that state. The expected tokens
+    are the precomputed sets of the grammar, hence they are frozen.
+    """
+
+    status: Status
+    intent: Optional[Intent] = None
+    position: Optional[int] = None
+    token: Optional[str] = None
+    state: Optional[str] = None
+    expected: FrozenSet[str] = frozenset()
+    detail: Optional[str] = None
+
+    @property
+    def complete(self) -> bool:
+        """Whether the intent is complete and valid."""
+        return self.status is Status.COMPLETE
+
+    @property
+    def message(self) -> str:
+        """Message of the outcome, which is the same as the message of the corresponding error.
+
+        The message is only formatted when it is actually accessed.
+        """
+        if self.status is Status.ILLEGAL:
+            return (
+                f"{self.state}: illegal transition: expected {set(self.expected)}, "
+                f"got '{self.token}'"
+            )
+        if self.status is Status.INVALID:
+            return self.detail
+        if self.status is Status.INCOMPLETE:
+            return "Intent is incomplete"
+        return ""
+
+    def exception(self) -> Optional[Exception]:
+        """Returns the error corresponding to the outcome, or None if the intent is complete."""
+        if self.status is Status.ILLEGAL:
+            return IllegalTransitionError(self.message, set(self.expected))
+        if self.status is Status.INVALID:
+            return ValidationError(self.message, [])
+        if self.status is Status.INCOMPLETE:
+            return IncompleteIntentException(self.message, set(self.expected))
+        return None
@@ -0,0 +1,105 @@
+import collections
+import itertools
+import threading
+from typing import Hashable, List, MutableMapping, NamedTuple, Optional
+
+from ..intent import Intent
+from .lexer import LEXER, Token
+from .parser import LOGGER, Parser, Snapshot
+from .result import ParseResult, Status
+
+
+class _Entry(NamedTuple):
+    tokens: List[Token]
+    length: int
+    snapshot: Snapshot
+
+
+class ParseSession:
+    """ParseSession parses successive versions of the same intent, e.g., while it is typed.
+
+    After each token, a snapshot of the parser is cached, keyed by the token prefix parsed so far.
+    A new version of the intent is parsed starting from the snapshot of its longest cached prefix,
+    so that only the changed tail is actually parsed. The cache is a bounded LRU cache.
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self._maxsize = maxsize
+        self._snapshots: MutableMapping[int, _Entry] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def parse(self, parser: Parser, raw_intent: str) -> Optional[Intent]:
+        """Parses a raw intent with a fresh parser.
+
+        Raises the same errors as Parser.parse and returns the parsed intent, or None if the
+        intent is incomplete.
+        """
+        result = self.try_parse(parser, raw_intent)
+        error = result.exception()
+        if error and result.status is not Status.INCOMPLETE:
+            LOGGER.warning(error)
+            raise error
+        return result.intent
+
+    def try_parse(self, parser: Parser, raw_intent: str) -> ParseResult:
+        """Parses a raw intent with a fresh parser without raising an exception.
+
+        Restores the parser from the snapshot of the longest cached prefix of the tokens first and
+        parses the remaining tokens.
+        """
+        tokens = LEXER.tokenize(raw_intent)
+        # The key of a prefix is derived from the key of the prefix one token shorter. Thereby, the
+        # keys of all prefixes are computed in a single pass.
+        keys = list(itertools.accumulate(tokens, lambda key, token: hash((key, token)), initial=0))
+
+        start = self._resume(parser, tokens, keys)
+        # Only the snapshots of the last tokens survive in the cache. Hence, the snapshots of the
+        # tokens before are not even taken.
+        first_cached = max(start, len(tokens) - self._maxsize)
+        for i in range(start, len(tokens)):
+            result = parser.try_feed(tokens[i].text, tokens[i].id)
+            if result is not None:
+                return result
+            if i >= first_cached:
+                self._save(keys[i + 1], _Entry(tokens, i + 1, parser.snapshot()))
+        return parser.result()
+
+    def _resume(self, parser: Parser, tokens: List[Token], keys: List[int]) -> int:
+        """Restores the parser from the longest cached prefix. Returns the length of the prefix."""
+        with self._lock:
+            for length in range(len(tokens), 0, -1):
+                entry = self._snapshots.get(keys[length])
+                # Different prefixes may collide on the same key. Hence, the prefix is compared.
+                if entry and entry.length == length and entry.tokens[:length] == tokens[:length]:
+                    self._snapshots.move_to_end(keys[length])
+                    parser.restore(entry.snapshot)
+                    return length
+        return 0
+
+    def _save(self, key: int, entry: _Entry) -> None:
+        with self._lock:
+            self._snapshots[key] = entry
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self._maxsize:
+                self._snapshots.popitem(last=False)
+
+
+class ParseSessions:
+    """Bounded LRU cache of parse sessions, e.g., one session per user."""
+
+    def __init__(self, maxsize: int = 1024, session_maxsize: int = 64) -> None:
+        self._maxsize = maxsize
+        self._session_maxsize = session_maxsize
+        self._sessions: MutableMapping[Hashable, ParseSession] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> ParseSession:
+        """Returns the session for the key. Creates a new session if there is none."""
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = ParseSession(self._session_maxsize)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self._maxsize:
+                self._sessions.popitem(last=False)
+            return session
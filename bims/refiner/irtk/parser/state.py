@@ -1,13 +1,17 @@
 import abc
 import logging
-from typing import Mapping, Optional
+from typing import Callable, Iterator, Mapping, Optional, Tuple
 
 from ..intent import Blockchain, Currency, Filter, Intent, Interval, Modifier, Profile, Timeframe
 from ..validation import ValidationError
+from ..vocabulary import VOCABULARY
 
 LOGGER = logging.getLogger(__name__)
 
 Transitions = Mapping[str, "State"]
+Action = Callable[[str, Intent], None]
+Edge = Tuple[str, "State", Optional[Action]]
+Fallback = Tuple["State", Optional[Action]]
 
 
 class IllegalTransitionError(Exception):
@@ -27,6 +31,9 @@ class State(abc.ABC):
     Defines interface and base implementation for all other states.
     """
 
+    # Stands for the tokens accepted by the fallback of the state, e.g., in completions.
+    placeholder: Optional[str] = None
+
     def __init__(self, transitions: Optional[Transitions] = None, accepting: bool = False) -> None:
         self.accepting = accepting
         self._transitions = transitions or {}
@@ -46,6 +53,23 @@ class State(abc.ABC):
             )
         return self._transitions[token]
 
+    def edges(self) -> Iterator[Edge]:
+        """Yields the outgoing transitions of the state.
+
+        Each edge consists of the token, the successor state and the action that is performed on
+        the intent when the transition is taken. Used to compile the state graph into a grammar.
+        """
+        for token, successor_state in self._transitions.items():
+            yield token, successor_state, None
+
+    def fallback(self) -> Optional[Fallback]:
+        """Returns the successor state and action for tokens without a transition.
+
+        By default, a state does not accept any tokens other than the ones it defines transitions
+        for and None is returned.
+        """
+        return None
+
     def __str__(self) -> str:
         return self.__class__.__name__
 
@@ -68,6 +92,10 @@ class ValidationState(State):
         self._validate(token, intent)
         return successor_state
 
+    def edges(self) -> Iterator[Edge]:
+        for token, successor_state, _ in super().edges():
+            yield token, successor_state, self._validate
+
     @abc.abstractmethod
     def _validate(self, token: str, intent: Intent) -> None:
         raise NotImplementedError
@@ -83,10 +111,15 @@ class ForState(State):
 class UserState(ValidationState):
     """User state, expects a username and leads to the InSelectState."""
 
+    placeholder = "<user>"
+
     def run(self, token: str, intent: Intent) -> State:
         self._validate(token, intent)
         return InSelectState(self)
 
+    def fallback(self) -> Optional[Fallback]:
+        return InSelectState(self), self._validate
+
     def _validate(self, token: str, intent: Intent) -> None:
         # Validation?
         intent.users.add(token)
@@ -120,7 +153,7 @@ class TimeframeState(ValidationState):
         super().__init__(transitions=dict.fromkeys(Timeframe.values(), SelectState()))
 
     def _validate(self, token: str, intent: Intent) -> None:
-        intent.timeframe = Timeframe(token)
+        intent.timeframe = VOCABULARY.member(Timeframe, token)
 
 
 class SelectState(State):
@@ -145,8 +178,9 @@ class TheBlockchainState(ValidationState):
         )
 
     def _validate(self, token: str, intent: Intent) -> None:
-        if token in Blockchain.values():
-            intent.blockchain = Blockchain(token)
+        blockchain = VOCABULARY.find(Blockchain, token)
+        if blockchain:
+            intent.blockchain = blockchain
 
 
 class WithUntilAsState(State):
@@ -170,7 +204,7 @@ class ProfileState(ValidationState):
         super().__init__(transitions=dict.fromkeys(Profile.values(), FilterBlockchainState()))
 
     def _validate(self, token: str, intent: Intent) -> None:
-        intent.profile = Profile(token)
+        intent.profile = VOCABULARY.member(Profile, token)
 
 
 class FilterStateValidator:
@@ -197,9 +231,9 @@ class FilterStateValidator:
 
         Checks filter options for exclusions and conflicts and acts accordingly.
         """
-        if token not in Filter.values():
+        filter_ = VOCABULARY.find(Filter, token)
+        if not filter_:
             return
-        filter_ = Filter(token)
         if filter_ in self._CONFLICTS and self._CONFLICTS[filter_] in intent.filters:
             raise ValidationError(
                 f"{self}: validation error: filters '{token}' and "
@@ -289,7 +323,7 @@ class WhitelistState(ValidationState):
         )
 
     def _validate(self, token: str, intent: Intent) -> None:
-        intent.whitelist.add(Blockchain(token))
+        intent.whitelist.add(VOCABULARY.member(Blockchain, token))
 
 
 class WhitelistWithUntilAsState(State):
@@ -318,7 +352,7 @@ class BlacklistState(ValidationState):
         )
 
     def _validate(self, token: str, intent: Intent) -> None:
-        intent.blacklist.add(Blockchain(token))
+        intent.blacklist.add(VOCABULARY.member(Blockchain, token))
 
 
 class BlacklistWithUntilAsState(State):
@@ -345,7 +379,7 @@ class ModifierState(ValidationState):
         super().__init__(transitions=dict.fromkeys(Modifier.values(), UntilAsState(self)))
 
     def _validate(self, token: str, intent: Intent) -> None:
-        intent.modifiers.add(Modifier(token))
+        intent.modifiers.add(VOCABULARY.member(Modifier, token))
 
 
 class UntilAsState(State):
@@ -376,7 +410,7 @@ class IntervalState(ValidationState):
         super().__init__(transitions=dict.fromkeys(Interval.values(), CostsState()))
 
     def _validate(self, token: str, intent: Intent) -> None:
-        intent.interval = Interval(token)
+        intent.interval = VOCABULARY.member(Interval, token)
 
 
 class CostsState(State):
@@ -401,6 +435,8 @@ class CurrencyThresholdState(ValidationState):
     the default currency (USD) is used.
     """
 
+    placeholder = "<threshold>"
+
     def __init__(self) -> None:
         self._threshold_state = ThresholdState()
         super().__init__(transitions=dict.fromkeys(Currency.values(), self._threshold_state))
@@ -417,8 +453,11 @@ class CurrencyThresholdState(ValidationState):
         self._validate(token, intent)
         return self._transitions[token]
 
+    def fallback(self) -> Optional[Fallback]:
+        return self._threshold_state.fallback()
+
     def _validate(self, token: str, intent: Intent) -> None:
-        intent.currency = Currency(token)
+        intent.currency = VOCABULARY.member(Currency, token)
 
 
 class ThresholdState(ValidationState):
@@ -427,6 +466,8 @@ class ThresholdState(ValidationState):
     Validates the threshold, by attempting to convert it to a float.
     """
 
+    placeholder = "<threshold>"
+
     def run(self, token: str, intent: Intent) -> State:
         """Validates the threshold. In case the token is not a float, a validation error is
         raised. Otherwise, the PolicyState is returned as successor state.
@@ -434,6 +475,9 @@ class ThresholdState(ValidationState):
         self._validate(token, intent)
         return PolicyState()
 
+    def fallback(self) -> Optional[Fallback]:
+        return PolicyState(), self._validate
+
     def _validate(self, token: str, intent: Intent) -> None:
         try:
             intent.threshold = float(token)  # float("NaN") -> nan
@@ -498,3 +542,6 @@ class ErrorState(State):
         # Regardless of the input token, when run it always returns a reference to itself.
         # Therefore, once this state is reached, it cannot be left.
         return self
+
+    def fallback(self) -> Optional[Fallback]:
+        return self, None
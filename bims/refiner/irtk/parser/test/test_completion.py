@@ -0,0 +1,100 @@
+import logging
+import unittest
+
+import ddt
+
+from irtk.parser.completion import COMPLETER, Trie, shortest_completions
+from irtk.parser.grammar import GRAMMAR
+from irtk.parser.lexer import LEXER
+from irtk.parser.parser import Parser
+
+logging.disable(logging.CRITICAL)
+
+
+@ddt.ddt
+class TestTrie(unittest.TestCase):
+    _trie = Trie(["ethereum", "eos", "eth", "bitcoin", "eos"])
+
+    @ddt.data(
+        ("", ["eos", "eth", "bitcoin", "ethereum"]),
+        ("e", ["eos", "eth", "ethereum"]),
+        ("eth", ["eth", "ethereum"]),
+        ("ethe", ["ethereum"]),
+        ("ethereum", ["ethereum"]),
+        ("ethereums", []),
+        ("x", []),
+    )
+    @ddt.unpack
+    def test_complete(self, prefix: str, expected: list) -> None:
+        self.assertEqual(list(self._trie.complete(prefix)), expected)
+
+
+@ddt.ddt
+class TestCompleter(unittest.TestCase):
+    @ddt.data(
+        ("", "f", ["for"]),
+        ("for client1 select", "ethe", ["ethereum"]),
+        ("for client1 select", "The", ["the"]),
+        ("for client1 select the", "", ["fastest", "cheapest"]),
+        ("for client1 select the fastest", "p", ["public", "popular", "private"]),
+        ("for client1 select the fastest", "xyz", []),
+    )
+    @ddt.unpack
+    def test_complete(self, raw_intent: str, partial: str, expected: list) -> None:
+        result = Parser().try_parse(raw_intent)
+        self.assertEqual(COMPLETER.complete(result.state, partial), expected)
+
+    def test_limit(self) -> None:
+        state = Parser().try_parse("for client1 select the fastest").state
+        self.assertEqual(COMPLETER.complete(state, "p", limit=2), ["public", "popular"])
+
+    def test_expected(self) -> None:
+        parser = Parser()
+        parser.try_parse("for client1 select")
+        self.assertEqual(set(COMPLETER.complete(parser.state, "")), parser.expected)
+
+    def test_unknown_state(self) -> None:
+        self.assertEqual(COMPLETER.complete("UnknownState", "e"), [])
+        self.assertIsNone(COMPLETER.shortest("UnknownState"))
+
+    @ddt.data(
+        ("", ["for", "<user>", "select", "bitcoin", "as", "default"]),
+        ("for client1 select the", ["cheapest", "blockchain", "as", "default"]),
+        ("for client1 select eos until the", ["daily", "costs", "reach", "<threshold>"]),
+        ("for client1 select eos until the daily costs reach chf", ["<threshold>"]),
+        ("for client1 select eos as default", []),
+    )
+    @ddt.unpack
+    def test_shortest(self, raw_intent: str, expected: list) -> None:
+        state = Parser().try_parse(raw_intent).state
+        self.assertEqual(COMPLETER.shortest(state), expected)
+
+    def test_shortest_error_state(self) -> None:
+        self.assertIsNone(COMPLETER.shortest(GRAMMAR.names[GRAMMAR.error]))
+
+    @ddt.data(*GRAMMAR.names)
+    def test_shortest_completes(self, state: str) -> None:
+        completion = COMPLETER.shortest(state)
+        if completion is None:
+            return
+        parser = Parser()
+        parser.restore(parser.snapshot()._replace(state=GRAMMAR.names.index(state)))
+        tokens = [{"<user>": "client1", "<threshold>": "10"}.get(t, t) for t in completion]
+        self.assertTrue(parser.try_parse_tokens(
+            [LEXER.tokenize(token)[0] for token in tokens]
+        ).complete)
+
+    def test_shortest_is_shortest(self) -> None:
+        completions = shortest_completions(GRAMMAR)
+        for state, completion in enumerate(completions):
+            if completion is None or GRAMMAR.accepting[state]:
+                continue
+            successors = [
+                completions[successor] for successor in set(GRAMMAR.transitions[state])
+                if successor >= 0 and completions[successor] is not None
+            ]
+            self.assertEqual(len(completion), 1 + min(map(len, successors)))
+
+
+if __name__ == "__main__":
+    unittest.main()
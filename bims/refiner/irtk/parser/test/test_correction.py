@@ -0,0 +1,76 @@
+import logging
+import unittest
+
+import ddt
+
+from irtk.parser.correction import CORRECTOR, BKTree, edit_distance
+from irtk.parser.parser import Parser
+
+logging.disable(logging.CRITICAL)
+
+
+@ddt.ddt
+class TestEditDistance(unittest.TestCase):
+    @ddt.data(
+        ("", "", 0),
+        ("eos", "", 3),
+        ("", "eos", 3),
+        ("ethereum", "ethereum", 0),
+        ("etherum", "ethereum", 1),
+        ("bitcion", "bitcoin", 2),
+        ("kitten", "sitting", 3),
+    )
+    @ddt.unpack
+    def test_edit_distance(self, source: str, target: str, expected: int) -> None:
+        self.assertEqual(edit_distance(source, target), expected)
+        self.assertEqual(edit_distance(target, source), expected)
+
+
+@ddt.ddt
+class TestBKTree(unittest.TestCase):
+    _tokens = ["bitcoin", "ethereum", "eos", "iota", "hyperledger", "stellar", "eth", "cardano"]
+
+    @ddt.data(("etherum", 1), ("eso", 2), ("xyz", 3), ("bitcion", 2), ("stellar", 0))
+    @ddt.unpack
+    def test_search(self, token: str, max_distance: int) -> None:
+        expected = {
+            (edit_distance(token, candidate), candidate) for candidate in self._tokens
+            if edit_distance(token, candidate) <= max_distance
+        }
+        tree = BKTree.of(self._tokens)
+        self.assertEqual(set(tree.search(token, max_distance)), expected)
+
+    def test_empty(self) -> None:
+        self.assertIsNone(BKTree.of([]))
+
+
+@ddt.ddt
+class TestCorrector(unittest.TestCase):
+    @ddt.data(
+        ("for client1 select etherum", ["ethereum"]),
+        ("for client1 select bitcion", ["bitcoin"]),
+        ("for client1 select Etherum", ["ethereum"]),
+        ("for client1 select the fastets", ["fastest"]),
+        ("fr", ["for"]),
+        ("for client1 select xyzxyzxyz", []),
+    )
+    @ddt.unpack
+    def test_suggest(self, raw_intent: str, expected: list) -> None:
+        result = Parser().try_parse(raw_intent)
+        self.assertEqual(CORRECTOR.suggest(result.state, result.token), expected)
+
+    def test_order(self) -> None:
+        state = Parser().try_parse("for client1 select the fastest").state
+        suggestions = CORRECTOR.suggest(state, "pubic", max_distance=4, limit=None)
+        self.assertEqual(suggestions[0], "public")
+        distances = [edit_distance("pubic", suggestion) for suggestion in suggestions]
+        self.assertEqual(distances, sorted(distances))
+        limited = CORRECTOR.suggest(state, "pubic", max_distance=4, limit=2)
+        self.assertEqual(limited, suggestions[:2])
+
+    def test_unknown_state(self) -> None:
+        self.assertEqual(CORRECTOR.suggest("UnknownState", "eos"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import logging
+import unittest
+
+import ddt
+
+from irtk.intent import Blockchain, Filter, Intent, Interval, Modifier, Profile, Timeframe
+from irtk.parser.grammar import EXPORT_VERSION, GRAMMAR, NO_STATE, UNKNOWN_TOKEN
+from irtk.parser.parser import Parser
+from irtk.parser.state import \
+    CurrencyThresholdState, \
+    ErrorState, \
+    ForState, \
+    IllegalTransitionError, \
+    PolicyState, \
+    ThresholdState, \
+    UserState
+
+logging.disable(logging.CRITICAL)
+
+
+def state_graph():
+    """Yields one instance of every state class reachable from the ForState."""
+    visited = set()
+    states = [ForState()]
+    while states:
+        state = states.pop()
+        if type(state) in visited:
+            continue
+        visited.add(type(state))
+        yield state
+        states.extend(successor_state for _, successor_state, _ in state.edges())
+        fallback = state.fallback()
+        if fallback:
+            states.append(fallback[0])
+
+
+@ddt.ddt
+class TestGrammar(unittest.TestCase):
+    def test_states(self) -> None:
+        self.assertCountEqual(
+            GRAMMAR.names,
+            [str(state) for state in state_graph()] + [str(ErrorState())],
+        )
+        self.assertEqual(GRAMMAR.names[GRAMMAR.initial], str(ForState()))
+        self.assertEqual(GRAMMAR.names[GRAMMAR.error], str(ErrorState()))
+
+    def test_expected(self) -> None:
+        for state in state_graph():
+            state_id = GRAMMAR.names.index(str(state))
+            self.assertEqual(GRAMMAR.expected[state_id], {token for token, _, _ in state.edges()})
+            self.assertEqual(GRAMMAR.accepting[state_id], state.accepting)
+
+    @ddt.data(*{
+        token for values in (Blockchain, Filter, Modifier, Profile, Interval, Timeframe)
+        for token in values.values()
+    })
+    def test_vocabulary(self, token: str) -> None:
+        self.assertEqual(GRAMMAR.vocabulary[GRAMMAR.token_id(token)], token)
+
+    def test_unknown_token(self) -> None:
+        self.assertEqual(GRAMMAR.token_id("client"), UNKNOWN_TOKEN)
+
+    @ddt.data(UserState, CurrencyThresholdState, ThresholdState, ErrorState)
+    def test_fallback(self, state: type) -> None:
+        state_id = GRAMMAR.names.index(state.__name__)
+        self.assertNotEqual(GRAMMAR.transitions[state_id][UNKNOWN_TOKEN], NO_STATE)
+
+    @ddt.data(ForState, PolicyState)
+    def test_no_fallback(self, state: type) -> None:
+        state_id = GRAMMAR.names.index(state.__name__)
+        self.assertEqual(GRAMMAR.transitions[state_id][UNKNOWN_TOKEN], NO_STATE)
+
+    def test_shared(self) -> None:
+        self.assertIs(Parser()._grammar, Parser()._grammar)
+
+    def test_parse_matches_state_graph(self) -> None:
+        intent = Intent(
+            users={"client"},
+            timeframe=Timeframe.MORNING,
+            profile=Profile.FASTEST,
+            filters={Filter.CHEAP, Filter.STABLE},
+            blacklist={Blockchain.EOS, Blockchain.IOTA},
+            modifiers={Modifier.SPLITTING},
+            interval=Interval.MONTHLY,
+            threshold=12.5,
+        )
+        state, expected = ForState(), Intent()
+        for token in intent.raw.lower().replace(",", " ,").split():
+            state = state.run(token, expected)
+        self.assertEqual(Parser().parse(intent.raw), expected)
+
+    @ddt.data(
+        ("for client select", {"the", *Blockchain.values()}),
+        ("for client select the", set(Profile.values())),
+        ("for client in the", set(Timeframe.values())),
+    )
+    @ddt.unpack
+    def test_illegal_transition_expected(self, raw_intent: str, expected: set) -> None:
+        parser = Parser()
+        parser.parse(raw_intent)
+        self.assertEqual(parser.expected, expected)
+        with self.assertRaises(IllegalTransitionError) as context:
+            parser.parse("invalid")
+        self.assertEqual(context.exception.expected, expected)
+
+    def test_export(self) -> None:
+        exported = json.loads(json.dumps(GRAMMAR.export()))
+        self.assertEqual(exported["version"], EXPORT_VERSION)
+        self.assertEqual(exported["names"], list(GRAMMAR.names))
+        self.assertEqual(exported["vocabulary"], list(GRAMMAR.vocabulary))
+        self.assertEqual(exported["transitions"], [list(row) for row in GRAMMAR.transitions])
+        self.assertEqual([set(e) for e in exported["expected"]], list(GRAMMAR.expected))
+        self.assertEqual(exported["placeholders"], list(GRAMMAR.placeholders))
+        self.assertEqual(exported["accepting"], list(GRAMMAR.accepting))
+        self.assertEqual(exported["initial"], GRAMMAR.initial)
+        self.assertEqual(exported["error"], GRAMMAR.error)
+
+
+if __name__ == "__main__":
+    unittest.main()
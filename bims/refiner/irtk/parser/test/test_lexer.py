@@ -0,0 +1,82 @@
+import logging
+import unittest
+
+import ddt
+
+from irtk.parser.grammar import GRAMMAR, UNKNOWN_TOKEN
+from irtk.parser.lexer import LEXER
+
+try:
+    import nltk
+except ImportError:
+    nltk = None
+
+logging.disable(logging.CRITICAL)
+
+INTENTS = (
+    "For client1 select the fastest Blockchain as default",
+    "for client1, client2 and client3 select the cheapest fast, stable blockchain as default",
+    "for client1,client2 select eos until the daily costs reach CHF 12.5",
+    "for client in the morning select bitcoin with encryption until the weekly costs reach 20.",
+    "for client select the fastest blockchain except iota and eos as default",
+    "for client-1 and client_2 select eos until the monthly costs reach .5",
+    "for client select eos until the yearly costs reach 12.5...",
+    "",
+)
+
+
+@ddt.ddt
+class TestLexer(unittest.TestCase):
+    @ddt.data(
+        ("for client1 select", ["for", "client1", "select"]),
+        ("FOR Client1", ["for", "client1"]),
+        ("for a,b and c", ["for", "a", ",", "b", "and", "c"]),
+        ("reach 12.5", ["reach", "12.5"]),
+        ("reach 20.", ["reach", "20", "."]),
+        ("reach .5", ["reach", ".5"]),
+        ("reach 20...", ["reach", "20", "..."]),
+        ("for user.name", ["for", "user.name"]),
+        ("  for   client  ", ["for", "client"]),
+    )
+    @ddt.unpack
+    def test_tokenize(self, raw_intent: str, expected: list) -> None:
+        self.assertEqual([token.text for token in LEXER.tokenize(raw_intent)], expected)
+
+    @ddt.data(*INTENTS)
+    def test_words(self, raw_intent: str) -> None:
+        self.assertEqual(
+            LEXER.words(raw_intent), [token.text for token in LEXER.tokenize(raw_intent)]
+        )
+
+    def test_token_ids(self) -> None:
+        tokens = LEXER.tokenize("For client1 select Ethereum")
+        self.assertEqual([token.id for token in tokens], [
+            GRAMMAR.token_id("for"), UNKNOWN_TOKEN, GRAMMAR.token_id("select"),
+            GRAMMAR.token_id("ethereum"),
+        ])
+
+    def test_interned(self) -> None:
+        token = LEXER.tokenize("Ethereum")[0]
+        self.assertIs(token.text, GRAMMAR.vocabulary[token.id])
+
+    @unittest.skipIf(nltk is None, "NLTK is not installed")
+    @ddt.data(*INTENTS)
+    def test_nltk(self, raw_intent: str) -> None:
+        # an intent is a single sentence, hence it is not split into sentences with punkt first
+        expected = nltk.word_tokenize(raw_intent.lower(), preserve_line=True)
+        self.assertEqual([token.text for token in LEXER.tokenize(raw_intent)], expected)
+
+    @ddt.data(
+        ("for alice@example.com", ["for", "alice@example.com"]),
+        ("for alice's", ["for", "alice's"]),
+        ("for (alice)", ["for", "(alice)"]),
+        ("reach $20", ["reach", "$20"]),
+    )
+    @ddt.unpack
+    def test_not_nltk(self, raw_intent: str, expected: list) -> None:
+        """Other characters than punctuation do not split a word, unlike with NLTK."""
+        self.assertEqual([token.text for token in LEXER.tokenize(raw_intent)], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
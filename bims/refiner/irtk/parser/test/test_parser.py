@@ -5,6 +5,7 @@ import ddt
 
 from irtk.intent import Blockchain, Currency, Filter, Intent, Interval, Modifier, Profile, Timeframe
 from irtk.parser.parser import Parser
+from irtk.parser.result import Status
 from irtk.parser.state import IllegalTransitionError
 from irtk.validation import ValidationError
 
@@ -136,6 +137,46 @@ class TestParser(unittest.TestCase):
         parsed_intent = self._parser.parse(intent.raw)
         self.assertIsNone(parsed_intent.timeframe)
 
+    def test_try_parse_complete(self) -> None:
+        intent = Intent(users={"client"}, profile=Profile.CHEAPEST)
+        result = self._parser.try_parse(intent.raw)
+        self.assertEqual(result.status, Status.COMPLETE)
+        self.assertEqual(result.intent, intent)
+        self.assertIsNone(result.exception())
+
+    def test_try_parse_incomplete(self) -> None:
+        result = self._parser.try_parse("for client select the")
+        self.assertEqual(result.status, Status.INCOMPLETE)
+        self.assertEqual(result.position, 4)
+        self.assertEqual(result.expected, Profile.values())
+        self.assertIsNone(result.intent)
+        self.assertEqual(result.message, "Intent is incomplete")
+
+    def test_try_parse_illegal(self) -> None:
+        result = self._parser.try_parse("for client select the invalid blockchain")
+        self.assertEqual(result.status, Status.ILLEGAL)
+        self.assertEqual((result.position, result.token), (4, "invalid"))
+        self.assertEqual(result.state, "ProfileState")
+        self.assertEqual(result.expected, Profile.values())
+        self.assertIsInstance(result.exception(), IllegalTransitionError)
+
+    def test_try_parse_invalid(self) -> None:
+        result = self._parser.try_parse(
+            "for client select the fastest private and public blockchain as default"
+        )
+        self.assertEqual(result.status, Status.INVALID)
+        self.assertEqual((result.position, result.token), (7, "public"))
+        self.assertEqual(result.expected, set())
+        self.assertIsInstance(result.exception(), ValidationError)
+
+    def test_parse_raises_same_error_as_try_parse(self) -> None:
+        raw_intent = "for client select the invalid"
+        result = Parser().try_parse(raw_intent)
+        with self.assertRaises(IllegalTransitionError) as context:
+            self._parser.parse(raw_intent)
+        self.assertEqual(context.exception.message, result.message)
+        self.assertEqual(context.exception.expected, result.expected)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,93 @@
+import logging
+import unittest
+from unittest import mock
+
+import ddt
+
+from irtk.intent import Blockchain, Intent, Interval, Profile
+from irtk.parser.parser import Parser
+from irtk.parser.session import ParseSession, ParseSessions
+from irtk.parser.state import IllegalTransitionError
+
+logging.disable(logging.CRITICAL)
+
+INTENT = "for client1 and client2 select the cheapest blockchain until the daily costs reach 20"
+
+
+@ddt.ddt
+class TestParseSession(unittest.TestCase):
+    def setUp(self) -> None:
+        self._session = ParseSession()
+
+    def _parse(self, raw_intent: str):
+        """Parses the raw intent, returns the intent and the number of parsed tokens."""
+        parser = Parser()
+        with mock.patch.object(parser, "try_feed", wraps=parser.try_feed) as feed:
+            intent = self._session.parse(parser, raw_intent)
+        return intent, feed.call_count
+
+    def test_parse(self) -> None:
+        intent, parsed = self._parse(INTENT)
+        self.assertEqual(intent, Parser().parse(INTENT))
+        self.assertEqual(parsed, 14)
+
+    def test_resume(self) -> None:
+        prefix = INTENT.rsplit(" ", 1)[0]
+        self._parse(prefix)
+        intent, parsed = self._parse(INTENT)
+        self.assertEqual(intent, Parser().parse(INTENT))
+        self.assertEqual(parsed, 1)
+
+    def test_resume_identical(self) -> None:
+        self._parse(INTENT)
+        intent, parsed = self._parse(INTENT)
+        self.assertEqual(intent, Parser().parse(INTENT))
+        self.assertEqual(parsed, 0)
+
+    def test_resume_does_not_modify_snapshots(self) -> None:
+        self._parse("for client1 select")
+        intent, _ = self._parse("for client1 select bitcoin as default")
+        intent.users.add("client2")
+        intent, _ = self._parse("for client1 select ethereum as default")
+        self.assertEqual(intent, Intent(users={"client1"}, blockchain=Blockchain.ETHEREUM))
+
+    def test_edit_in_the_middle(self) -> None:
+        self._parse(INTENT)
+        edited = INTENT.replace("cheapest", "fastest")
+        intent, parsed = self._parse(edited)
+        self.assertEqual(intent, Intent(
+            users={"client1", "client2"},
+            profile=Profile.FASTEST,
+            interval=Interval.DAILY,
+            threshold=20.0,
+        ))
+        self.assertEqual(parsed, 8)
+
+    def test_error(self) -> None:
+        self.assertRaises(IllegalTransitionError, self._parse, "for client1 select invalid")
+        self.assertRaises(IllegalTransitionError, self._parse, "for client1 select invalid")
+
+    @ddt.data(1, 3)
+    def test_maxsize(self, maxsize: int) -> None:
+        self._session = ParseSession(maxsize)
+        self._parse(INTENT)
+        self.assertEqual(len(self._session._snapshots), maxsize)
+        _, parsed = self._parse(INTENT)
+        self.assertEqual(parsed, 0)
+
+
+class TestParseSessions(unittest.TestCase):
+    def test_get(self) -> None:
+        sessions = ParseSessions()
+        self.assertIs(sessions.get(1), sessions.get(1))
+        self.assertIsNot(sessions.get(1), sessions.get(2))
+
+    def test_maxsize(self) -> None:
+        sessions = ParseSessions(maxsize=1)
+        session = sessions.get(1)
+        sessions.get(2)
+        self.assertIsNot(sessions.get(1), session)
+
+
+if __name__ == "__main__":
+    unittest.main()
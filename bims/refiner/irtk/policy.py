@@ -2,9 +2,10 @@ import dataclasses
 from dataclasses import field
 import enum
 import json
-from typing import Any, Dict, Set
+from typing import AbstractSet, Any, Dict
 
 from .config import TIME_DAY_START, TIME_AFTERNOON_START, TIME_NIGHT_START
+from .flags import FlagSet
 from .intent import Blockchain
 
 
@@ -80,7 +81,7 @@ class Policy:
     currency: Currency = field(default_factory=lambda: Currency.USD)
     threshold: float = field(default_factory=float)
     split_txs: bool = field(default_factory=bool)
-    blockchain_pool: Set[Blockchain] = field(default_factory=set)
+    blockchain_pool: AbstractSet[Blockchain] = field(default_factory=lambda: FlagSet(Blockchain))
     blockchain_type: BlockchainType = field(default_factory=lambda: BlockchainType.INDIFFERENT)
 
     # The default values for min_tx_rate, max_block_time, and min_data_size are taken from the
@@ -1,27 +1,114 @@
+import dataclasses
 import logging
-from typing import List, Optional
+from typing import Callable, Iterable, Iterator, List, Optional, Union
 
 from .parser.parser import Parser
+from .parser.result import ParseResult, Status
+from .parser.session import ParseSession
 from .translator import Translator
 from .policy import Policy
-from .incompleteIntentException import IncompleteIntentException
+from .validation import ValidationError
 
 LOGGER = logging.getLogger(__name__)
 
 TRANSLATOR = Translator()
 
 
-def refine(raw_intent: str) -> Optional[List[Policy]]:
+@dataclasses.dataclass(frozen=True)
+class RefineResult(ParseResult):
+    """RefineResult describes the outcome of refining an intent without raising an exception.
+
+    In addition to the outcome of parsing, it holds the low-level policies if the intent is
+    complete and valid.
+    """
+
+    policies: Optional[List[Policy]] = None
+
+    @classmethod
+    def of(cls, result: ParseResult, **changes) -> "RefineResult":
+        """Returns a RefineResult with the outcome of parsing and the given changes."""
+        fields = {field.name: getattr(result, field.name) for field in dataclasses.fields(result)}
+        return cls(**{**fields, **changes})
+
+
+def refine_checked(raw_intent: str, session: Optional[ParseSession] = None) -> RefineResult:
     """Parses an intent. If it is a valid intent it also translates the parsed intent into a list
-    of low-level policies and returns them.
+    of low-level policies. Instead of raising an exception, returns the outcome as a result.
+
+    If a parse session is passed, parsing resumes from the longest prefix of the intent that was
+    already parsed in this session.
     """
     parser = Parser()
-    intent = parser.parse(raw_intent)
+    result = session.try_parse(parser, raw_intent) if session else parser.try_parse(raw_intent)
+    return translate_checked(result)
+
+
+def translate_checked(result: ParseResult) -> RefineResult:
+    """Translates the intent of a parse result into a list of low-level policies if it is complete
+    and valid. Instead of raising an exception, returns the outcome as a result."""
+    if not result.complete:
+        return RefineResult.of(result)
 
-    if not intent:
-        LOGGER.warning("Refiner: could not refine incomplete or invalid intent")
-        raise IncompleteIntentException("Intent is incomplete",
-                                        set(parser._state._transitions))
+    try:
+        policies = TRANSLATOR.translate(result.intent)
+    except ValidationError as error:
+        return RefineResult.of(result, status=Status.INVALID, detail=error.message)
+    return RefineResult.of(result, policies=policies)
 
-    policies = TRANSLATOR.translate(intent)
-    return policies
+
+def validate_checked(raw_intent: str, session: Optional[ParseSession] = None) -> ParseResult:
+    """Parses an intent and validates it without translating it into low-level policies, e.g., to
+    check an intent while it is typed. Returns the same status and message as refine_checked, but
+    no policies.
+
+    If a parse session is passed, parsing resumes from the longest prefix of the intent that was
+    already parsed in this session.
+    """
+    parser = Parser()
+    result = session.try_parse(parser, raw_intent) if session else parser.try_parse(raw_intent)
+    if not result.complete:
+        return result
+
+    try:
+        TRANSLATOR.validate(result.intent)
+    except ValidationError as error:
+        return dataclasses.replace(result, status=Status.INVALID, detail=error.message)
+    return result
+
+
+def refine(raw_intent: str, session: Optional[ParseSession] = None) -> Optional[List[Policy]]:
+    """Parses an intent. If it is a valid intent it also translates the parsed intent into a list
+    of low-level policies and returns them.
+
+    If a parse session is passed, parsing resumes from the longest prefix of the intent that was
+    already parsed in this session.
+    """
+    result = refine_checked(raw_intent, session)
+    error = result.exception()
+    if error:
+        LOGGER.warning("Refiner: could not refine incomplete or invalid intent: %s", result.message)
+        raise error
+    return result.policies
+
+
+def refine_many(
+    raw_intents: Iterable[str], refine_one: Callable[[str], RefineResult] = refine_checked
+) -> Iterator[Union[RefineResult, Exception]]:
+    """Refines many intents, e.g., from a provisioning script, and yields the result of every
+    intent in order as soon as it is refined.
+
+    All intents share the lexer, the compiled grammar, the translator and the cached conversion
+    rates, hence a batch only pays for them once. Intents are consumed lazily, so that results can
+    be streamed while the remaining intents are still read. If refining an intent raises an
+    exception, e.g., since the conversion rate of its currency does not exist, the exception is
+    yielded instead of its result and the remaining intents are still refined. Every intent is
+    refined by refine_one, e.g., to look up the result in a cache first.
+    """
+    for raw_intent in raw_intents:
+        try:
+            result = refine_one(raw_intent)
+        except Exception as error:
+            LOGGER.warning("Refiner: could not refine intent '%s': %s", raw_intent, error)
+            yield error
+            continue
+        yield result
@@ -0,0 +1,74 @@
+import logging
+import unittest
+
+import ddt
+
+from irtk.encoding import ENCODING_VERSION, decode_intent, encode_intent
+from irtk.intent import Blockchain, Intent
+from irtk.parser.parser import Parser
+
+logging.disable(logging.CRITICAL)
+
+
+@ddt.ddt
+class TestEncoding(unittest.TestCase):
+    @ddt.data(
+        "for client1 select the fastest blockchain as default",
+        "for a, b and c in the night select eos as default",
+        "for a select the cheapest fast, stable and public blockchain from iota and eos with "
+        "encryption and splitting until the weekly costs reach chf 20.5",
+        "for a select the fastest blockchain except bitcoin and stellar until the yearly costs "
+        "reach 1000",
+        "for user.name select hyperledger with redundancy until the monthly costs reach usd 3",
+    )
+    def test_round_trip(self, raw_intent: str) -> None:
+        intent = Parser().parse(raw_intent)
+        self.assertEqual(decode_intent(encode_intent(intent)), intent)
+
+    def test_empty(self) -> None:
+        self.assertEqual(decode_intent(encode_intent(Intent())), Intent())
+
+    def test_deterministic(self) -> None:
+        intent = Intent(users={"b", "a", "c"}, whitelist={Blockchain.IOTA, Blockchain.EOS})
+        other = Intent(users={"c", "a", "b"}, whitelist={Blockchain.EOS, Blockchain.IOTA})
+        self.assertEqual(encode_intent(intent), encode_intent(other))
+
+    def test_size(self) -> None:
+        intent = Parser().parse("for client1 select the fastest blockchain as default")
+        # version, packed fields, threshold, number of users and a single user name
+        self.assertEqual(len(encode_intent(intent)), 1 + 8 + 8 + 1 + 1 + len("client1"))
+
+    @ddt.data(127, 128, 65535, 65536)
+    def test_long_user(self, length: int) -> None:
+        intent = Intent(users={"a" * length})
+        self.assertEqual(decode_intent(encode_intent(intent)), intent)
+
+    def test_many_users(self) -> None:
+        intent = Intent(users={f"client{i}" for i in range(65536)})
+        self.assertEqual(decode_intent(encode_intent(intent)), intent)
+
+    def test_unicode_users(self) -> None:
+        intent = Intent(users={"zoë", "ünïcode"})
+        self.assertEqual(decode_intent(encode_intent(intent)).users, {"zoë", "ünïcode"})
+
+    @ddt.data(
+        b"",
+        bytes([ENCODING_VERSION + 1]) + bytes(18),
+        bytes([ENCODING_VERSION]) + b"\xff" * 8 + bytes(10),
+        bytes([ENCODING_VERSION]) + bytes(16) + b"\x80",
+    )
+    def test_invalid(self, data: bytes) -> None:
+        with self.assertRaises(ValueError):
+            decode_intent(data)
+
+    def test_truncated(self) -> None:
+        data = encode_intent(Intent(users={"client1"}))
+        for length in (len(data) - 1, len(data) - len("client1") - 1):
+            with self.assertRaises(ValueError):
+                decode_intent(data[:length])
+        with self.assertRaises(ValueError):
+            decode_intent(data + b"\x00")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import pickle
+import unittest
+
+import ddt
+
+from irtk.flags import FlagSet, MutableFlagSet, all_of, mask_of, members_of
+from irtk.intent import Blockchain, Filter, Intent, Modifier
+
+
+@ddt.ddt
+class TestFlagSet(unittest.TestCase):
+    @ddt.data(
+        set(),
+        {Blockchain.BITCOIN},
+        {Blockchain.EOS, Blockchain.IOTA, Blockchain.STELLAR},
+        set(Blockchain),
+    )
+    def test_set_api(self, members: set) -> None:
+        flag_set = FlagSet(Blockchain, members)
+        self.assertEqual(flag_set, members)
+        self.assertEqual(members, flag_set)
+        self.assertEqual(set(flag_set), members)
+        self.assertEqual(len(flag_set), len(members))
+        self.assertEqual(bool(flag_set), bool(members))
+        for blockchain in Blockchain:
+            self.assertEqual(blockchain in flag_set, blockchain in members)
+        self.assertEqual(flag_set.complement(), set(Blockchain) - members)
+        self.assertEqual(hash(flag_set), hash(frozenset(members)))
+
+    def test_mask(self) -> None:
+        self.assertEqual(mask_of(Modifier, [Modifier.ENCRYPTION, Modifier.SPLITTING]), 0b101)
+        self.assertEqual(members_of(Modifier, 0b101), (Modifier.ENCRYPTION, Modifier.SPLITTING))
+        self.assertEqual(all_of(Blockchain), (1 << len(Blockchain)) - 1)
+        with self.assertRaises(ValueError):
+            FlagSet.from_mask(Modifier, 0b1000)
+
+    def test_operators(self) -> None:
+        a = FlagSet(Blockchain, [Blockchain.BITCOIN, Blockchain.EOS])
+        b = FlagSet(Blockchain, [Blockchain.EOS, Blockchain.IOTA])
+        self.assertEqual(a | b, {Blockchain.BITCOIN, Blockchain.EOS, Blockchain.IOTA})
+        self.assertEqual(a & b, {Blockchain.EOS})
+        self.assertEqual(a - b, {Blockchain.BITCOIN})
+        self.assertEqual(a - {Blockchain.BITCOIN}, {Blockchain.EOS})
+        self.assertEqual(set(Blockchain) - a, a.complement())
+        self.assertIsInstance(a | b, FlagSet)
+
+    def test_named_methods(self) -> None:
+        a = FlagSet(Blockchain, [Blockchain.BITCOIN, Blockchain.EOS])
+        self.assertEqual(a.union([Blockchain.IOTA]), {*a, Blockchain.IOTA})
+        self.assertEqual(a.intersection({Blockchain.EOS, "eos"}), {Blockchain.EOS})
+        self.assertEqual(a.difference(set()), a)
+        self.assertEqual(a.symmetric_difference({Blockchain.EOS}), {Blockchain.BITCOIN})
+        self.assertTrue(a.issubset(set(Blockchain)))
+        self.assertFalse(a.issuperset(set(Blockchain)))
+
+    def test_mutable(self) -> None:
+        filters = MutableFlagSet(Filter)
+        filters.add(Filter.FAST)
+        filters.add(Filter.FAST)
+        filters |= {Filter.CHEAP}
+        self.assertEqual(filters, {Filter.FAST, Filter.CHEAP})
+        filters.discard(Filter.FAST)
+        self.assertEqual(filters, {Filter.CHEAP})
+        frozen = filters.freeze()
+        filters.clear()
+        self.assertEqual(frozen, {Filter.CHEAP})
+        with self.assertRaises(TypeError):
+            hash(filters)
+
+    def test_bytes(self) -> None:
+        flag_set = FlagSet(Blockchain, [Blockchain.BITCOIN, Blockchain.STELLAR])
+        data = flag_set.to_bytes()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(FlagSet.from_bytes(Blockchain, data), flag_set)
+
+    def test_pickle(self) -> None:
+        flag_set = MutableFlagSet(Blockchain, [Blockchain.EOS])
+        restored = pickle.loads(pickle.dumps(flag_set))
+        self.assertEqual(restored, flag_set)
+        self.assertIsInstance(restored, MutableFlagSet)
+
+
+class TestIntentFlags(unittest.TestCase):
+    def test_converted(self) -> None:
+        intent = Intent(filters={Filter.FAST}, blacklist=[Blockchain.EOS])
+        self.assertIsInstance(intent.filters, MutableFlagSet)
+        self.assertIsInstance(intent.blacklist, MutableFlagSet)
+        self.assertEqual(intent, Intent(filters={Filter.FAST}, blacklist={Blockchain.EOS}))
+
+    def test_copy(self) -> None:
+        intent = Intent(modifiers={Modifier.REDUNDANCY})
+        copy = intent.copy()
+        copy.modifiers.add(Modifier.ENCRYPTION)
+        self.assertEqual(intent.modifiers, {Modifier.REDUNDANCY})
+
+
+if __name__ == "__main__":
+    unittest.main()
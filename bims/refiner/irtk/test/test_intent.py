@@ -0,0 +1,103 @@
+import logging
+import unittest
+
+import ddt
+
+from irtk.intent import Blockchain, Currency, Filter, Intent, Interval, Profile
+from irtk.parser.parser import Parser
+
+logging.disable(logging.CRITICAL)
+
+
+@ddt.ddt
+class TestCanonical(unittest.TestCase):
+    @ddt.data(
+        (
+            "for b, a and c select the fastest blockchain as default",
+            "For C, B and A select the fastest blockchain as default",
+        ),
+        (
+            "for a select the cheapest stable, fast blockchain until the daily costs reach usd 20",
+            "for a select the cheapest fast and stable blockchain until the daily costs reach 20.0",
+        ),
+        (
+            "for a select the fastest blockchain except iota, eos and bitcoin as default",
+            "for a select the fastest blockchain except bitcoin, eos and iota as default",
+        ),
+    )
+    @ddt.unpack
+    def test_equal(self, raw_intent: str, other: str) -> None:
+        intent, other_intent = Parser().parse(raw_intent), Parser().parse(other)
+        self.assertEqual(intent.canonical, other_intent.canonical)
+        self.assertEqual(intent.content_hash, other_intent.content_hash)
+
+    @ddt.data(
+        (
+            "for a select the fastest blockchain as default",
+            "for b select the fastest blockchain as default",
+        ),
+        (
+            "for a select the cheapest blockchain until the daily costs reach chf 20",
+            "for a select the cheapest blockchain until the daily costs reach 20",
+        ),
+        (
+            "for a select eos until the daily costs reach 0",
+            "for a select eos until the weekly costs reach 0",
+        ),
+        (
+            "for a select eos until the daily costs reach chf 0",
+            "for a select eos until the daily costs reach 0",
+        ),
+    )
+    @ddt.unpack
+    def test_not_equal(self, raw_intent: str, other: str) -> None:
+        intent, other_intent = Parser().parse(raw_intent), Parser().parse(other)
+        self.assertNotEqual(intent.canonical, other_intent.canonical)
+        self.assertNotEqual(intent.content_hash, other_intent.content_hash)
+
+    def test_canonical(self) -> None:
+        intent = Intent(
+            users={"b", "a"},
+            profile=Profile.CHEAPEST,
+            filters={Filter.STABLE, Filter.FAST},
+            blacklist={Blockchain.IOTA, Blockchain.EOS},
+            interval=Interval.DAILY,
+            currency=Currency.CHF,
+            threshold=20,
+        )
+        self.assertEqual(
+            intent.canonical,
+            "for a and b select the cheapest fast and stable blockchain except eos and iota "
+            "until the daily costs reach CHF 20.0 ",
+        )
+        self.assertEqual(Parser().parse(intent.canonical).canonical, intent.canonical)
+
+    def test_canonical_zero_costs(self) -> None:
+        intent = Parser().parse("for a select eos until the weekly costs reach usd 0")
+        self.assertEqual(intent.canonical, "for a select eos until the weekly costs reach 0.0 ")
+        self.assertEqual(Parser().parse(intent.canonical).canonical, intent.canonical)
+
+    def test_stable_hash(self) -> None:
+        intent = Parser().parse("for a select the fastest blockchain as default")
+        self.assertEqual(intent.canonical, "for a select the fastest blockchain as default")
+        self.assertEqual(intent.content_hash, -6819087936801337983)
+        self.assertTrue(-(2 ** 63) <= intent.content_hash < 2 ** 63)
+
+
+@ddt.ddt
+class TestBlockchainPool(unittest.TestCase):
+    @ddt.data(
+        ("for a select the fastest blockchain as default", set()),
+        ("for a select eos as default", {Blockchain.EOS}),
+        ("for a select the fastest blockchain from eos and iota as default",
+         {Blockchain.EOS, Blockchain.IOTA}),
+        ("for a select the fastest blockchain except eos as default",
+         set(Blockchain) - {Blockchain.EOS}),
+    )
+    @ddt.unpack
+    def test_blockchain_pool(self, raw_intent: str, expected: set) -> None:
+        self.assertEqual(Parser().parse(raw_intent).blockchain_pool, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
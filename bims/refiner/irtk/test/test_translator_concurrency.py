@@ -0,0 +1,67 @@
+import concurrent.futures
+import logging
+import unittest
+
+from irtk.intent import Blockchain, Currency, Filter, Intent, Interval, Modifier, Profile
+from irtk.intent import Timeframe
+from irtk.translator import Translator
+
+logging.disable(logging.CRITICAL)
+
+CONVERSION_RATES = {Currency.CHF: 1.05, Currency.EUR: 1.10}
+
+
+class StaticRepository:
+    """Repository with static conversion rates, which does not access any database."""
+
+    @staticmethod
+    def find_conversion_rate(currency: Currency) -> float:
+        return CONVERSION_RATES[currency]
+
+
+def intents():
+    """Yields intents which differ in every option that is translated."""
+    currencies = [None, Currency.USD, Currency.CHF, Currency.EUR]
+    blockchains = list(Blockchain)
+    for i in range(64):
+        yield Intent(
+            users={f"client{i}", f"client{i + 1}"},
+            timeframe=list(Timeframe)[i % len(Timeframe)] if i % 3 else None,
+            profile=list(Profile)[i % len(Profile)] if i % 2 else None,
+            filters={list(Filter)[i % len(Filter)]} if i % 5 else set(),
+            blockchain=blockchains[i % len(blockchains)] if i % 4 == 0 else None,
+            whitelist={blockchains[i % len(blockchains)]} if i % 4 == 1 else set(),
+            blacklist={blockchains[i % len(blockchains)]} if i % 4 == 2 else set(),
+            modifiers={list(Modifier)[i % len(Modifier)]} if i % 7 else set(),
+            interval=list(Interval)[i % len(Interval)],
+            currency=currencies[i % len(currencies)],
+            threshold=float(i + 1),
+        )
+
+
+class TestTranslatorConcurrency(unittest.TestCase):
+    def test_concurrent_translations(self) -> None:
+        test_intents = list(intents())
+        originals = [intent.copy() for intent in test_intents]
+        expected = [Translator(StaticRepository()).translate(intent) for intent in test_intents]
+
+        translator = Translator(StaticRepository())
+        jobs = [i % len(test_intents) for i in range(4096)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda i: translator.translate(test_intents[i]), jobs))
+
+        for i, policies in zip(jobs, results):
+            self.assertCountEqual(policies, expected[i])
+        self.assertEqual(test_intents, originals)
+
+    def test_threshold_not_modified(self) -> None:
+        intent = Intent(users={"client"}, threshold=10.0, currency=Currency.CHF)
+        translator = Translator(StaticRepository())
+        for _ in range(2):
+            policies = translator.translate(intent)
+            self.assertAlmostEqual(policies[0].threshold, 10.0 * CONVERSION_RATES[Currency.CHF])
+        self.assertEqual(intent.threshold, 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
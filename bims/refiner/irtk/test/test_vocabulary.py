@@ -0,0 +1,55 @@
+import unittest
+
+import ddt
+
+from irtk.intent import AutoName, Blockchain, Currency, Filter, Interval, Modifier, Profile
+from irtk.intent import Timeframe
+from irtk.vocabulary import VOCABULARY, Vocabulary
+
+
+@ddt.ddt
+class TestVocabulary(unittest.TestCase):
+    @ddt.data(Timeframe, Blockchain, Profile, Filter, Modifier, Interval, Currency)
+    def test_values(self, kind: AutoName) -> None:
+        self.assertEqual(VOCABULARY.values[kind], {member.value for member in kind})
+        self.assertIs(VOCABULARY.values[kind], kind.values())
+        self.assertIsInstance(kind.values(), frozenset)
+
+    @ddt.data(
+        ("ethereum", Blockchain, Blockchain.ETHEREUM),
+        ("fastest", Profile, Profile.FASTEST),
+        ("stable", Filter, Filter.STABLE),
+        ("encryption", Modifier, Modifier.ENCRYPTION),
+        ("monthly", Interval, Interval.MONTHLY),
+        ("chf", Currency, Currency.CHF),
+        ("morning", Timeframe, Timeframe.MORNING),
+    )
+    @ddt.unpack
+    def test_lookup(self, token: str, kind: AutoName, member: AutoName) -> None:
+        self.assertEqual(VOCABULARY.classify(token), (kind, member))
+        self.assertIs(VOCABULARY.find(kind, token), member)
+        self.assertIs(VOCABULARY.member(kind, token), member)
+
+    @ddt.data(("select", Blockchain), ("ethereum", Filter), ("Ethereum", Blockchain))
+    @ddt.unpack
+    def test_lookup_unknown(self, token: str, kind: AutoName) -> None:
+        self.assertIsNone(VOCABULARY.find(kind, token))
+        with self.assertRaises(ValueError):
+            VOCABULARY.member(kind, token)
+
+    def test_classify_unknown(self) -> None:
+        self.assertIsNone(VOCABULARY.classify("client1"))
+
+    def test_members(self) -> None:
+        self.assertEqual(VOCABULARY.members[Blockchain], frozenset(Blockchain))
+
+    def test_names(self) -> None:
+        self.assertIs(VOCABULARY.names[Currency]["CHF"], Currency.CHF)
+
+    def test_ambiguous(self) -> None:
+        with self.assertRaises(ValueError):
+            Vocabulary(Blockchain, Blockchain)
+
+
+if __name__ == "__main__":
+    unittest.main()
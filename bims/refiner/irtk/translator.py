@@ -1,10 +1,11 @@
-import copy
+import dataclasses
 from typing import List, Optional, Set
 
 from .config import MIN_TX_RATE, MAX_TX_COST, MIN_POPULARITY, MIN_STABILITY
 from .database.repository import Repository
-from .intent import Blockchain, Currency, Filter, Intent, Modifier, Profile, Timeframe
-from .policy import CostProfile, Interval, Policy, Time
+from .flags import FlagSet
+from .intent import Blockchain, Currency, Filter, Intent, Interval, Modifier, Profile, Timeframe
+from .policy import CostProfile, Interval as PolicyInterval, Policy, Time
 from .validation import ValidationError
 
 
@@ -13,7 +14,7 @@ class Translator:
 
     A policy is created for every user that the intent is specified for. The intent is also
     validated as part of the translation. The same translator instance can be used to translate
-    multiple intents.
+    multiple intents, also concurrently, since it does not keep any state of a translation.
     """
 
     _TIMEFRAME = {
@@ -28,68 +29,87 @@ class Translator:
         Profile.FASTEST: CostProfile.PERFORMANCE,
     }
 
+    _INTERVAL = {interval: PolicyInterval(interval.value) for interval in Interval}
+
     def __init__(self, repository: Optional[Repository] = None) -> None:
         self._repository = repository or Repository()
-        self._policy = Policy()
 
     def translate(self, intent: Intent) -> List[Policy]:
-        """Translates the intent into a set of low-level policies."""
-        self._policy = Policy()
-        self._translate_base(intent)
+        """Translates the intent into a set of low-level policies.
+
+        The policy is built in local state only and the intent is not modified, hence intents can
+        be translated concurrently by the same translator.
+        """
+        policy = Policy()
+        self._translate_base(intent, policy)
         if intent.filters:
-            self._translate_filters(intent)
+            self._translate_filters(intent, policy)
         if intent.modifiers:
-            self._translate_modifiers(intent)
-        policies = self._map_policy_to_users(intent.users)
+            self._translate_modifiers(intent, policy)
+        policies = self._map_policy_to_users(policy, intent.users)
         return policies
 
-    def _translate_base(self, intent: Intent) -> None:
+    def validate(self, intent: Intent) -> None:
+        """Validates the intent without translating it.
+
+        Only performs the checks of the translation that can fail, that is the blockchain pool
+        must not be empty and the conversion rate of the currency must exist. The conversion
+        rates are cached, hence validating an intent does usually not access the database.
+        """
+        if intent.threshold and intent.currency and intent.currency is not Currency.USD:
+            self._repository.find_conversion_rate(intent.currency)
+        if intent.blacklist:
+            self._check_blockchain_pool(intent.blockchain_pool)
+
+    def _translate_base(self, intent: Intent, policy: Policy) -> None:
         if intent.profile:
-            self._policy.cost_profile = self._PROFILE[intent.profile]
+            policy.cost_profile = self._PROFILE[intent.profile]
         if intent.timeframe:
-            self._policy.timeframe_start, self._policy.timeframe_end = \
-                self._TIMEFRAME[intent.timeframe]
+            policy.timeframe_start, policy.timeframe_end = self._TIMEFRAME[intent.timeframe]
         if intent.interval:
-            self._policy.interval = Interval(intent.interval.value)
+            policy.interval = self._INTERVAL[intent.interval]
         if intent.threshold:
+            threshold = intent.threshold
             if intent.currency and intent.currency is not Currency.USD:
-                intent.threshold *= self._repository.find_conversion_rate(intent.currency)
-            self._policy.threshold = intent.threshold
-        if intent.blockchain:
-            self._policy.blockchain_pool = {intent.blockchain}
-        if intent.whitelist:
-            self._policy.blockchain_pool = intent.whitelist
+                threshold *= self._repository.find_conversion_rate(intent.currency)
+            policy.threshold = threshold
+        if intent.blockchain or intent.whitelist or intent.blacklist:
+            policy.blockchain_pool = intent.blockchain_pool
         if intent.blacklist:
-            self._policy.blockchain_pool = {*Blockchain} - intent.blacklist
-            if not self._policy.blockchain_pool:
-                raise ValidationError("invalid policy: blockchain pool cannot be empty", [])
+            self._check_blockchain_pool(policy.blockchain_pool)
+
+    @staticmethod
+    def _check_blockchain_pool(blockchain_pool: FlagSet) -> None:
+        if not blockchain_pool:
+            raise ValidationError("invalid policy: blockchain pool cannot be empty", [])
 
-    def _translate_filters(self, intent: Intent) -> None:
+    @staticmethod
+    def _translate_filters(intent: Intent, policy: Policy) -> None:
         if Filter.PUBLIC in intent.filters:
-            self._policy.blockchain_type = Filter.PUBLIC.value
+            policy.blockchain_type = Filter.PUBLIC.value
         if Filter.PRIVATE in intent.filters:
-            self._policy.blockchain_type = Filter.PRIVATE.value
+            policy.blockchain_type = Filter.PRIVATE.value
         if Filter.FAST in intent.filters:
-            self._policy.min_tx_rate = MIN_TX_RATE
+            policy.min_tx_rate = MIN_TX_RATE
         if Filter.CHEAP in intent.filters:
-            self._policy.max_tx_cost = MAX_TX_COST
+            policy.max_tx_cost = MAX_TX_COST
         if Filter.STABLE in intent.filters:
-            self._policy.min_stability = MIN_STABILITY
+            policy.min_stability = MIN_STABILITY
         if Filter.POPULAR in intent.filters:
-            self._policy.min_popularity = MIN_POPULARITY
+            policy.min_popularity = MIN_POPULARITY
 
-    def _translate_modifiers(self, intent: Intent) -> None:
+    @staticmethod
+    def _translate_modifiers(intent: Intent, policy: Policy) -> None:
         if Modifier.SPLITTING in intent.modifiers:
-            self._policy.split_txs = True
+            policy.split_txs = True
         if Modifier.ENCRYPTION in intent.modifiers:
-            self._policy.encryption = True
+            policy.encryption = True
         if Modifier.REDUNDANCY in intent.modifiers:
-            self._policy.redundancy = True
-
-    def _map_policy_to_users(self, users: Set[str]) -> List[Policy]:
-        policies = []
-        for user in users:
-            policy = copy.deepcopy(self._policy)
-            policy.user = user
-            policies.append(policy)
-        return policies
+            policy.redundancy = True
+
+    @staticmethod
+    def _map_policy_to_users(policy: Policy, users: Set[str]) -> List[Policy]:
+        # The policies of all users only differ in the user. The other fields are immutable, i.e.,
+        # enums, numbers and the blockchain pool flag set, hence they are shared instead of copied.
+        policy.blockchain_pool = FlagSet(Blockchain, policy.blockchain_pool)
+        return [dataclasses.replace(policy, user=user) for user in users]
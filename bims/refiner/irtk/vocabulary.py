@@ -0,0 +1,60 @@
+import sys
+import types
+from typing import FrozenSet, Mapping, Optional, Tuple, Type, TypeVar
+
+from .intent import AutoName, Blockchain, Currency, Filter, Interval, Modifier, Profile, Timeframe
+
+Member = TypeVar("Member", bound=AutoName)
+
+
+class Vocabulary:
+    """Vocabulary is a registry of the enums whose values are tokens of an intent.
+
+    All lookups are precomputed when the vocabulary is built: a single mapping from every token
+    to its enum and member, the frozen sets of values and members of every enum, and the reverse
+    mappings from member names to members. The values of the enums must be distinct.
+    """
+
+    def __init__(self, *kinds: Type[AutoName]) -> None:
+        self.kinds = kinds
+        tokens = {}
+        for kind in kinds:
+            for member in kind:
+                if member.value in tokens:
+                    raise ValueError(f"{self}: token '{member.value}' is ambiguous")
+                tokens[sys.intern(member.value)] = (kind, member)
+        self.tokens: Mapping[str, Tuple[Type[AutoName], AutoName]] = types.MappingProxyType(tokens)
+        self.values: Mapping[Type[AutoName], FrozenSet[str]] = types.MappingProxyType(
+            {kind: kind.values() for kind in kinds}
+        )
+        self.members: Mapping[Type[AutoName], FrozenSet[AutoName]] = types.MappingProxyType(
+            {kind: frozenset(kind) for kind in kinds}
+        )
+        self.names: Mapping[Type[AutoName], Mapping[str, AutoName]] = types.MappingProxyType({
+            kind: types.MappingProxyType(dict(kind.__members__)) for kind in kinds
+        })
+
+    def classify(self, token: str) -> Optional[Tuple[Type[AutoName], AutoName]]:
+        """Returns the enum and member of a token, or None if it is not part of the vocabulary."""
+        return self.tokens.get(token)
+
+    def find(self, kind: Type[Member], token: str) -> Optional[Member]:
+        """Returns the member of the enum with the token as value, or None if there is none."""
+        entry = self.tokens.get(token)
+        return entry[1] if entry is not None and entry[0] is kind else None
+
+    def member(self, kind: Type[Member], token: str) -> Member:
+        """Returns the member of the enum with the token as value.
+
+        Like calling the enum with the token, raises a ValueError if there is no such member.
+        """
+        member = self.find(kind, token)
+        if member is None:
+            raise ValueError(f"'{token}' is not a valid {kind.__name__}")
+        return member
+
+    def __str__(self) -> str:
+        return self.__class__.__name__
+
+
+VOCABULARY = Vocabulary(Timeframe, Blockchain, Profile, Filter, Modifier, Interval, Currency)
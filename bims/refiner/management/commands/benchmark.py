@@ -0,0 +1,36 @@
+import json
+import platform
+import time
+
+from django.core.management.base import BaseCommand
+
+from refiner.benchmark import parser, refiner
+
+
+class Command(BaseCommand):
+    help = 'Runs the parser and refiner micro-benchmarks'
+
+    def add_arguments(self, parser_):
+        parser_.add_argument('--ops', type=int, default=10000, help='operations per benchmark')
+        parser_.add_argument('--users', type=int, nargs='+', default=[1, 100, 10000],
+                             help='numbers of users of the generated intents')
+        parser_.add_argument('--size', type=int, default=100, help='generated intents per kind and number of users')
+        parser_.add_argument('--seed', type=int, default=0, help='seed of the intent generator')
+        parser_.add_argument('--output', help='path of a JSON file the results are written to')
+
+    def handle(self, *args, **options):
+        measurements = parser.run(options['ops']) + refiner.run(
+            options['ops'], users=options['users'], size=options['size'], seed=options['seed']
+        )
+        for measurement in measurements:
+            self.stdout.write(str(measurement))
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump({
+                    'timestamp': time.time(),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'options': {key: options[key] for key in ('ops', 'users', 'size', 'seed')},
+                    'results': [measurement.to_dict() for measurement in measurements],
+                }, file, indent=2)
@@ -1,63 +1,315 @@
-from typing import List, Optional
+import collections
+import dataclasses
+import enum
+import hashlib
+import json
+import sys
+import threading
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
 
-from .irtk import refine
-from policy_manager.models import Policy
-from refiner.irtk.refiner import Policy as irtkPolicy
+from django.conf import settings
+from django.db import transaction
+
+from policy_manager.models import Policy, PolicyChange
 from policy_manager.plebeus import PleBeuS
-import pickle
+from refiner.irtk.refiner import Policy as irtkPolicy, RefineResult, refine_many, translate_checked, \
+    validate_checked
+from policy_manager.blockchain_pool import dump_blockchain_pool
+from refiner.irtk.intent import Intent as irtkIntent
+from refiner.irtk.parser.completion import COMPLETER
+from refiner.irtk.parser.correction import CORRECTOR
+from refiner.irtk import config
+from refiner.irtk.database.repository import CONVERSION_RATES
+from refiner.irtk.parser.grammar import GRAMMAR
+from refiner.irtk.parser.lexer import LEXER
+from refiner.irtk.parser.parser import Parser
+from refiner.irtk.parser.result import ParseResult, Status
+from refiner.irtk.parser.session import ParseSessions
+
+# parse sessions of the users, used to validate intents while they are typed
+PARSE_SESSIONS = ParseSessions()
+
+# compiled grammar exported as JSON, served to clients to validate intents locally. The ETag is the hash of the
+# content, hence it changes whenever the grammar changes
+GRAMMAR_JSON = json.dumps(GRAMMAR.export(), sort_keys=True, separators=(',', ':')).encode()
+GRAMMAR_ETAG = '"{}"'.format(hashlib.sha256(GRAMMAR_JSON).hexdigest())
+
+
+def _size_of(obj, seen: set) -> int:
+    """estimates the memory used by an object and the objects it references, which are not in seen. Enum members
+    are shared by all intents and policies, hence they are not counted"""
+    if id(obj) in seen or isinstance(obj, (enum.Enum, type)):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_size_of(key, seen) + _size_of(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_size_of(item, seen) for item in obj)
+    elif dataclasses.is_dataclass(obj):
+        size += sum(_size_of(getattr(obj, field.name), seen) for field in dataclasses.fields(obj))
+    return size
+
+
+class RefineCache:
+    """Bounded LRU cache of the results of refining intents.
+
+    Intents are keyed by their normalized tokens, hence intents that only differ in whitespace or case share a result.
+    The policies of complete intents are also keyed by the content hash of the parsed intent, hence equal intents that
+    are phrased differently, e.g. with the users in another order, share the translated policies as well. The cache is
+    cleared whenever the grammar, the conversion rates of the currencies or the thresholds of the irtk config change.
+    Cached results are not handed out, callers get copies of the parsed intent and the policies which they may modify.
+    """
+
+    def __init__(self, maxsize: int = settings.REFINE_CACHE_SIZE) -> None:
+        self._maxsize = maxsize
+        self._results: Dict[Hashable, RefineResult] = collections.OrderedDict()
+        self._equal: Dict[int, List[irtkPolicy]] = collections.OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    @staticmethod
+    def key(intent: str) -> Hashable:
+        """returns the normalized token sequence of an intent, i.e. its lowercase words"""
+        return tuple(LEXER.words(intent))
+
+    @staticmethod
+    def _copy(result: RefineResult) -> RefineResult:
+        """returns a copy of a cached result. The policies are mapped by SQLAlchemy, hence they cannot be frozen. Their
+        fields are enums, numbers and the immutable blockchain pool, hence a shallow copy does not share anything that
+        can be modified"""
+        intent = result.intent.copy() if result.intent is not None else None
+        policies = [dataclasses.replace(policy) for policy in result.policies] if result.policies is not None else None
+        return RefineResult.of(result, intent=intent, policies=policies)
+
+    @staticmethod
+    def version() -> Hashable:
+        """returns the version of everything a refined intent depends on besides its tokens"""
+        thresholds = tuple(value for name, value in vars(config).items() if name.isupper())
+        return GRAMMAR_ETAG, CONVERSION_RATES.version(), thresholds
+
+    def get(self, intent: str) -> Optional[RefineResult]:
+        """returns the cached result of refining an intent, or None if it is not cached"""
+        key = self.key(intent)
+        self._check_version()
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+        return self._copy(result) if result is not None else None
+
+    def refine(self, intent: str, session=None) -> RefineResult:
+        """returns the cached result of refining an intent, or refines the intent and caches its result. Exceptions,
+        e.g. if a currency does not exist, are not cached"""
+        key = self.key(intent)
+        version = self._check_version()
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._copy(result)
+            self.misses += 1
+
+        parser = Parser()
+        parsed = session.try_parse(parser, intent) if session else parser.try_parse(intent)
+        content_hash = parsed.intent.content_hash if parsed.complete else None
+        with self._lock:
+            policies = self._equal.get(content_hash) if content_hash is not None else None
+            if policies is not None:
+                self.shared += 1
+        result = translate_checked(parsed) if policies is None else RefineResult.of(parsed, policies=policies)
+
+        # the conversion rates may have been reloaded while the intent was refined
+        if self.version() != version:
+            return result
+        with self._lock:
+            self._store(self._results, key, result)
+            if content_hash is not None and result.policies is not None:
+                self._store(self._equal, content_hash, result.policies)
+        return self._copy(result)
+
+    def clear(self) -> None:
+        """removes all cached results"""
+        with self._lock:
+            self._results.clear()
+            self._equal.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """returns the numbers of hits and misses, the number of misses that shared the result of an equal intent, the
+        hit ratio, the number of cached intents and an estimate of the memory used by them in bytes"""
+        with self._lock:
+            entries = list(self._results.items())
+            equal = list(self._equal.items())
+        seen = set()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'shared': self.shared,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'size': len(entries),
+            'maxsize': self._maxsize,
+            'memory': sum(_size_of(key, seen) + _size_of(result, seen) for key, result in entries + equal),
+        }
+
+    def _check_version(self) -> Hashable:
+        version = self.version()
+        if version != self._version:
+            with self._lock:
+                self._results.clear()
+                self._equal.clear()
+                self._version = version
+        return version
+
+    def _store(self, results: Dict[Hashable, Any], key: Hashable, result: Any) -> None:
+        results[key] = result
+        results.move_to_end(key)
+        if len(results) > self._maxsize:
+            results.popitem(last=False)
+
 
+# results of refined intents, shared by all requests
+REFINE_CACHE = RefineCache()
 
-def refine_intent(intent: str) -> Optional[List[irtkPolicy]]:
-    """refines an intent and returns a list of resulting policies"""
-    policies = refine(intent)
-    return policies
+
+def refine_intent(intent: str, session_key=None) -> Optional[List[irtkPolicy]]:
+    """refines an intent and returns a list of resulting policies. If a session_key (e.g. the id of the user) is
+    provided, parsing resumes from the longest prefix of the intent already parsed in the session of that key.
+    Results are cached, see RefineCache"""
+    result = refine_intent_checked(intent, session_key)
+    error = result.exception()
+    if error:
+        raise error
+    return result.policies
+
+
+def refine_intent_checked(intent: str, session_key=None) -> RefineResult:
+    """refines an intent like refine_intent, but returns the outcome as a RefineResult instead of raising an
+    exception if the intent is incomplete or invalid"""
+    session = PARSE_SESSIONS.get(session_key) if session_key is not None else None
+    return REFINE_CACHE.refine(intent, session)
+
+
+def parse_intent(intent: str) -> Optional[irtkIntent]:
+    """returns the parsed intent of a refined intent, or None if the intent is not complete. Intents are usually
+    parsed after they were refined, hence the cached result is used"""
+    result = REFINE_CACHE.refine(intent)
+    return result.intent if result.complete else None
+
+
+def validate_intent(intent: str, session_key=None) -> ParseResult:
+    """validates an intent like refine_intent_checked, but stops after parsing and the semantic checks that can fail,
+    without translating the intent into policies. The checks use the cached conversion rates, hence validating an
+    intent usually does not access the database. If the intent was already refined, its cached result is returned"""
+    cached = REFINE_CACHE.get(intent)
+    if cached is not None:
+        return cached
+    session = PARSE_SESSIONS.get(session_key) if session_key is not None else None
+    return validate_checked(intent, session)
+
+
+def refine_intents(intents: Iterable[str]) -> Iterator[Union[RefineResult, Exception]]:
+    """refines many intents and yields the RefineResult of every intent in order, or the exception raised while
+    refining it, e.g. Currency.DoesNotExist. Parse sessions are not used, since the intents are not typed. Results
+    are cached, see RefineCache"""
+    return refine_many(intents, REFINE_CACHE.refine)
+
+
+def complete_token(result: ParseResult, partial: str) -> List[str]:
+    """returns the ranked completions of a partial word following the parsed part of an intent. There are no
+    completions if the parsed part already contains an illegal or invalid word"""
+    if result.status not in (Status.COMPLETE, Status.INCOMPLETE):
+        return []
+    return COMPLETER.complete(result.state, partial)
+
+
+def complete_intent(result: ParseResult) -> Optional[List[str]]:
+    """returns the shortest sequence of words that completes an incomplete intent, with placeholders such as
+    <user> and <threshold> for words that are not predefined. There is no completion if the intent is not incomplete"""
+    if result.status is not Status.INCOMPLETE:
+        return None
+    return COMPLETER.shortest(result.state)
+
+
+def suggest_tokens(result: ParseResult) -> List[str]:
+    """returns the words the illegal word of an intent was probably meant to be (did you mean ...?). There are no
+    suggestions if the intent does not contain an illegal word"""
+    if result.status is not Status.ILLEGAL:
+        return []
+    return CORRECTOR.suggest(result.state, result.token)
 
 
 def save_policies(policies: list, intent_id: int) -> None:
     """takes a list of policies and an intent_id as input, creates and saves the policies with the intent_id"""
-    for policy in policies:
-        Policy.objects.create_policy(policy, intent_id)
+    save_policies_many([(policies, intent_id)])
 
 
-def update_policies(new_policies: List[irtkPolicy], intent_id: int) -> None:
-    """Updates existing policies. In case the number of policies corresponding to an intent changes,
-    policies are added or deleted. Also updates policies in PleBeuS."""
-    old_policies = Policy.objects.filter(intent_id=intent_id)   # get policies with the corresponding intent_id
-    num_old_policies = len(old_policies)
-    num_new_policies = len(new_policies)
+def save_policies_many(policies: Iterable[Tuple[List[irtkPolicy], int]]) -> None:
+    """takes pairs of a list of policies and the intent_id of their intent as input, creates the policies and saves
+    them with bulk inserts"""
+    Policy.objects.create_policies(
+        (policy, intent_id) for intent_policies, intent_id in policies for policy in intent_policies
+    )
 
-    plebeus = PleBeuS()
 
-    if num_old_policies <= num_new_policies:     # possibly need to create additional policies
+# fields written when a policy is updated. The id of the policy in PleBeuS is only written by the outbox, which may save
+# the policy to PleBeuS at the same time, see policy_manager.outbox
+UPDATED_POLICY_FIELDS = [field.name for field in Policy._meta.concrete_fields
+                         if not field.primary_key and field.name not in ('pbs_id', 'created_at')]
 
-        # update existing policies
-        for i in range(len(old_policies)):
-            updated = overwrite_policy_fields(old_policies[i], new_policies[i], intent_id)
-            plebeus.save_policy(new_policies[i], old_policies[i].pbs_id)
-            updated.save()
 
-        # possibly create new policies
-        j = num_new_policies - num_old_policies     # number of new policies to be created
-        for i in range(j):
-            Policy.objects.create_policy(new_policies[num_old_policies + i], intent_id)
+def update_policies(new_policies: List[irtkPolicy], intent_id: int) -> int:
+    """Updates existing policies. The policies are matched by user, policies of new users are added and policies of
+    removed users are deleted. Unchanged policies are not written, and only policies whose data sent to PleBeuS
+    changed are updated in PleBeuS. The changes to update the policies in PleBeuS are stored in the same transaction.
+    Returns the number of policies which were not updated in PleBeuS, since their data did not change."""
+    old_policies = collections.defaultdict(list)
+    for policy in Policy.objects.filter(intent_id=intent_id).order_by('id'):
+        old_policies[policy.user].append(policy)
+    updated_policies = []
+    added_policies = []     # possibly need to create additional policies
+    for policy in new_policies:
+        if old_policies[policy.user]:
+            updated_policies.append((old_policies[policy.user].pop(0), policy))
+        else:
+            added_policies.append(policy)
+    deleted_policies = [policy for policies in old_policies.values() for policy in policies]
 
-    else:   # need to delete policies
+    plebeus = PleBeuS()
+    changed_policies = []   # policies to update in PleBeuS
+    skipped = 0
 
+    with transaction.atomic():
         # delete unnecessary policies
-        j = num_old_policies - num_new_policies     # number of old policies to be deleted
-        for i in range(j):
-            p = Policy.objects.filter(intent_id=intent_id).first()
-            plebeus.delete_policy(p.pbs_id)
-            p.delete()
-
-        # update remaining policies
-        remaining_policies = Policy.objects.filter(intent_id=intent_id)
-        i = 0
-        for policy in new_policies:
-            updated = overwrite_policy_fields(remaining_policies[i], policy, intent_id)
-            plebeus.save_policy(policy, updated.pbs_id)
-            updated.save()
-            i += 1
+        PolicyChange.objects.add_deletes(deleted_policies)
+        Policy.objects.filter(id__in=[policy.id for policy in deleted_policies]).delete()
+
+        # update changed policies and create additional policies
+        for old_policy, policy in updated_policies:
+            stored = stored_policy_fields(old_policy)
+            content_hash = plebeus.content_hash(policy)
+            overwrite_policy_fields(old_policy, policy, intent_id).content_hash = content_hash
+            if content_hash == stored['content_hash']:
+                skipped += 1
+                if stored_policy_fields(old_policy) == stored:
+                    continue
+            else:
+                changed_policies.append(old_policy)
+            old_policy.save(update_fields=UPDATED_POLICY_FIELDS)
+        PolicyChange.objects.add_saves(changed_policies)
+        Policy.objects.create_policies((policy, intent_id) for policy in added_policies)
+
+    return skipped
+
+
+def stored_policy_fields(policy: Policy) -> dict:
+    """returns the values of the fields of a Policy as they are stored in the database, except its timestamps"""
+    return {field.attname: field.get_prep_value(getattr(policy, field.attname))
+            for field in Policy._meta.concrete_fields if field.attname not in ('created_at', 'updated_at')}
 
 
 def overwrite_policy_fields(policy: Policy, raw_policy: irtkPolicy, intent_id: int) -> Policy:
@@ -71,7 +323,7 @@ def overwrite_policy_fields(policy: Policy, raw_policy: irtkPolicy, intent_id: i
     policy.currency_id = raw_policy.currency.name
     policy.threshold = raw_policy.threshold
     policy.split_txs = raw_policy.split_txs
-    policy.blockchain_pool = pickle.dumps(raw_policy.blockchain_pool)
+    policy.blockchain_pool = dump_blockchain_pool(raw_policy.blockchain_pool)
     policy.blockchain_type = raw_policy.blockchain_type
     policy.min_tx_rate = raw_policy.min_tx_rate
     policy.max_block_time = raw_policy.max_block_time
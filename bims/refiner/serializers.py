@@ -3,3 +3,4 @@ from rest_framework import serializers
 
 class ParserSerializer(serializers.Serializer):
     intent_string: serializers.CharField()
+    partial: serializers.CharField(required=False)
@@ -0,0 +1,42 @@
+from django.test import SimpleTestCase
+
+from refiner.benchmark import measure
+from refiner.benchmark.corpus import CorpusGenerator
+from refiner.irtk.intent import Currency
+from refiner.irtk.parser.parser import Parser
+from refiner.irtk.parser.result import Status
+
+
+class CorpusTests(SimpleTestCase):
+
+    def test_corpus(self):
+        corpus = CorpusGenerator(seed=1).corpus(50, users=3)
+
+        statuses = {kind: {Parser().try_parse(intent).status for intent in intents}
+                    for kind, intents in corpus.items()}
+        self.assertEqual(statuses['valid'], {Status.COMPLETE})
+        self.assertEqual(statuses['incomplete'], {Status.INCOMPLETE})
+        self.assertTrue(statuses['invalid'] <= {Status.ILLEGAL, Status.INVALID})
+
+    def test_users(self):
+        for users in (1, 2, 100):
+            intent = CorpusGenerator(seed=users).valid(users)
+            self.assertEqual(len(Parser().parse(intent).users), users, 'Unexpected number of users')
+
+    def test_seed(self):
+        self.assertEqual(CorpusGenerator(seed=2).corpus(5), CorpusGenerator(seed=2).corpus(5))
+
+    def test_currencies_excluded(self):
+        for intent in CorpusGenerator(seed=3).corpus(50, kinds=['valid'])['valid']:
+            self.assertIn(Parser().parse(intent).currency, (None, Currency.USD))
+
+
+class MeasureTests(SimpleTestCase):
+
+    def test_measure(self):
+        measurement = measure('noop', lambda: None, ops=100)
+
+        self.assertEqual(measurement.ops, 100)
+        self.assertLessEqual(measurement.p50, measurement.p99)
+        self.assertGreater(measurement.ops_per_sec, 0)
+        self.assertEqual(measurement.to_dict()['name'], 'noop')
@@ -49,3 +49,66 @@ class ParserTests(APITestCase):
         self.assertEqual(response.data.get('expected'),
                          {'blockchain', 'public', 'private', 'fast', 'cheap', 'popular', 'stable'},
                          'Expected words not as expected')
+
+    def test_partial_word(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        intent = 'for client1 select'
+
+        response = self.client.post(self.url, {'intent_string': intent, 'partial': 'ethe'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
+        self.assertEqual(response.data.get('completions'), ['ethereum'], 'Completions not as expected')
+
+    def test_partial_word_after_incorrect_intent(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        intent = 'for client1 select the sdofiae'
+
+        response = self.client.post(self.url, {'intent_string': intent, 'partial': 'b'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
+        self.assertEqual(response.data.get('completions'), [], 'Completions not as expected')
+
+    def test_mistyped_word(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        intent = 'for client1 select etherum'
+
+        response = self.client.post(self.url, {'intent_string': intent}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
+        self.assertEqual(response.data.get('suggestions'), ['ethereum'], 'Suggestions not as expected')
+
+    def test_shortest_completion(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        intent = 'for client1 select eos until the daily costs'
+
+        response = self.client.post(self.url, {'intent_string': intent}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
+        self.assertEqual(response.data.get('completion'), ['reach', '<threshold>'], 'Completion not as expected')
+
+
+class GrammarTests(APITestCase):
+    client = APIClient
+    url = '/api/grammar'
+
+    def test_grammar(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
+        self.assertTrue(response.has_header('ETag'), 'ETag header missing')
+        self.assertIn('max-age', response['Cache-Control'], 'Grammar is not cacheable')
+        grammar = response.json()
+        self.assertEqual(grammar.get('version'), 1, 'Unexpected version of grammar')
+        self.assertIn('ethereum', grammar.get('vocabulary'), 'Vocabulary not as expected')
+
+    def test_grammar_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, 'Incorrect status code')
+        self.assertEqual(response['ETag'], etag, 'ETag changed')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"outdated", W/' + etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, 'Incorrect status code')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"outdated"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
+
+        # an ETag that contains the current one does not match
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"x' + etag[1:-1] + 'x"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, 'Incorrect status code')
@@ -1,15 +1,22 @@
-from django.test import TestCase, override_settings
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
 import time
+from unittest.mock import patch
 
-from refiner.refiner import refine_intent, save_policies, update_policies
+from refiner.refiner import RefineCache, refine_intent, refine_intent_checked, refine_intents, save_policies, \
+    update_policies, validate_intent
+from refiner.irtk.parser.result import Status
+from refiner.irtk.database.repository import CONVERSION_RATES, ConversionRateCache
 
 from refiner.models import Currency
 from intent_manager.models import Intent
 from user_manager.models import User
-from policy_manager.models import Policy
+from policy_manager.models import Policy, PolicyChange
+from policy_manager.plebeus import PleBeuS
 
 from refiner.irtk.policy import Policy as irtkPolicy, CostProfile, Interval, BlockchainType, Currency as irtkCurrency, \
     Time
+from refiner.irtk.intent import Blockchain
 
 
 @override_settings(USE_PLEBEUS=False)
@@ -23,6 +30,7 @@ class RefinementTests(TestCase):
         usd.save()
         chf.save()
         eur.save()
+        CONVERSION_RATES.invalidate()     # currencies saved in a test are never committed
 
     def test_refine_default_intent(self):
         intent = 'For client1 select the fastest Blockchain as default'
@@ -50,6 +58,72 @@ class RefinementTests(TestCase):
 
         self.assertEqual(len(policies), 3, 'Not 3 policy were created')
 
+    def test_refine_checked_intent(self):
+        intent = 'For client1 and client2 select the fastest Blockchain as default'
+
+        result = refine_intent_checked(intent)
+
+        self.assertEqual(result.status, Status.COMPLETE)
+        self.assertEqual(len(result.policies), 2, 'Not 2 policies were created')
+
+    def test_refine_checked_incomplete_intent(self):
+        result = refine_intent_checked('For client1 select the fastest')
+
+        self.assertEqual(result.status, Status.INCOMPLETE)
+        self.assertIsNone(result.policies)
+        self.assertIn('blockchain', result.expected)
+
+    def test_refine_checked_empty_blockchain_pool(self):
+        intent = 'For client1 select the fastest Blockchain except bitcoin, eos, ethereum, hyperledger, iota, ' \
+                 'multichain and stellar as default'
+
+        result = refine_intent_checked(intent)
+
+        self.assertEqual(result.status, Status.INVALID)
+        self.assertEqual(result.message, 'invalid policy: blockchain pool cannot be empty')
+
+    def test_validate_intent(self):
+        intent = 'For client1 and client2 select the cheapest Blockchain until the daily costs reach CHF 20'
+        CONVERSION_RATES.invalidate()
+        validate_intent(intent)
+
+        with self.assertNumQueries(0):
+            result = validate_intent(intent)
+
+        self.assertEqual(result.status, Status.COMPLETE)
+        self.assertEqual(result.intent.users, {'client1', 'client2'})
+
+    def test_validate_intent_empty_blockchain_pool(self):
+        intent = 'For client1 select the fastest Blockchain except bitcoin, eos, ethereum, hyperledger, iota, ' \
+                 'multichain and stellar as default'
+
+        result = validate_intent(intent)
+
+        self.assertEqual(result.status, Status.INVALID)
+        self.assertEqual(result.message, refine_intent_checked(intent).message)
+
+    def test_validate_intent_unknown_currency(self):
+        Currency.objects.filter(currency='EUR').delete()
+
+        with self.assertRaises(Currency.DoesNotExist):
+            validate_intent('For client1 select the cheapest Blockchain until the daily costs reach EUR 30')
+
+    def test_refine_intents(self):
+        Currency.objects.filter(currency='EUR').delete()
+        intents = ['For client1 and client2 select the fastest Blockchain as default',
+                   'For client1 select the fastest',
+                   'For client1 select the cheapest Blockchain until the daily costs reach EUR 30',
+                   'For client3 select the cheapest Blockchain until the daily costs reach CHF 20']
+
+        results = list(refine_intents(iter(intents)))
+
+        self.assertEqual(len(results), 4, 'Not a result for every intent')
+        self.assertEqual(results[0].status, Status.COMPLETE)
+        self.assertEqual(sorted(policy.user for policy in results[0].policies), ['client1', 'client2'])
+        self.assertEqual(results[1].status, Status.INCOMPLETE)
+        self.assertIsInstance(results[2], Currency.DoesNotExist)
+        self.assertEqual(results[3].policies[0].user, 'client3', 'Intents after an error were not refined')
+
 
 @override_settings(USE_PLEBEUS=False)
 class RefinerPolicyManipulationTests(TestCase):
@@ -63,6 +137,7 @@ class RefinerPolicyManipulationTests(TestCase):
         usd.save()
         chf.save()
         eur.save()
+        CONVERSION_RATES.invalidate()     # currencies saved in a test are never committed
 
         user = User(username='testUser0')
         user.save()
@@ -110,7 +185,7 @@ class RefinerPolicyManipulationTests(TestCase):
         self.assertEqual(Policy.objects.get().user, 'client3', 'Incorrect policy user')
 
     def test_update_policies_with_adding_policies(self):
-        policy = Policy(intent_id=self.intent, currency=Currency.objects.get(currency='USD'))
+        policy = Policy(intent_id=self.intent, user='client1', currency=Currency.objects.get(currency='USD'))
         policy.save()
 
         irtk_policy1 = irtk_policy_factory('client1', 19)
@@ -127,6 +202,62 @@ class RefinerPolicyManipulationTests(TestCase):
         self.assertTrue(bool(Policy.objects.all()[0].created_at != Policy.objects.all()[0].updated_at)
                         != bool(Policy.objects.all()[1].created_at != Policy.objects.all()[1].updated_at))
 
+    @override_settings(USE_PLEBEUS=True)
+    def test_update_unchanged_policies(self):
+        """policies are matched by user, unchanged policies are neither written nor updated in PleBeuS"""
+        save_policies([irtk_policy_factory('client1', 19), irtk_policy_factory('client2', 12)], self.intent.id)
+        PolicyChange.objects.all().delete()
+        updated_at = dict(Policy.objects.values_list('user', 'updated_at'))
+
+        skipped = update_policies([irtk_policy_factory('client2', 12), irtk_policy_factory('client1', 19)],
+                                  self.intent.id)
+
+        self.assertEqual(skipped, 2, 'Incorrect number of skipped policies')
+        self.assertEqual(dict(Policy.objects.values_list('user', 'updated_at')), updated_at, 'Policies were written')
+        self.assertFalse(PolicyChange.objects.exists(), 'Policies were updated in PleBeuS')
+
+        # encryption is not sent to PleBeuS
+        policy = irtk_policy_factory('client1', 19)
+        policy.encryption = True
+        skipped = update_policies([policy, irtk_policy_factory('client2', 15), irtk_policy_factory('client3', 20)],
+                                  self.intent.id)
+
+        self.assertEqual(skipped, 1, 'Incorrect number of skipped policies')
+        self.assertTrue(Policy.objects.get(user='client1').encryption, 'Policy was not written')
+        self.assertEqual(Policy.objects.get(user='client2').threshold, 15, 'Incorrect threshold of policy')
+        self.assertEqual(sorted(PolicyChange.objects.values_list('action', 'user')),
+                         [('save', 'client2'), ('save', 'client3')])
+
+    @override_settings(USE_PLEBEUS=True)
+    def test_update_unchanged_policies_of_blockchain_type_filters(self):
+        """the translator stores the blockchain type of public and private filters as the value of the filter"""
+        policies = [irtk_policy_factory('client1', 19), irtk_policy_factory('client2', 12)]
+        policies[0].blockchain_type, policies[1].blockchain_type = 'public', 'private'
+        save_policies(policies, self.intent.id)
+        PolicyChange.objects.all().delete()
+        updated_at = dict(Policy.objects.values_list('user', 'updated_at'))
+
+        skipped = update_policies(policies, self.intent.id)
+
+        self.assertEqual(skipped, 2, 'Incorrect number of skipped policies')
+        self.assertEqual(dict(Policy.objects.values_list('user', 'updated_at')), updated_at, 'Policies were written')
+        self.assertFalse(PolicyChange.objects.exists(), 'Policies were updated in PleBeuS')
+
+    @override_settings(USE_PLEBEUS=True)
+    def test_update_policies_keeps_pbs_id(self):
+        """the id in PleBeuS stored by the outbox while a policy is updated is not overwritten"""
+        save_policies([irtk_policy_factory('client1', 19)], self.intent.id)
+        content_hash = PleBeuS.content_hash
+
+        def save_to_plebeus(plebeus, policy):
+            Policy.objects.update(pbs_id='829919')
+            return content_hash(plebeus, policy)
+        with patch.object(PleBeuS, 'content_hash', save_to_plebeus):
+            update_policies([irtk_policy_factory('client1', 20)], self.intent.id)
+
+        self.assertEqual(Policy.objects.get().threshold, 20, 'Policy was not updated')
+        self.assertEqual(Policy.objects.get().pbs_id, '829919', 'pbs_id was overwritten')
+
 
 def irtk_policy_factory(user: str, threshold: int) -> irtkPolicy:
     """helper function which returns an instance of irtkPolicy which can be used in tests"""
@@ -152,3 +283,154 @@ def irtk_policy_factory(user: str, threshold: int) -> irtkPolicy:
         redundancy=False
     )
     return irtk_policy
+
+
+class ConversionRateCacheTests(TestCase):
+
+    def setUp(self) -> None:
+        Currency(currency='CHF', exchange_rate=1.09).save()
+        Currency(currency='EUR', exchange_rate=1.18).save()
+        self.now = 0.0
+        self.cache = ConversionRateCache(ttl=60, clock=lambda: self.now)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cache.get('CHF'), 1.09)
+            self.assertEqual(self.cache.get('EUR'), 1.18)
+            self.assertEqual(self.cache.get('CHF'), 1.09)
+        self.assertEqual(self.cache.stats(), {'hits': 2, 'misses': 1})
+
+    def test_unknown_currency(self):
+        self.cache.get('CHF')
+        with self.assertRaises(Currency.DoesNotExist):
+            self.cache.get('GBP')
+
+        # currencies created by another process are found as well
+        Currency.objects.bulk_create([Currency(currency='GBP', exchange_rate=1.3)])     # does not send signals
+        self.assertEqual(self.cache.get('GBP'), 1.3)
+
+    def test_ttl(self):
+        self.cache.get('CHF')
+        Currency.objects.filter(currency='CHF').update(exchange_rate=1.5)     # does not send signals
+        self.assertEqual(self.cache.get('CHF'), 1.09)
+
+        self.now = 60.0
+        self.assertEqual(self.cache.get('CHF'), 1.5)
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 2})
+
+
+class ConversionRateInvalidationTests(TransactionTestCase):
+    """the cached conversion rates are invalidated once a change of a currency is committed"""
+
+    def setUp(self) -> None:
+        Currency(currency='USD', exchange_rate=1).save()
+        Currency(currency='CHF', exchange_rate=1.09).save()
+
+    def test_invalidated_on_save_and_delete(self):
+        self.assertEqual(CONVERSION_RATES.get('CHF'), 1.09)
+
+        Currency(currency='CHF', exchange_rate=1.2).save()
+        self.assertEqual(CONVERSION_RATES.get('CHF'), 1.2)
+
+        Currency.objects.get(currency='CHF').delete()
+        with self.assertRaises(Currency.DoesNotExist):
+            CONVERSION_RATES.get('CHF')
+
+    def test_not_invalidated_before_commit(self):
+        self.assertEqual(CONVERSION_RATES.get('CHF'), 1.09)
+
+        with transaction.atomic():
+            Currency(currency='CHF', exchange_rate=1.2).save()
+            self.assertEqual(CONVERSION_RATES.get('CHF'), 1.09)
+        self.assertEqual(CONVERSION_RATES.get('CHF'), 1.2)
+
+    def test_invalidated_on_currency_change(self):
+        intent = 'For client1 select the cheapest Blockchain until the daily costs reach CHF 20'
+        cache = RefineCache(maxsize=2)
+        cache.refine(intent)
+
+        Currency(currency='CHF', exchange_rate=1.2).save()
+        result = cache.refine(intent)
+
+        self.assertEqual(result.policies[0].threshold, 20 * 1.2)
+        self.assertEqual(cache.stats()['misses'], 2)
+
+
+class RefineCacheTests(TestCase):
+
+    def setUp(self) -> None:
+        Currency(currency='USD', exchange_rate=1).save()
+        Currency(currency='CHF', exchange_rate=1.09).save()
+        CONVERSION_RATES.invalidate()     # currencies saved in a test are never committed
+        self.cache = RefineCache(maxsize=2)
+
+    def test_normalized_intent(self):
+        intent = 'For client1 select the cheapest Blockchain until the daily costs reach CHF 20'
+        result = self.cache.refine(intent)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.refine('  for CLIENT1 select the  cheapest blockchain until the daily costs '
+                                               'reach chf 20'), result)
+        self.assertEqual(result.policies[0].threshold, 20 * 1.09)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_lru(self):
+        intents = ['For client1 select the fastest Blockchain as default',
+                   'For client2 select the fastest Blockchain as default',
+                   'For client3 select the fastest Blockchain as default']
+        self.cache.refine(intents[0])
+        self.cache.refine(intents[1])
+        self.cache.refine(intents[0])
+        self.cache.refine(intents[2])
+
+        self.assertIsNotNone(self.cache.get(intents[0]))
+        self.assertIsNone(self.cache.get(intents[1]), 'Least recently used result was not evicted')
+        self.assertEqual(self.cache.stats()['size'], 2)
+
+    def test_equal_intents_shared(self):
+        result = self.cache.refine('For client1 and client2 select the fastest Blockchain as default')
+        other = self.cache.refine('For client2 and client1 select the fastest Blockchain as default')
+
+        self.assertEqual(other.policies, result.policies)
+        self.assertEqual(self.cache.stats()['shared'], 1)
+
+    def test_copies_returned(self):
+        intent = 'For client1 and client2 select the cheapest Blockchain until the daily costs reach CHF 20'
+        other = 'For client2 and client1 select the cheapest Blockchain until the daily costs reach CHF 20'
+        result = self.cache.refine(intent)
+        result.policies[0].threshold = 0
+        result.intent.whitelist.add(Blockchain.EOS)
+        self.cache.refine(other).policies[1].threshold = 0
+
+        for cached in (self.cache.refine(intent), self.cache.get(intent), self.cache.refine(other)):
+            self.assertEqual([policy.threshold for policy in cached.policies], [20 * 1.09] * 2,
+                             'Cached policy was modified')
+            self.assertNotIn(Blockchain.EOS, cached.intent.whitelist, 'Cached intent was modified')
+        self.assertEqual(self.cache.stats()['shared'], 1)
+
+    def test_intervals_not_shared(self):
+        """intents with costs of 0 differ in their interval"""
+        daily = self.cache.refine('For client1 select EOS until the daily costs reach 0')
+        weekly = self.cache.refine('For client1 select EOS until the weekly costs reach 0')
+
+        self.assertEqual(self.cache.stats()['shared'], 0)
+        self.assertEqual((daily.policies[0].interval, weekly.policies[0].interval), (Interval.DAILY, Interval.WEEKLY))
+        self.assertEqual(weekly.intent.interval.value, 'weekly')
+
+    def test_errors_not_cached(self):
+        intent = 'For client1 select the cheapest Blockchain until the daily costs reach EUR 20'
+        with self.assertRaises(Currency.DoesNotExist):
+            self.cache.refine(intent)
+
+        Currency(currency='EUR', exchange_rate=1.18).save()
+        self.assertEqual(self.cache.refine(intent).policies[0].threshold, 20 * 1.18)
+
+    def test_stats(self):
+        self.cache.refine('For client1 select the fastest Blockchain as default')
+        self.cache.refine('For client1 select the fastest Blockchain as default')
+        self.cache.refine('For client1 select the')
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 2, 2))
+        self.assertAlmostEqual(stats['hit_ratio'], 1 / 3)
+        self.assertGreater(stats['memory'], 0)
@@ -1,7 +1,8 @@
 from django.urls import path
-from .api import IntentParserAPI
+from .api import GrammarAPI, IntentParserAPI
 
 
 urlpatterns = [
     path('api/parser', IntentParserAPI.as_view()),
+    path('api/grammar', GrammarAPI.as_view()),
 ]